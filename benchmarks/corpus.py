@@ -0,0 +1,103 @@
+import io
+import random
+import zipfile
+from pathlib import Path
+from PIL import Image, ImageDraw
+
+#Corpus sintético e determinístico (mesma semente = mesmos arquivos), para comparar commits
+SEMENTE = 20240601
+
+#Quantidades por escala do corpus
+ESCALAS = {
+    'pequena': {'paginas_pdf': 40, 'quadros_tiff': 8, 'imagens': 4, 'lado': 1600, 'zips': 3},
+    'media': {'paginas_pdf': 300, 'quadros_tiff': 30, 'imagens': 12, 'lado': 2480, 'zips': 6},
+    'grande': {'paginas_pdf': 1200, 'quadros_tiff': 80, 'imagens': 30, 'lado': 3508, 'zips': 12},
+}
+
+
+def _pagina_texto(aleatorio, largura, altura, modo='L'):
+    #Página parecida com uma digitalização de documento: fundo branco e linhas de "texto"
+    img = Image.new(modo, (largura, altura), 255 if modo != 'RGB' else (255, 255, 255))
+    desenho = ImageDraw.Draw(img)
+    margem = largura // 12
+    y = margem
+    altura_linha = max(12, altura // 60)
+    while y < altura - margem:
+        x = margem
+        while x < largura - margem:
+            palavra = aleatorio.randint(altura_linha, altura_linha * 5)
+            cor = 0 if modo != 'RGB' else (20, 20, 20)
+            desenho.rectangle([x, y, min(x + palavra, largura - margem), y + altura_linha // 2], fill=cor)
+            x += palavra + altura_linha // 2
+        y += altura_linha
+    return img
+
+
+def _foto(aleatorio, largura, altura):
+    #Imagem colorida com ruído (comprime mal, como uma foto): força a otimização de tamanho
+    tamanho = largura // 4 * altura // 4 * 3
+    ruido = Image.frombytes('RGB', (largura // 4, altura // 4), aleatorio.getrandbits(tamanho * 8).to_bytes(tamanho, 'little'))
+    base = Image.linear_gradient('L').resize((largura, altura)).convert('RGB')
+    return Image.blend(base, ruido.resize((largura, altura), Image.Resampling.BICUBIC), 0.6)
+
+
+def gerar_corpus(pasta, escala='pequena'):
+    """Gera o corpus de benchmark em `pasta` e retorna um dicionário com os caminhos de cada tipo"""
+    parametros = ESCALAS[escala]
+    aleatorio = random.Random(SEMENTE)
+    pasta = Path(pasta)
+    lado = parametros['lado']
+    largura, altura = lado, int(lado * 1.414)
+    arquivos = {'pdf_multipagina': [], 'tiff_multipagina': [], 'png_rgba': [], 'bitonal': [], 'foto': [], 'zip': []}
+
+    # PDF multipágina (páginas de texto em tons de cinza, resolução menor para o arquivo não ficar enorme)
+    destino = pasta / 'pdf'
+    destino.mkdir(parents=True, exist_ok=True)
+    paginas = [_pagina_texto(aleatorio, largura // 2, altura // 2) for _ in range(8)]
+    caminho = destino / 'multipagina.pdf'
+    quantidade = parametros['paginas_pdf']
+    sequencia = [paginas[i % len(paginas)] for i in range(quantidade)]
+    sequencia[0].save(caminho, save_all=True, append_images=sequencia[1:], resolution=100)
+    arquivos['pdf_multipagina'].append(caminho)
+
+    # TIFF multipágina grande (cinza, LZW)
+    destino = pasta / 'tiff'
+    destino.mkdir(parents=True, exist_ok=True)
+    quadros = [_pagina_texto(aleatorio, largura, altura) for _ in range(parametros['quadros_tiff'])]
+    caminho = destino / 'multipagina.tif'
+    quadros[0].save(caminho, save_all=True, append_images=quadros[1:], compression='tiff_lzw')
+    arquivos['tiff_multipagina'].append(caminho)
+
+    # PNGs com transparência, digitalizações bitonais (G4) e fotos JPEG
+    destino = pasta / 'imagens'
+    destino.mkdir(parents=True, exist_ok=True)
+    for i in range(parametros['imagens']):
+        rgba = _foto(aleatorio, largura // 2, altura // 2).convert('RGBA')
+        rgba.putalpha(Image.linear_gradient('L').resize(rgba.size))
+        caminho = destino / f'transparente_{i}.png'
+        rgba.save(caminho)
+        arquivos['png_rgba'].append(caminho)
+
+        caminho = destino / f'digitalizacao_{i}.tif'
+        _pagina_texto(aleatorio, largura, altura).convert('1').save(caminho, compression='group4')
+        arquivos['bitonal'].append(caminho)
+
+        caminho = destino / f'foto_{i}.jpg'
+        _foto(aleatorio, largura, altura).save(caminho, quality=95)
+        arquivos['foto'].append(caminho)
+
+    # ZIPs aninhados (um ZIP dentro de outro, com digitalizações, fotos e PNGs)
+    destino = pasta / 'compactados'
+    destino.mkdir(parents=True, exist_ok=True)
+    for i in range(parametros['zips']):
+        interno = io.BytesIO()
+        with zipfile.ZipFile(interno, 'w', zipfile.ZIP_DEFLATED) as zip_interno:
+            zip_interno.write(arquivos['bitonal'][i % len(arquivos['bitonal'])], f'interno/digitalizacao_{i}.tif')
+            zip_interno.write(arquivos['foto'][i % len(arquivos['foto'])], f'interno/foto_{i}.jpg')
+        caminho = destino / f'lote_{i}.zip'
+        with zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as zip_externo:
+            zip_externo.writestr(f'aninhado_{i}.zip', interno.getvalue())
+            zip_externo.write(arquivos['png_rgba'][i % len(arquivos['png_rgba'])], f'transparente_{i}.png')
+        arquivos['zip'].append(caminho)
+
+    return arquivos
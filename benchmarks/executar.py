@@ -0,0 +1,226 @@
+import sys
+import json
+import time
+import shutil
+import asyncio
+import platform
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import pypdfium2 as pdfium
+
+try:
+    import resource  # Unix
+except ImportError:
+    resource = None
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+from benchmarks.corpus import gerar_corpus, ESCALAS
+
+CASOS = ['imagem_para_pdf', 'pdf_para_paginas', 'imagem_multipagina', 'otimizar_tamanho', 'extracao_zip', 'ponta_a_ponta']
+DESCRICOES_CASOS = {
+    'imagem_para_pdf': "imagens avulsas -> PDF",
+    'pdf_para_paginas': "PDF multipágina -> um PDF por página",
+    'imagem_multipagina': "TIFF multipágina -> um PDF por página",
+    'otimizar_tamanho': "recompressão até o limite de tamanho",
+    'extracao_zip': "extração dos ZIPs para a pasta, sem converter",
+    'ponta_a_ponta': "conversão completa, membros dos ZIPs inclusive",
+}
+PASTA_RESULTADOS = RAIZ / 'benchmarks' / 'resultados'
+
+
+def _pico_rss_mb():
+    #Pico de memória deste processo e, separado, do maior processo filho (pool de conversão)
+    proprio = None
+    try:
+        # VmHWM (Linux) é zerado no exec; o ru_maxrss herdaria o pico do processo que criou este
+        with open('/proc/self/status', encoding='ascii') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    proprio = int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return proprio, None
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024  # macOS informa em bytes, Linux em KB
+    if proprio is None:
+        proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor
+    return round(proprio, 1), round(filhos, 1)
+
+
+def _medir_saida(pasta):
+    #Páginas dos PDFs gerados e bytes de todos os arquivos de saída
+    paginas = 0
+    tamanho = 0
+    for caminho in Path(pasta).rglob('*'):
+        if not caminho.is_file():
+            continue
+        tamanho += caminho.stat().st_size
+        if caminho.suffix.lower() == '.pdf':
+            pdf = pdfium.PdfDocument(caminho)
+            paginas += len(pdf)
+            pdf.close()
+    return paginas, tamanho
+
+
+async def _rodar_caso(nome, arquivos, pasta_corpus, saida, trabalho, workers):
+    from model.converter import ConversorModel, extrair_todos_zips
+
+    if nome == 'imagem_para_pdf':
+        for caminho in arquivos['png_rgba'] + arquivos['bitonal'] + arquivos['foto']:
+            await ConversorModel.converter_imagem_para_pdf(caminho, saida / f"{caminho.stem}.pdf")
+    elif nome == 'pdf_para_paginas':
+        for caminho in arquivos['pdf_multipagina']:
+            await ConversorModel.converter_pdf_para_paginas_individuais(caminho, saida / caminho.name)
+    elif nome == 'imagem_multipagina':
+        for caminho in arquivos['tiff_multipagina']:
+            await ConversorModel.converter_imagem_multipagina_para_paginas_individuais(caminho, saida / f"{caminho.stem}.pdf")
+    elif nome == 'otimizar_tamanho':
+        # Limite de 1/4 do tamanho original: força a busca de qualidade/escala em todas as fotos
+        for caminho in arquivos['foto']:
+            otimizado = await ConversorModel.verificar_e_otimizar_tamanho(caminho, 70, caminho.stat().st_size // 4)
+            if otimizado is None:
+                raise Exception(f"Falha ao otimizar {caminho.name}")
+            if otimizado != caminho:
+                otimizado.replace(saida / otimizado.name)
+    elif nome == 'extracao_zip':
+        # A extração grava ao lado dos ZIPs: trabalha sobre uma cópia
+        for caminho in arquivos['zip']:
+            shutil.copy2(caminho, trabalho / caminho.name)
+        extrair_todos_zips(trabalho)
+        for caminho in trabalho.rglob('*'):
+            if caminho.is_file() and caminho.suffix.lower() != '.zip':
+                caminho.replace(saida / caminho.name)
+    elif nome == 'ponta_a_ponta':
+        _, erros = await ConversorModel.converter_para_pdf(
+            pasta_corpus, saida, max_processos=workers, incremental=False
+        )
+        # Os ZIPs do corpus (inclusive os aninhados) são convertidos direto do compactado, como qualquer origem
+        if erros:
+            raise Exception(f"{len(erros)} erros na conversão: {erros[:3]}")
+
+
+def executar_caso(nome, arquivos, pasta_corpus, pasta_execucao, workers):
+    """Roda um caso em um processo novo e retorna as medições (tempo, páginas, memória, bytes)"""
+    import model.otimizacao as otimizacao
+
+    pasta_execucao = Path(pasta_execucao)
+    saida = pasta_execucao / 'saida'
+    trabalho = pasta_execucao / 'trabalho'
+    saida.mkdir(parents=True)
+    trabalho.mkdir(parents=True)
+    # Cache de parâmetros vazio a cada execução: mede a busca completa, não o acerto no cache
+    otimizacao.CACHE_DIR = pasta_execucao / 'cache'
+
+    inicio = time.perf_counter()
+    asyncio.run(_rodar_caso(nome, arquivos, Path(pasta_corpus), saida, trabalho, workers))
+    segundos = time.perf_counter() - inicio
+
+    paginas, bytes_saida = _medir_saida(saida)
+    pico_rss, pico_rss_filhos = _pico_rss_mb()
+    return {
+        'segundos': round(segundos, 4),
+        'paginas': paginas,
+        'paginas_por_s': round(paginas / segundos, 2) if segundos > 0 else None,
+        'pico_rss_mb': pico_rss,
+        'pico_rss_filhos_mb': pico_rss_filhos,
+        'bytes_saida': bytes_saida,
+    }
+
+
+def commit_atual():
+    try:
+        resultado = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True)
+        alterado = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ, capture_output=True, text=True)
+        return resultado.stdout.strip() + ('-modificado' if alterado.stdout.strip() else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def comparar(atual, caminho_base):
+    #Imprime a variação de tempo de cada caso em relação a um resultado anterior
+    base = json.loads(Path(caminho_base).read_text(encoding='utf-8'))
+    print(f"\nComparação com {base.get('commit')} ({caminho_base}):")
+    for nome, medicao in atual['casos'].items():
+        anterior = base.get('casos', {}).get(nome)
+        if not anterior or not anterior.get('segundos'):
+            print(f"  {nome:<20} sem referência")
+            continue
+        variacao = (medicao['segundos'] - anterior['segundos']) / anterior['segundos'] * 100
+        print(f"  {nome:<20} {anterior['segundos']:.3f}s -> {medicao['segundos']:.3f}s ({variacao:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos críticos da conversão")
+    parser.add_argument('--escala', choices=list(ESCALAS), default='pequena', help="Tamanho do corpus sintético")
+    parser.add_argument('--casos', nargs='+', choices=CASOS, default=CASOS, help="Casos a executar")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções por caso (vale a mais rápida)")
+    parser.add_argument('--workers', type=int, default=None, help="Processos do pool na conversão ponta a ponta")
+    parser.add_argument('--corpus', help="Pasta onde o corpus é gerado (padrão: temporária, apagada no fim)")
+    parser.add_argument('--saida', help="Arquivo JSON de resultado (padrão: benchmarks/resultados/<data>_<commit>.json)")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar")
+    argumentos = parser.parse_args(argv)
+
+    pasta_temporaria = Path(tempfile.mkdtemp(prefix='documenta_benchmark_'))
+    try:
+        pasta_corpus = Path(argumentos.corpus) if argumentos.corpus else pasta_temporaria / 'corpus'
+        print(f"[INFO] Gerando corpus '{argumentos.escala}' em {pasta_corpus}")
+        inicio = time.perf_counter()
+        arquivos = gerar_corpus(pasta_corpus, argumentos.escala)
+        print(f"[INFO] Corpus gerado em {time.perf_counter() - inicio:.1f}s")
+
+        resultado = {
+            'commit': commit_atual(),
+            'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': multiprocessing.cpu_count(),
+            'escala': argumentos.escala,
+            'repeticoes': argumentos.repeticoes,
+            'casos': {},
+        }
+
+        contexto = multiprocessing.get_context('spawn')
+        for nome in argumentos.casos:
+            execucoes = []
+            for repeticao in range(argumentos.repeticoes):
+                pasta_execucao = pasta_temporaria / f'{nome}_{repeticao}'
+                # Processo novo por execução: pico de memória e caches não vazam entre casos
+                with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                    execucoes.append(executor.submit(
+                        executar_caso, nome, arquivos, pasta_corpus, pasta_execucao, argumentos.workers
+                    ).result())
+                shutil.rmtree(pasta_execucao, ignore_errors=True)
+            melhor = min(execucoes, key=lambda medicao: medicao['segundos'])
+            melhor['todas_segundos'] = [medicao['segundos'] for medicao in execucoes]
+            melhor['descricao'] = DESCRICOES_CASOS[nome]
+            resultado['casos'][nome] = melhor
+            print(
+                f"[INFO] {nome:<20} {melhor['segundos']:.3f}s  {melhor['paginas']} páginas  "
+                f"{melhor['paginas_por_s'] or 0:.1f} páginas/s  RSS {melhor['pico_rss_mb']} MB  "
+                f"saída {melhor['bytes_saida'] / (1024**2):.1f} MB  ({DESCRICOES_CASOS[nome]})"
+            )
+    finally:
+        shutil.rmtree(pasta_temporaria, ignore_errors=True)
+
+    caminho_saida = Path(argumentos.saida) if argumentos.saida else (
+        PASTA_RESULTADOS / f"{time.strftime('%Y%m%d_%H%M%S')}_{resultado['commit']}.json"
+    )
+    caminho_saida.parent.mkdir(parents=True, exist_ok=True)
+    caminho_saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"[INFO] Resultado gravado em {caminho_saida}")
+
+    if argumentos.comparar:
+        comparar(resultado, argumentos.comparar)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,6 @@
+import sys
+from documenta.cli import main
+
+# Protegido: os processos do pool (spawn) reimportam este módulo sem rodar a conversão
+if __name__ == "__main__":
+    sys.exit(main())
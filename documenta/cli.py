@@ -0,0 +1,148 @@
+import re
+import signal
+import asyncio
+import argparse
+from model.converter import ConversorModel
+from model.cancelamento import TokenCancelamento
+from model.codificacao import PERFIL_AUTOMATICO, PERFIS_COMPRESSAO
+from model.progresso import ProgressoConversao
+from model.metricas import FORMATOS_METRICAS
+from model.deduplicacao import POLITICAS_DEDUPLICACAO, POLITICA_AUTOMATICA
+from model.word import BACKENDS_WORD, BACKEND_WORD_PADRAO
+from model.ordenacao import ORDENS_CONVERSAO, ORDEM_MAIORES_PRIMEIRO
+
+#Códigos de saída
+SAIDA_SUCESSO = 0
+SAIDA_COM_ERROS = 1  # Conversão terminou, mas algum arquivo falhou
+SAIDA_USO = 2  # Argumentos inválidos (mesmo código do argparse)
+SAIDA_INTERROMPIDA = 130  # Ctrl+C
+
+INTERVALO_STATUS = 2.0  # No terminal basta uma linha de progresso a cada 2 segundos
+MAX_ERROS_LISTADOS = 10
+
+UNIDADES = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024**2, 'MB': 1024**2, 'G': 1024**3, 'GB': 1024**3}
+
+
+def interpretar_tamanho(texto):
+    #Converte "500MB", "1.5GB", "2G" ou "1048576" em bytes
+    correspondencia = re.fullmatch(r"\s*(\d+(?:[.,]\d+)?)\s*([KMG]?B?)\s*", texto.upper())
+    if not correspondencia:
+        raise argparse.ArgumentTypeError(f"Tamanho inválido: {texto} (use, por exemplo, 500MB ou 1GB)")
+    valor = float(correspondencia.group(1).replace(',', '.'))
+    tamanho = int(valor * UNIDADES[correspondencia.group(2)])
+    if tamanho <= 0:
+        raise argparse.ArgumentTypeError("O tamanho deve ser maior que zero")
+    return tamanho
+
+
+def inteiro_positivo(texto):
+    valor = int(texto)
+    if valor <= 0:
+        raise argparse.ArgumentTypeError("Informe um número maior que zero")
+    return valor
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m documenta",
+        description="Documenta - conversão de documentos para PDF sem interface gráfica"
+    )
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    converter = comandos.add_parser("convert", help="Converte uma pasta para PDF (um PDF por página)")
+    converter.add_argument("origem", help="Pasta com os arquivos de origem")
+    converter.add_argument("destino", help="Pasta onde os PDFs serão gravados")
+    converter.add_argument("--workers", type=inteiro_positivo, default=None,
+                           help="Processos de conversão em paralelo (padrão: um por núcleo)")
+    converter.add_argument("--max-size", type=interpretar_tamanho, default=None,
+                           help="Tamanho máximo por PDF, ex.: 500MB, 1GB (padrão: 1GB)")
+    converter.add_argument("--perfil", choices=PERFIS_COMPRESSAO, default=PERFIL_AUTOMATICO,
+                           help="Perfil de compressão das páginas de imagem")
+    converter.add_argument("--completo", action="store_true",
+                           help="Converte tudo de novo, ignorando o manifesto de conversões anteriores")
+    converter.add_argument("--hash", action="store_true",
+                           help="Compara o conteúdo quando só a data de um arquivo mudou")
+    converter.add_argument("--metricas", choices=FORMATOS_METRICAS, default=None,
+                           help="Grava tempos por etapa e contadores na pasta de destino")
+    converter.add_argument("--sem-compactados", action="store_true",
+                           help="Não abre ZIP/TAR durante a conversão (trata como arquivos não suportados)")
+    converter.add_argument("--deduplicar", nargs="?", const=POLITICA_AUTOMATICA, choices=POLITICAS_DEDUPLICACAO, default=None,
+                           help="Converte arquivos de conteúdo idêntico uma vez só e cria as cópias por "
+                                "reflink, hardlink ou cópia (padrão da opção: automatico)")
+    converter.add_argument("--deduplicar-paginas", action="store_true",
+                           help="Com --deduplicar, também liga PDFs de página idênticos entre si")
+    converter.add_argument("--backend-word", choices=BACKENDS_WORD, default=BACKEND_WORD_PADRAO,
+                           help="Conversor de DOC/DOCX: Word (COM), docx2pdf, LibreOffice ou falso (testes); "
+                                "padrão: variável DOCUMENTA_BACKEND_WORD ou automatico")
+    converter.add_argument("--memoria", type=interpretar_tamanho, default=None,
+                           help="Memória que as conversões em andamento podem ocupar juntas, ex.: 4GB "
+                                "(padrão: metade da memória física)")
+    converter.add_argument("--ordem", choices=ORDENS_CONVERSAO, default=ORDEM_MAIORES_PRIMEIRO,
+                           help="maiores_primeiro: arquivos com mais páginas/pixels são convertidos antes; "
+                                "varredura: na ordem em que são encontrados")
+    converter.add_argument("--silencioso", action="store_true",
+                           help="Mostra apenas o resumo final")
+    return parser
+
+
+def imprimir_status(mensagem, erro=None):
+    if erro:
+        print(f"[ERRO] {erro}", flush=True)
+    elif mensagem:
+        print(mensagem.replace("\n", " | "), flush=True)
+
+
+def imprimir_resumo(resumo):
+    #Vazão da execução: arquivos/s, páginas/s (um PDF por página) e MB/s lidos da origem
+    duracao = max(resumo['duracao'], 1e-6)
+    megabytes = resumo['bytes_fonte'] / (1024**2)
+    print(
+        f"[INFO] {resumo['concluidos']} arquivos, {resumo['pdfs']} páginas, {megabytes:.1f} MB em {duracao:.1f}s | "
+        f"{resumo['concluidos'] / duracao:.2f} arquivos/s, {resumo['pdfs'] / duracao:.2f} páginas/s, "
+        f"{megabytes / duracao:.2f} MB/s",
+        flush=True
+    )
+
+
+def executar_conversao(argumentos):
+    cancelamento = TokenCancelamento()
+    progresso = ProgressoConversao(None if argumentos.silencioso else imprimir_status, INTERVALO_STATUS)
+
+    def interromper(sinal, quadro):
+        # Primeiro Ctrl+C: para entre páginas e grava o relatório; o segundo encerra na hora
+        if cancelamento.cancelado:
+            raise KeyboardInterrupt
+        print("[AVISO] Interrompendo a conversão (Ctrl+C novamente para sair imediatamente)...", flush=True)
+        cancelamento.cancelar()
+
+    signal.signal(signal.SIGINT, interromper)
+    _, erros = asyncio.run(ConversorModel.converter_para_pdf(
+        argumentos.origem, argumentos.destino, None, cancelamento, argumentos.max_size, argumentos.workers,
+        incremental=not argumentos.completo, usar_hash=argumentos.hash,
+        perfil_compressao=argumentos.perfil, progresso=progresso, metricas=argumentos.metricas,
+        ler_compactados=not argumentos.sem_compactados, deduplicar=argumentos.deduplicar,
+        deduplicar_paginas=argumentos.deduplicar_paginas, backend_word=argumentos.backend_word,
+        memoria_maxima=argumentos.memoria, ordem=argumentos.ordem
+    ))
+
+    imprimir_resumo(progresso.resumo())
+    if cancelamento.cancelado:
+        return SAIDA_INTERROMPIDA
+    if erros:
+        for erro in erros[:MAX_ERROS_LISTADOS]:
+            print(f"[ERRO] {erro}", flush=True)
+        if len(erros) > MAX_ERROS_LISTADOS:
+            print(f"[ERRO] ... e mais {len(erros) - MAX_ERROS_LISTADOS} erros (lista completa no relatório da pasta de destino)", flush=True)
+        return SAIDA_COM_ERROS
+    return SAIDA_SUCESSO
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando (retorna o código de saída)"""
+    argumentos = criar_parser().parse_args(argv)
+    try:
+        if argumentos.comando == "convert":
+            return executar_conversao(argumentos)
+    except KeyboardInterrupt:
+        return SAIDA_INTERROMPIDA
+    return SAIDA_USO
@@ -1,5 +1,6 @@
 import flet as ft
 import os
+import multiprocessing
 from view.ui import criar_interface
 from viewmodel.converter_vm import ConversorViewModel
 
@@ -31,4 +32,6 @@ def main(page: ft.Page):
     page.on_close = on_close
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos de conversão no executável (PyInstaller)
+    multiprocessing.freeze_support()
     ft.app(target=main, assets_dir="assets")
\ No newline at end of file
@@ -0,0 +1,54 @@
+import signal
+import multiprocessing
+
+
+class ConversaoCancelada(Exception):
+    """Levantada quando o usuário interrompe a conversão"""
+
+    def __init__(self, mensagem="Conversão interrompida pelo usuário", concluidos=0):
+        super().__init__(mensagem, concluidos)
+        self.mensagem = mensagem
+        self.concluidos = concluidos  # PDFs já gravados antes da interrupção
+
+    def __str__(self):
+        return self.mensagem
+
+
+class TokenCancelamento:
+    """Sinal de parada compartilhado entre a interface, o event loop e os processos do pool"""
+
+    def __init__(self):
+        #Event de multiprocessing funciona entre threads e entre processos
+        self._evento = multiprocessing.get_context("spawn").Event()
+
+    def cancelar(self):
+        self._evento.set()
+
+    def reiniciar(self):
+        self._evento.clear()
+
+    @property
+    def cancelado(self):
+        return self._evento.is_set()
+
+    def verificar(self, concluidos=0):
+        if self.cancelado:
+            raise ConversaoCancelada(concluidos=concluidos)
+
+
+#Token do processo atual (definido pelo inicializador do pool de conversão)
+_token_processo = None
+
+
+def inicializar_processo(token):
+    #Inicializador dos processos do MotorConversao
+    global _token_processo
+    _token_processo = token
+    #Ctrl+C no terminal chega a todos os processos: só o principal trata e cancela pelo token
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def verificar_cancelamento(concluidos=0):
+    #Ponto de parada cooperativo usado nos laços por página
+    if _token_processo is not None:
+        _token_processo.verificar(concluidos)
@@ -0,0 +1,115 @@
+import io
+import zlib
+from PIL import Image, ImageChops, features
+from model.pdf_direto import ImagemCodificada
+from model.metricas import medir
+
+#Perfis de compressão das páginas geradas a partir de imagens
+PERFIL_AUTOMATICO = "automatico"  # Detecta bitonal/cinza/colorido e escolhe o menor codec
+PERFIL_COLORIDO = "colorido"  # Comportamento anterior: tudo em JPEG colorido
+PERFIL_CINZA = "cinza"  # Força tons de cinza
+PERFIL_BITONAL = "bitonal"  # Força preto e branco (1 bit)
+PERFIS_COMPRESSAO = [PERFIL_AUTOMATICO, PERFIL_COLORIDO, PERFIL_CINZA, PERFIL_BITONAL]
+
+TOLERANCIA_CINZA = 8  # Diferença máxima entre canais RGB para considerar a página cinza
+LIMITE_PRETO = 32  # Níveis até aqui contam como preto numa digitalização bitonal
+LIMITE_BRANCO = 223  # Níveis a partir daqui contam como branco
+NIVEL_FLATE = 6
+
+
+def normalizar_modo(img):
+    #Reduz a imagem a '1', 'L' ou 'RGB', achatando transparência sobre fundo branco
+    if img.mode == 'P' and 'transparency' in img.info:
+        img = img.convert('RGBA')
+    if img.mode in ['RGBA', 'LA']:
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    if img.mode in ['1', 'L', 'RGB']:
+        return img
+    return img.convert('RGB')
+
+
+def classificar_imagem(img):
+    """Retorna 'bitonal', 'cinza' ou 'colorido' conforme o conteúdo da imagem (já normalizada)"""
+    if img.mode == '1':
+        return PERFIL_BITONAL
+    if img.mode == 'RGB':
+        vermelho, verde, azul = img.split()
+        diferenca = max(
+            ImageChops.difference(vermelho, verde).getextrema()[1],
+            ImageChops.difference(verde, azul).getextrema()[1],
+        )
+        if diferenca > TOLERANCIA_CINZA:
+            return PERFIL_COLORIDO
+        img = img.convert('L')
+    #Até dois níveis, ambos perto do preto ou do branco, é na prática uma digitalização bitonal;
+    #uma página cinza uniforme ou de dois tons de cinza continua cinza
+    niveis = [nivel for nivel, quantidade in enumerate(img.histogram()) if quantidade]
+    if len(niveis) <= 2 and all(nivel <= LIMITE_PRETO or nivel >= LIMITE_BRANCO for nivel in niveis):
+        return PERFIL_BITONAL
+    return PERFIL_CINZA
+
+
+def _para_bitonal(img):
+    if img.mode == '1':
+        return img
+    cinza = img.convert('L')
+    minimo, maximo = cinza.getextrema()
+    limiar = (minimo + maximo) // 2 if maximo > minimo else 127
+    return cinza.point(lambda valor: 255 if valor > limiar else 0).convert('1', dither=Image.Dither.NONE)
+
+
+def _codificar_jpeg(img, qualidade):
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=qualidade, optimize=True)
+    espaco_cor = 'DeviceGray' if img.mode == 'L' else 'DeviceRGB'
+    return ImagemCodificada(img.width, img.height, espaco_cor, 8, 'DCTDecode', dados=buffer.getvalue())
+
+
+def _codificar_flate(img):
+    #'1' é empacotado em bits por linha (1 = branco), igual ao DeviceGray de 1 bit do PDF
+    bits = 1 if img.mode == '1' else 8
+    espaco_cor = 'DeviceRGB' if img.mode == 'RGB' else 'DeviceGray'
+    dados = zlib.compress(img.tobytes(), NIVEL_FLATE)
+    return ImagemCodificada(img.width, img.height, espaco_cor, bits, 'FlateDecode', dados=dados)
+
+
+def _codificar_g4(img):
+    #Usa o codificador CCITT G4 do libtiff (via Pillow) e extrai a faixa única do TIFF
+    if not features.check('libtiff'):
+        return None
+    buffer = io.BytesIO()
+    img.save(buffer, format='TIFF', compression='group4', strip_size=2**31 - 1)
+    buffer.seek(0)
+    with Image.open(buffer) as tiff:
+        offsets = tiff.tag_v2.get(273)
+        contagens = tiff.tag_v2.get(279)
+        if not offsets or len(offsets) != 1:
+            return None
+        invertido = tiff.tag_v2.get(262, 0) == 1
+    dados = buffer.getvalue()[offsets[0]:offsets[0] + contagens[0]]
+    parametros = {'K': -1, 'Columns': img.width, 'Rows': img.height, 'BlackIs1': False}
+    return ImagemCodificada(
+        img.width, img.height, 'DeviceGray', 1, 'CCITTFaxDecode', dados=dados,
+        parametros=parametros, decode=[1, 0] if invertido else None
+    )
+
+
+def codificar_pagina(img, perfil=PERFIL_AUTOMATICO, qualidade=70):
+    """Codifica uma página conforme o perfil, escolhendo o codec que gera o menor resultado"""
+    img = normalizar_modo(img)
+    with medir("classificacao_imagem"):
+        tipo = classificar_imagem(img) if perfil == PERFIL_AUTOMATICO else perfil
+
+    with medir(f"codificacao_{tipo}"):
+        if tipo == PERFIL_BITONAL:
+            bitonal = _para_bitonal(img)
+            candidatos = [_codificar_g4(bitonal), _codificar_flate(bitonal)]
+        elif tipo == PERFIL_CINZA:
+            cinza = img.convert('L')
+            candidatos = [_codificar_jpeg(cinza, qualidade), _codificar_flate(cinza)]
+        else:
+            candidatos = [_codificar_jpeg(img.convert('RGB'), qualidade)]
+
+    return min((c for c in candidatos if c is not None), key=lambda c: c.tamanho())
@@ -1,23 +1,40 @@
 import os
-import zipfile
-import tarfile
 import shutil
 import time
 import asyncio
 from pathlib import Path
 from PIL import Image
 import pypdfium2 as pdfium
-from docx2pdf import convert as docx2pdf_convert
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 import io
 import tempfile
+from model.motor import MotorConversao
+from model.gravacao import gravacao_atomica
+from model.cancelamento import TokenCancelamento, ConversaoCancelada, inicializar_processo, verificar_cancelamento
+from model.manifesto import ManifestoConversao
+from model.varredura import varrer_arquivos
+from model.divisor_paginas import DivisorPaginasPdf, intervalos_paginas
+from model.divisao_partes import DivisorPartesPdf
+from model.progresso import ProgressoConversao
+from model.extracao import extrair_todos_compactados, eh_compactado, nome_sem_extensao, membros_em_disco
+from model.metricas import medir, contar, definir, observar, iniciar_coleta, encerrar_coleta
+from model.deduplicacao import RegistroDeduplicacao
+from model.protecao import ArquivoProtegido, abrir_pdf, pdf_protegido
+from model.word import AgrupadorWord, EXTENSOES_WORD
+from model.recompressao import recomprimir_pdf
+from model.memoria import OrcamentoMemoria, estimar_arquivo, estimativa_com_paginas, memoria_intervalo
+from model.ordenacao import FilaConversao, estimar_trabalho, ORDEM_MAIORES_PRIMEIRO, ORDEM_VARREDURA, JANELA_ORDENACAO
+from model.pdf_direto import extrair_imagem_direta, gravar_pdf_imagem, posicao_na_pagina, pixels_na_pagina
+from model.codificacao import codificar_pagina, PERFIL_AUTOMATICO, PERFIL_COLORIDO
+from model.otimizacao import obter_cache, preparar_imagem, codificar_jpeg, buscar_parametros, precisa_reduzir, decodificar_reduzida
 
 #Configurações
-MAX_TAREFAS_SIMULTANEAS = 4
-PAGINAS_POR_LOTE = 150
-DPI_PDF = 100  # Reduzido de 150 para 100
+MAX_TAREFAS_SIMULTANEAS = os.cpu_count() or 4  # Um processo de conversão por núcleo
+MAX_MEMBROS_EM_DISCO = 2  # Membros de compactados copiados no TEMP_DIR ao mesmo tempo, por processo
+PAGINAS_POR_LOTE = 150  # Documentos com mais páginas são divididos em intervalos convertidos por processos diferentes
+DPI_PDF = 100  # Resolução das imagens nas páginas A4 e ao recomprimir PDFs (reduzido de 150 para 100)
 QUALIDADE_JPEG = 70  # Reduzido de 85 para 70
 MAX_TAMANHO_ARQUIVO_PADRAO = 1024 * 1024 * 1024  # 1GB em bytes
 
@@ -25,19 +42,65 @@ MAX_TAMANHO_ARQUIVO_PADRAO = 1024 * 1024 * 1024  # 1GB em bytes
 TEMP_DIR = Path(tempfile.gettempdir()) / "flet_converter_temp"
 TEMP_DIR.mkdir(exist_ok=True)
 
+EXTENSOES_SUPORTADAS = ['.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff', '.doc', '.docx']
+EXTENSOES_DIVISIVEIS = ['.pdf', '.tif', '.tiff']  # Formatos convertidos por intervalo de páginas (inicio/fim)
+
+def caminho_temporario(prefixo, sufixo):
+    #Nome único por tarefa dentro do TEMP_DIR (tarefas paralelas com arquivos de mesmo nome não colidem)
+    descritor, caminho = tempfile.mkstemp(prefix=prefixo, suffix=sufixo, dir=TEMP_DIR)
+    os.close(descritor)
+    return Path(caminho)
+
+class ItemConversao:
+    """Arquivo na fila de conversão: da própria origem ou membro de um compactado"""
+
+    def __init__(self, caminho, caminho_relativo, grupo=None):
+        self.caminho = caminho  # Arquivo a converter (para membros, uma cópia temporária)
+        self.caminho_relativo = caminho_relativo  # Posição espelhada no destino
+        self.grupo = grupo  # GrupoCompactado do membro (None para arquivos da origem)
+        self.estimativa = None  # EstimativaArquivo dos cabeçalhos, calculada uma vez na varredura
+        self.ja_convertido = None  # Resultado do manifesto, quando já consultado na varredura
+
+    @property
+    def nome(self):
+        if self.grupo:
+            return f"{self.grupo.caminho.name}/{self.caminho_relativo.name}"
+        return self.caminho.name
+
+
+class GrupoCompactado:
+    """Membros de um compactado: ele entra no manifesto só depois que todos forem convertidos"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.pendentes = 0
+        self.saidas = []
+        self.falhou = False
+        self.enumerado = False  # Todos os membros já foram colocados na fila
+
+    @property
+    def concluido(self):
+        return self.enumerado and self.pendentes == 0
+
+
 class ConversorModel:
     @staticmethod
     async def limpar_temp():
-        #Aqui limpa os arquivos temporários
+        #Aqui limpa os arquivos temporários (e as pastas membro_XXXX de membros de compactados)
         for file in TEMP_DIR.glob("*"):
             try:
-                file.unlink()
+                if file.is_dir() and not file.is_symlink():
+                    shutil.rmtree(file, ignore_errors=True)
+                else:
+                    file.unlink()
             except Exception as e:
                 print(f"[AVISO] Falha ao limpar arquivo temporário {file}: {e}")
 
     @staticmethod
     async def verificar_e_otimizar_tamanho(caminho_arquivo, qualidade_inicial=70, tamanho_maximo=None):
         """Verifica o tamanho do arquivo e otimiza se necessário"""
+        #Nunca altera o arquivo de origem: retorna o caminho da imagem a ser convertida
+        #(a própria origem ou uma cópia otimizada única no TEMP_DIR) ou None se não couber no limite
         if tamanho_maximo is None:
             tamanho_maximo = MAX_TAMANHO_ARQUIVO_PADRAO
             
@@ -45,60 +108,46 @@ class ConversorModel:
             tamanho_atual = caminho_arquivo.stat().st_size
             
             if tamanho_atual <= tamanho_maximo:
-                return True  # Arquivo está dentro do limite
+                return caminho_arquivo  # Arquivo está dentro do limite
                 
-            print(f"[AVISO] Arquivo {caminho_arquivo.name} excede 1GB ({tamanho_atual / (1024**3):.2f}GB)")
+            print(f"[AVISO] Arquivo {caminho_arquivo.name} excede o limite ({tamanho_atual / (1024**3):.2f}GB)")
+            contar("imagens_otimizadas")
             
-            # Tenta otimizar com diferentes qualidades
-            qualidades = [60, 50, 40, 30, 20]
-            
-            for qualidade in qualidades:
-                if qualidade >= qualidade_inicial:
-                    continue
-                    
-                # Cria arquivo temporário otimizado
-                temp_path = TEMP_DIR / f"otimizado_{caminho_arquivo.name}"
-                
-                try:
-                    with Image.open(caminho_arquivo) as img:
-                        if img.mode != 'RGB':
-                            img = img.convert('RGB')
-                        
-                        # Redimensiona se a imagem for muito grande
-                        largura, altura = img.size
-                        if largura > 4000 or altura > 4000:
-                            # Calcula nova escala mantendo proporção
-                            escala = min(4000 / largura, 4000 / altura)
-                            nova_largura = int(largura * escala)
-                            nova_altura = int(altura * escala)
-                            img = img.resize((nova_largura, nova_altura), Image.Resampling.LANCZOS)
-                        
-                        # Salva com qualidade reduzida
-                        img.save(temp_path, 'JPEG', quality=qualidade, optimize=True)
-                        
-                        # Verifica se o tamanho está adequado
-                        novo_tamanho = temp_path.stat().st_size
-                        if novo_tamanho <= tamanho_maximo:
-                            # Substitui o arquivo original
-                            temp_path.replace(caminho_arquivo)
-                            print(f"[INFO] Arquivo otimizado com qualidade {qualidade}%: {novo_tamanho / (1024**3):.2f}GB")
-                            return True
-                        else:
-                            temp_path.unlink()  # Remove arquivo temporário
-                            
-                except Exception as e:
-                    print(f"[ERRO] Falha ao otimizar com qualidade {qualidade}%: {e}")
-                    if temp_path.exists():
-                        temp_path.unlink()
-                    continue
-            
-            # Se chegou aqui, não conseguiu otimizar
-            print(f"[ERRO] Não foi possível otimizar {caminho_arquivo.name} para menos de 1GB")
-            return False
+            cache = obter_cache()
+            parametros = cache.obter(caminho_arquivo, tamanho_maximo)
+
+            # Decodifica a imagem uma única vez; as tentativas são codificadas em memória
+            with Image.open(caminho_arquivo) as img:
+                img = preparar_imagem(img)
+
+            resultado = None
+            if parametros:
+                # Reaproveita a qualidade/escala escolhidas em uma execução anterior
+                qualidade, escala = parametros
+                dados = codificar_jpeg(img, qualidade, escala)
+                if len(dados) <= tamanho_maximo:
+                    resultado = (qualidade, escala, dados)
+
+            if resultado is None:
+                with medir("otimizacao_tamanho"):
+                    resultado = buscar_parametros(img, tamanho_maximo, qualidade_inicial - 1)
+
+            if resultado is None:
+                print(f"[ERRO] Não foi possível otimizar {caminho_arquivo.name} para o tamanho máximo configurado")
+                return None
+
+            qualidade, escala, dados = resultado
+            cache.salvar(caminho_arquivo, tamanho_maximo, qualidade, escala)
+
+            # Grava o resultado em um arquivo temporário único; a origem fica intacta
+            temp_path = caminho_temporario("otimizado_", ".jpg")
+            temp_path.write_bytes(dados)
+            print(f"[INFO] Arquivo otimizado com qualidade {qualidade}% e escala {escala:.2f}: {len(dados) / (1024**3):.2f}GB")
+            return temp_path
             
         except Exception as e:
             print(f"[ERRO] Erro ao verificar tamanho do arquivo: {e}")
-            return False
+            return None
 
     @staticmethod
     async def dividir_pdf_grande(caminho_pdf, caminho_destino, tamanho_maximo=None):
@@ -107,52 +156,24 @@ class ConversorModel:
             tamanho_maximo = MAX_TAMANHO_ARQUIVO_PADRAO
             
         try:
-            pdf = pdfium.PdfDocument(caminho_pdf)
-            total_paginas = len(pdf)
-            
-            if total_paginas <= 1:
-                print(f"[AVISO] PDF tem apenas {total_paginas} página, não é possível dividir")
-                return False
-            
-            # Calcula quantas páginas por arquivo (tentando manter cada arquivo < 1GB)
-            paginas_por_arquivo = max(1, total_paginas // 2)
-            
-            arquivos_criados = []
-            for i in range(0, total_paginas, paginas_por_arquivo):
-                fim = min(i + paginas_por_arquivo, total_paginas)
-                
-                # Cria nome do arquivo dividido
-                nome_base = caminho_destino.stem
-                extensao = caminho_destino.suffix
-                parte = i // paginas_por_arquivo + 1
-                caminho_parte = caminho_destino.parent / f"{nome_base}_parte{parte}{extensao}"
-                
-                # Cria novo PDF com as páginas
-                novo_pdf = pdfium.PdfDocument.new()
-                paginas_para_importar = list(range(i, fim))
-                novo_pdf.import_pages(pdf, paginas_para_importar)
+            with DivisorPartesPdf(caminho_pdf) as divisor:
+                total_paginas = len(divisor)
                 
-                # Salva com compressão
-                novo_pdf.save(caminho_parte)
+                if total_paginas <= 1:
+                    print(f"[AVISO] PDF tem apenas {total_paginas} página, não é possível dividir")
+                    return False
                 
-                # Verifica tamanho
-                tamanho_parte = caminho_parte.stat().st_size
-                if tamanho_parte <= tamanho_maximo:
-                    arquivos_criados.append(caminho_parte)
-                    print(f"[INFO] Parte {parte} criada: {tamanho_parte / (1024**3):.2f}GB")
-                else:
-                    print(f"[AVISO] Parte {parte} ainda excede o limite: {tamanho_parte / (1024**3):.2f}GB")
-                    caminho_parte.unlink()
+                # Planeja as partes pelo custo estimado de cada página e grava em uma única passada
+                arquivos_criados = divisor.dividir(caminho_destino, tamanho_maximo)
             
-            # Remove o arquivo original se as partes foram criadas com sucesso
-            if arquivos_criados:
+            # Remove o arquivo original (todas as páginas estão nas partes)
+            if caminho_pdf.exists():
                 caminho_pdf.unlink()
-                print(f"[INFO] PDF dividido em {len(arquivos_criados)} partes")
-                return True
-            else:
-                print("[ERRO] Não foi possível criar partes menores do PDF")
-                return False
+            print(f"[INFO] PDF dividido em {len(arquivos_criados)} partes")
+            return True
                 
+        except ConversaoCancelada:
+            raise
         except Exception as e:
             print(f"[ERRO] Falha ao dividir PDF: {e}")
             return False
@@ -160,6 +181,7 @@ class ConversorModel:
     @staticmethod
     async def otimizar_pdf_existente(caminho_pdf, tamanho_maximo=None):
         """Tenta otimizar um PDF existente para reduzir seu tamanho"""
+        #Recomprime as imagens das páginas em DPI_PDF e QUALIDADE_JPEG; só divide se ainda não couber
         if tamanho_maximo is None:
             tamanho_maximo = MAX_TAMANHO_ARQUIVO_PADRAO
             
@@ -168,32 +190,27 @@ class ConversorModel:
             print(f"[INFO] Tentando otimizar PDF: {tamanho_original / (1024**3):.2f}GB")
             
             # Cria arquivo temporário otimizado
-            temp_path = TEMP_DIR / f"otimizado_{caminho_pdf.name}"
+            temp_path = caminho_temporario("otimizado_", ".pdf")
             
-            # Abre o PDF original
-            pdf = pdfium.PdfDocument(caminho_pdf)
-            
-            # Cria novo PDF com compressão máxima
-            novo_pdf = pdfium.PdfDocument.new()
-            
-            # Copia páginas com compressão
-            paginas_para_importar = list(range(len(pdf)))
-            novo_pdf.import_pages(pdf, paginas_para_importar)
-            
-            # Salva com compressão máxima
-            novo_pdf.save(temp_path)
+            # Reduz e recodifica as imagens (páginas só com texto/vetores ficam como estão)
+            with medir("recompressao_pdf"):
+                imagens_trocadas = recomprimir_pdf(caminho_pdf, temp_path, DPI_PDF, QUALIDADE_JPEG)
             
             # Verifica se a otimização foi bem-sucedida
             if temp_path.exists():
                 tamanho_otimizado = temp_path.stat().st_size
-                if tamanho_otimizado <= tamanho_maximo:
-                    # Substitui o arquivo original
+                if tamanho_otimizado < tamanho_original:
+                    # A versão recomprimida substitui o original mesmo se ainda precisar ser dividida
                     temp_path.replace(caminho_pdf)
+                    print(f"[INFO] {imagens_trocadas} imagens recomprimidas: {tamanho_otimizado / (1024**3):.2f}GB")
+                else:
+                    temp_path.unlink()
+                    tamanho_otimizado = tamanho_original
+                if tamanho_otimizado <= tamanho_maximo:
                     print(f"[INFO] PDF otimizado com sucesso: {tamanho_otimizado / (1024**3):.2f}GB")
                     return True
                 else:
                     print(f"[AVISO] PDF ainda excede o limite após otimização: {tamanho_otimizado / (1024**3):.2f}GB")
-                    temp_path.unlink()
                     
                     # Tenta dividir o PDF em partes menores
                     print("[INFO] Tentando dividir PDF em partes menores...")
@@ -205,6 +222,10 @@ class ConversorModel:
                 print("[ERRO] Falha ao criar PDF otimizado")
                 return False
                 
+        except (ConversaoCancelada, ArquivoProtegido):
+            if 'temp_path' in locals() and temp_path.exists():
+                temp_path.unlink()
+            raise
         except Exception as e:
             print(f"[ERRO] Falha ao otimizar PDF: {e}")
             if 'temp_path' in locals() and temp_path.exists():
@@ -212,7 +233,7 @@ class ConversorModel:
             return False
 
     @staticmethod
-    async def gerar_relatorio_erros(erros, arquivos_invalidos, arquivos_com_senha, pasta_destino):
+    async def gerar_relatorio_erros(erros, arquivos_invalidos, arquivos_com_senha, pasta_destino, resumo_deduplicacao=None):
         """Gera um relatório de erros em arquivo .txt"""
         try:
             # Cria o nome do arquivo com timestamp
@@ -263,6 +284,18 @@ class ConversorModel:
                     f.write("\n")
                     f.write("Estes arquivos foram movidos para a pasta: arquivos_com_senha\n")
 
+                # Seção de deduplicação (conteúdos repetidos convertidos uma vez só)
+                if resumo_deduplicacao and (resumo_deduplicacao['fontes_duplicadas'] or resumo_deduplicacao['paginas_duplicadas']):
+                    f.write("DEDUPLICAÇÃO:\n")
+                    f.write("-" * 30 + "\n")
+                    f.write(f"Política: {resumo_deduplicacao['politica']}\n")
+                    f.write(f"Arquivos repetidos (não convertidos de novo): {resumo_deduplicacao['fontes_duplicadas']}\n")
+                    f.write(f"Páginas repetidas: {resumo_deduplicacao['paginas_duplicadas']}\n")
+                    f.write(f"Espaço economizado: {resumo_deduplicacao['bytes_economizados'] / (1024**2):.1f} MB\n")
+                    for metodo, quantidade in sorted(resumo_deduplicacao['metodos'].items()):
+                        f.write(f"• {metodo}: {quantidade} arquivos\n")
+                    f.write("\n")
+
                 # Rodapé
                 f.write("\n" + "=" * 50 + "\n")
                 f.write(f"Relatório gerado em: {time.strftime('%d/%m/%Y %H:%M:%S')}\n")
@@ -274,11 +307,40 @@ class ConversorModel:
             return None
 
     @staticmethod
-    async def converter_para_pdf(origem, destino, atualizar_status=None, parar=False, tamanho_maximo=None):
+    async def converter_para_pdf(origem, destino, atualizar_status=None, parar=None, tamanho_maximo=None, max_processos=None,
+                                 incremental=True, usar_hash=False, perfil_compressao=PERFIL_AUTOMATICO, progresso=None,
+                                 metricas=None, ler_compactados=True, deduplicar=None, deduplicar_paginas=False,
+                                 backend_word=None, memoria_maxima=None, ordem=ORDEM_MAIORES_PRIMEIRO):
         #Converte arquivos para PDF com tratamento completo de erros
         #Gera um PDF por página para arquivos multipágina (PDF, imagens multipágina, DOCX)
+        #Cada arquivo é convertido em um processo do pool (max_processos, padrão: um por núcleo)
+        #parar: TokenCancelamento compartilhado com a interface (checado entre páginas)
+        #incremental: pula fontes que não mudaram desde a última conversão (manifesto no destino);
+        #usar_hash também compara o conteúdo quando só a data do arquivo mudou
+        #perfil_compressao: como as páginas de imagem são codificadas (ver model/codificacao.py)
+        #progresso: ProgressoConversao que recebe os eventos (padrão: um que entrega a atualizar_status a 10 Hz)
+        #metricas: "json" ou "prometheus" grava tempos por etapa e contadores ao lado do relatório (None = desligado)
+        #ler_compactados: converte os membros de ZIP/TAR direto do compactado, sem extraí-lo na origem;
+        #os PDFs vão para <pasta do compactado>/<nome do compactado>/<caminho do membro> no destino
+        #deduplicar: política (automatico, reflink, hardlink ou copia) para fontes de conteúdo idêntico,
+        #convertidas uma vez só e materializadas a partir da primeira (None = desligado);
+        #deduplicar_paginas também liga PDFs de página idênticos entre si (exceto com a política copia)
+        #backend_word: word, docx2pdf, libreoffice ou falso (ver model/word.py); o Word e o docx2pdf ficam
+        #abertos em cada processo do pool e só o LibreOffice junta documentos em lotes (ver AgrupadorWord)
+        #memoria_maxima: bytes que as tarefas em andamento podem ocupar juntas, pela estimativa dos cabeçalhos
+        #(padrão: metade da memória física); uma tarefa só entra no pool quando a estimativa dela cabe
+        #ordem: maiores_primeiro entrega aos processos o maior trabalho estimado (páginas, pixels) entre os
+        #arquivos já encontrados, para que nenhum arquivo enorme fique sozinho no fim; varredura mantém a ordem
+        #em que os arquivos são encontrados (ver model/ordenacao.py)
         #Retorna: (total_pdfs_gerados, erros_detalhados)
         
+        if isinstance(parar, TokenCancelamento):
+            cancelamento = parar
+        else:
+            cancelamento = TokenCancelamento()
+            if parar:
+                cancelamento.cancelar()
+
         await ConversorModel.limpar_temp()
         origem = Path(origem)
         destino = Path(destino)
@@ -300,167 +362,470 @@ class ConversorModel:
                 atualizar_status(f"⚠️ {erro}")
             return 0, [erro]
 
-        #Contagem e validação de arquivos
-        arquivos_para_processar = []
-        arquivos_invalidos = []
-        arquivos_com_senha = []
-        
-        for root, _, files in os.walk(origem):
-            for file in files:
-                caminho_arquivo = Path(root) / file
-                ext = caminho_arquivo.suffix.lower()
-                
-                if ext in ['.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff', '.doc', '.docx']:
-                    # Verifica se é um arquivo protegido
-                    protegido, _ = await ConversorModel.verificar_arquivo_protegido(caminho_arquivo)
-                    if protegido:
-                        arquivos_com_senha.append(caminho_arquivo)
-                    else:
-                        arquivos_para_processar.append(caminho_arquivo)
+        #Eventos de progresso agregados e entregues à interface em intervalo fixo
+        progresso = progresso or ProgressoConversao(atualizar_status)
+        progresso.iniciar()
+        #Métricas por etapa: coletadas neste processo e em cada processo do pool, depois somadas
+        coletor = iniciar_coleta() if metricas else None
+        try:
+            #Contagem e validação de arquivos (feitas durante a varredura)
+            arquivos_encontrados = 0
+            arquivos_invalidos = []
+            arquivos_com_senha = []
+
+            #Este é o processamento principal
+            arquivos_processados = 0
+            arquivos_concluidos = 0
+            arquivos_ignorados = 0
+            erros_detalhados = []
+            start_time = time.time()
+            max_processos = max_processos or MAX_TAREFAS_SIMULTANEAS
+            #Fila limitada: a varredura só avança um pouco à frente da conversão
+            #(com maiores_primeiro, uma janela maior, para que a ordenação tenha entre o que escolher)
+            janela = JANELA_ORDENACAO if ordem == ORDEM_MAIORES_PRIMEIRO else 0
+            fila = FilaConversao(ordem, max(janela, max_processos * 2))
+            motor = MotorConversao(max_processos, inicializar_processo, (cancelamento,))
+            manifesto = ManifestoConversao(destino, usar_hash) if incremental else None
+            deduplicacao = RegistroDeduplicacao(deduplicar, deduplicar_paginas) if deduplicar else None
+            agrupador_word = AgrupadorWord(motor, backend_word)
+            orcamento = OrcamentoMemoria(memoria_maxima)
+            #Membros de compactados copiados no TEMP_DIR e ainda não convertidos (limite próprio, menor que a fila)
+            vagas_membros = asyncio.Semaphore(max_processos * MAX_MEMBROS_EM_DISCO)
+
+            async def registrar_grupo(grupo):
+                #Compactado entra no manifesto quando o último membro termina sem erro nem interrupção
+                if grupo.concluido and not grupo.falhou and not cancelamento.cancelado and manifesto:
+                    await asyncio.to_thread(manifesto.registrar, grupo.caminho, grupo.saidas)
+
+            async def processar_arquivo(item):
+                caminho_arquivo = item.caminho
+                try:
+                    if cancelamento.cancelado:
+                        return
+                    await converter_item(item)
+                finally:
+                    if item.grupo:
+                        #A cópia temporária do membro já não é necessária
+                        await descartar_membro(caminho_arquivo)
+                        item.grupo.pendentes -= 1
+                        await registrar_grupo(item.grupo)
+
+            async def converter_no_pool(caminho_arquivo, destino_arquivo, estimativa=None):
+                #Word: o lote vira PDF no backend e o PDF de cada documento é dividido em páginas como os demais
+                if caminho_arquivo.suffix.lower() in EXTENSOES_WORD:
+                    pdf_word = caminho_temporario("word_", ".pdf")
+                    try:
+                        with medir("word_para_pdf"):
+                            try:
+                                await agrupador_word.converter(caminho_arquivo, pdf_word)
+                            except Exception as e:
+                                raise Exception(f"Falha ao converter Word: {str(e)}")
+                        return await converter_no_pool(pdf_word, destino_arquivo)
+                    finally:
+                        if pdf_word.exists():
+                            pdf_word.unlink()
+
+                #Estima o pico de memória pelos cabeçalhos: muitos arquivos pequenos rodam juntos,
+                #imagens enormes esperam até caberem no orçamento
+                if estimativa is None:
+                    with medir("estimativa_memoria"):
+                        estimativa = await asyncio.to_thread(estimar_arquivo, caminho_arquivo)
+
+                #Documento grande (PDF ou imagem multipágina): cada intervalo de PAGINAS_POR_LOTE páginas vai
+                #para um processo do pool, que abre o arquivo e grava só as suas páginas (mesmos nomes _paginaN).
+                #Os intervalos são fechados: se o processo que abriu o documento relatar mais páginas do que
+                #a estimativa, as que faltam são divididas da mesma forma, em vez de ficarem todas com um processo
+                if caminho_arquivo.suffix.lower() in EXTENSOES_DIVISIVEIS:
+                    intervalos = intervalos_paginas(max(estimativa.paginas, 1), PAGINAS_POR_LOTE)
                 else:
-                    arquivos_invalidos.append(caminho_arquivo.name)
-
-        # Processa arquivos protegidos
-        await ConversorModel.processar_arquivos_protegidos(arquivos_com_senha, pasta_senha, atualizar_status)
-
-        if not arquivos_para_processar and not arquivos_com_senha:
-            erro = "Nenhum arquivo suportado encontrado para conversão"
-            if atualizar_status:
-                atualizar_status(f"⚠️ {erro}")
-            return 0, [erro]
-
-        #Este é o processamento principal
-        arquivos_processados = 0
-        erros_detalhados = []
-        start_time = time.time()
-        semaforo = asyncio.Semaphore(MAX_TAREFAS_SIMULTANEAS)
-
-        async def processar_arquivo(caminho_arquivo):
-            nonlocal arquivos_processados, erros_detalhados
-            async with semaforo:
-                if parar:
-                    return
-
+                    intervalos = [(0, None)]
+                saidas = []
+                planejadas = intervalos[-1][1]
+                total_intervalos = 0
+                while intervalos:
+                    total_intervalos += len(intervalos)
+                    saidas_rodada, paginas = await converter_intervalos(caminho_arquivo, destino_arquivo, estimativa, intervalos, saidas)
+                    saidas.extend(saidas_rodada)
+                    intervalos = []
+                    if planejadas is not None and paginas > planejadas:
+                        estimativa = estimativa_com_paginas(estimativa, paginas)
+                        intervalos = intervalos_paginas(paginas, PAGINAS_POR_LOTE, planejadas)
+                        planejadas = paginas
+                if total_intervalos > 1:
+                    contar("documentos_divididos")
+                    contar("intervalos_paginas", total_intervalos)
+                return saidas
+
+            async def converter_intervalos(caminho_arquivo, destino_arquivo, estimativa, intervalos, saidas_anteriores):
+                #Converte os intervalos em paralelo; retorna os PDFs gerados e o total de páginas relatado
+                resultados = await asyncio.gather(*(
+                    converter_intervalo(caminho_arquivo, destino_arquivo, estimativa, inicio, fim)
+                    for inicio, fim in intervalos
+                ), return_exceptions=True)
+
+                #Falha em um intervalo é a falha do documento; se só houve interrupção, as páginas gravadas
+                #por todos os intervalos (inclusive os que terminaram e os das rodadas anteriores) entram na contagem
+                saidas = []
+                paginas = 0
+                paginas_interrompidas = 0
+                interrompido = False
+                for resultado in resultados:
+                    if isinstance(resultado, ConversaoCancelada):
+                        interrompido = True
+                        paginas_interrompidas += resultado.concluidos
+                    elif isinstance(resultado, BaseException):
+                        raise resultado
+                    else:
+                        saidas.extend(resultado[0])
+                        paginas = max(paginas, resultado[1])
+                if interrompido:
+                    raise ConversaoCancelada(concluidos=len(saidas_anteriores) + len(saidas) + paginas_interrompidas)
+                return saidas, paginas
+
+            async def converter_intervalo(caminho_arquivo, destino_arquivo, estimativa, inicio, fim):
+                #Executa a conversão em um processo do pool (um PDF por página)
+                argumentos = (caminho_arquivo, destino_arquivo, tamanho_maximo, inicio, fim, perfil_compressao)
+                with medir("espera_memoria"):
+                    reserva = await orcamento.reservar(memoria_intervalo(estimativa, inicio, fim))
                 try:
-                    caminho_relativo = caminho_arquivo.relative_to(origem)
-                    ext = caminho_arquivo.suffix.lower()
-                    
+                    if not coletor:
+                        return await motor.executar(converter_arquivo, *argumentos)
+                    with medir("arquivo"):
+                        saidas, paginas, metricas_processo = await motor.executar(converter_arquivo_com_metricas, *argumentos)
+                finally:
+                    orcamento.liberar(reserva)
+                coletor.mesclar(metricas_processo)
+                contar("paginas_geradas", len(saidas))
+                contar("bytes_gravados", sum(saida.stat().st_size for saida in saidas))
+                return saidas, paginas
+
+            async def converter_item(item):
+                nonlocal arquivos_processados, arquivos_concluidos, arquivos_ignorados, erros_detalhados
+                caminho_arquivo = item.caminho
+                try:
+                    #Fonte inalterada desde a última execução: reaproveita os PDFs já gerados
+                    #(membros de compactados são verificados pelo compactado inteiro, na varredura)
+                    with medir("manifesto"):
+                        ja_convertido = item.ja_convertido
+                        if ja_convertido is None:
+                            ja_convertido = manifesto and not item.grupo and await asyncio.to_thread(manifesto.ja_convertido, caminho_arquivo)
+                    if ja_convertido:
+                        arquivos_ignorados += 1
+                        arquivos_concluidos += 1
+                        progresso.ignorado(caminho_arquivo)
+                        return
+
+                    caminho_relativo = item.caminho_relativo
+                
                     #Define destino com extensão .pdf
                     destino_arquivo = destino / caminho_relativo
                     destino_arquivo = destino_arquivo.with_suffix('.pdf')
-                    
+                
                     #Cria estrutura de pastas
                     try:
                         destino_arquivo.parent.mkdir(parents=True, exist_ok=True)
                     except Exception as e:
                         raise Exception(f"Falha ao criar diretório: {e}")
 
-                    #Executa conversão conforme tipo de arquivo (um PDF por página)
-                    if ext == '.pdf':
-                        arquivos_gerados = await ConversorModel.converter_pdf_para_paginas_individuais(caminho_arquivo, destino_arquivo, tamanho_maximo)
-                    elif ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff']:
-                        arquivos_gerados = await ConversorModel.converter_imagem_multipagina_para_paginas_individuais(caminho_arquivo, destino_arquivo, tamanho_maximo)
-                    elif ext in ['.doc', '.docx']:
-                        arquivos_gerados = await ConversorModel.converter_word_para_paginas_individuais(caminho_arquivo, destino_arquivo, tamanho_maximo)
+                    progresso.iniciado(caminho_arquivo)
+                    saidas = None
+                    primeira = False
+                    if deduplicacao:
+                        #Conteúdo repetido: aguarda a primeira fonte igual e reaproveita os PDFs dela
+                        with medir("hash_fonte"):
+                            chave, original = await deduplicacao.reservar(caminho_arquivo)
+                        primeira = original is None
+                        resultado = None if primeira else await original
+                        if resultado is not None:
+                            saidas = await deduplicacao.materializar_fonte(resultado, destino_arquivo)
+                            contar("fontes_duplicadas")
+                        elif not primeira and cancelamento.cancelado:
+                            return
+
+                    if saidas is None:
+                        try:
+                            saidas = await converter_no_pool(caminho_arquivo, destino_arquivo, item.estimativa)
+                            if deduplicacao:
+                                contar("paginas_duplicadas", await deduplicacao.deduplicar_paginas(saidas))
+                        except BaseException:
+                            if primeira:
+                                deduplicacao.falhar(chave)
+                            raise
+                        if primeira:
+                            deduplicacao.concluir(chave, destino_arquivo, saidas)
+                    arquivos_gerados = len(saidas)
+                    if item.grupo:
+                        item.grupo.saidas.extend(saidas)
+                    elif manifesto:
+                        await asyncio.to_thread(manifesto.registrar, caminho_arquivo, saidas)
 
                     #Atualiza status (incrementa pelo número de PDFs gerados)
                     arquivos_processados += arquivos_gerados
-                    if atualizar_status:
-                        status_msg = (
-                            f"⏳ Convertendo: {caminho_arquivo.name} ({arquivos_gerados} PDFs gerados)\n"
-                            f"Progresso: {arquivos_processados} PDFs criados\n"
-                            f"Erros: {len(erros_detalhados)}"
-                        )
-                        atualizar_status(status_msg)
+                    arquivos_concluidos += 1
+                    tamanho_fonte = caminho_arquivo.stat().st_size
+                    progresso.concluido(caminho_arquivo, arquivos_gerados, tamanho_fonte)
+                    contar("arquivos_convertidos")
+                    contar("bytes_lidos", tamanho_fonte)
+
+                except ConversaoCancelada as e:
+                    #Páginas gravadas antes da parada continuam válidas
+                    arquivos_processados += e.concluidos
+
+                except ArquivoProtegido:
+                    await registrar_protegido(caminho_arquivo)
 
                 except Exception as e:
-                    erro_msg = f"{caminho_arquivo.name}: {type(e).__name__} - {str(e)}"
+                    if item.grupo:
+                        item.grupo.falhou = True
+                    erro_msg = f"{item.nome}: {type(e).__name__} - {str(e)}"
                     erros_detalhados.append(erro_msg)
-                    if atualizar_status:
-                        atualizar_status("", erro=erro_msg)  #Passa o erro para a interface
+                    contar("arquivos_com_erro")
+                    progresso.erro(erro_msg)  #Passa o erro para a interface
                     print(f"[ERRO] {erro_msg}")
 
-        #Executa tarefas em paralelo
-        tasks = [processar_arquivo(arquivo) for arquivo in arquivos_para_processar]
-        await asyncio.gather(*tasks)
-
-        #Gera relatório de erros
-        if erros_detalhados or arquivos_invalidos or arquivos_com_senha:
-            await ConversorModel.gerar_relatorio_erros(erros_detalhados, arquivos_invalidos, arquivos_com_senha, destino)
+            async def registrar_protegido(caminho_arquivo):
+                #Copia o arquivo com senha para a pasta de arquivos com senha
+                nonlocal arquivos_concluidos
+                arquivos_com_senha.append(caminho_arquivo)
+                arquivos_concluidos += 1
+                contar("arquivos_com_senha")
+                progresso.ignorado(caminho_arquivo)
+                await ConversorModel.processar_arquivos_protegidos([caminho_arquivo], pasta_senha, progresso.avisar)
+
+            async def descartar_membro(caminho_membro):
+                #Apaga a cópia temporária de um membro e libera a vaga dele para o próximo
+                await asyncio.to_thread(shutil.rmtree, caminho_membro.parent, True)
+                vagas_membros.release()
+
+            async def enfileirar_compactado(caminho_compactado):
+                #Lê os membros direto do compactado; no máximo MAX_MEMBROS_EM_DISCO por processo ficam
+                #copiados no TEMP_DIR ao mesmo tempo (o próximo só é copiado quando um deles termina)
+                nonlocal arquivos_encontrados, arquivos_concluidos, arquivos_ignorados
+                #Compactado já extraído ao lado (botão "Extrair ZIP"): a pasta extraída é convertida como
+                #arquivos comuns e os dois gravariam os mesmos PDFs, então o compactado fica de fora
+                pasta_extraida = caminho_compactado.parent / nome_sem_extensao(caminho_compactado)
+                if await asyncio.to_thread(pasta_extraida.is_dir):
+                    arquivos_encontrados += 1
+                    arquivos_ignorados += 1
+                    arquivos_concluidos += 1
+                    progresso.encontrado(caminho_compactado)
+                    progresso.ignorado(caminho_compactado)
+                    aviso = f"⚠️ {caminho_compactado.name} ignorado: já extraído em {pasta_extraida.name}/"
+                    progresso.avisar(aviso)
+                    print(f"[AVISO] {caminho_compactado.name} ignorado: a pasta extraída {pasta_extraida.name}/ é convertida no lugar dele")
+                    return
 
-        #Limpa arquivos temporários
-        await ConversorModel.limpar_temp()
+                if manifesto and await asyncio.to_thread(manifesto.ja_convertido, caminho_compactado):
+                    arquivos_encontrados += 1
+                    arquivos_ignorados += 1
+                    arquivos_concluidos += 1
+                    progresso.encontrado(caminho_compactado)
+                    progresso.ignorado(caminho_compactado)
+                    return
 
-        #Calcula tempo total e formata em HH:MM:SS
-        tempo_total = time.time() - start_time
-        horas = int(tempo_total // 3600)
-        minutos = int((tempo_total % 3600) // 60)
-        segundos = int(tempo_total % 60)
-        tempo_formatado = f"{horas:02d}:{minutos:02d}:{segundos:02d}"
+                grupo = GrupoCompactado(caminho_compactado)
+                pasta_relativa = caminho_compactado.relative_to(origem).parent / nome_sem_extensao(caminho_compactado)
+                try:
+                    async for membro, caminho_membro in membros_em_disco(
+                        caminho_compactado, TEMP_DIR, lambda nome: nome.suffix.lower() in EXTENSOES_SUPORTADAS,
+                        vagas=vagas_membros
+                    ):
+                        if caminho_membro is None:
+                            arquivos_invalidos.append(f"{caminho_compactado.name}/{membro.nome}")
+                            continue
+                        if cancelamento.cancelado:
+                            await descartar_membro(caminho_membro)
+                            break
+                        grupo.pendentes += 1
+                        arquivos_encontrados += 1
+                        progresso.encontrado(caminho_membro)
+                        await enfileirar(ItemConversao(caminho_membro, pasta_relativa / membro.nome, grupo))
+                except Exception as e:
+                    grupo.falhou = True
+                    erro_msg = f"{caminho_compactado.name}: {type(e).__name__} - {str(e)}"
+                    erros_detalhados.append(erro_msg)
+                    contar("arquivos_com_erro")
+                    progresso.erro(erro_msg)
+                    print(f"[ERRO] {erro_msg}")
+                finally:
+                    grupo.enumerado = True
+                    await registrar_grupo(grupo)
+
+            def avaliar_item(item):
+                #Roda fora do event loop: fonte inalterada não precisa de estimativa (sai da fila primeiro,
+                #sem ocupar a janela); as demais têm memória e páginas estimadas pelos cabeçalhos
+                if manifesto and not item.grupo:
+                    item.ja_convertido = manifesto.ja_convertido(item.caminho)
+                    if item.ja_convertido:
+                        return float('inf')
+                item.estimativa = estimar_arquivo(item.caminho)
+                return estimar_trabalho(item.caminho, item.estimativa)
+
+            async def enfileirar(item):
+                trabalho = 0
+                if ordem != ORDEM_VARREDURA:
+                    with medir("estimativa_trabalho"):
+                        trabalho = await asyncio.to_thread(avaliar_item, item)
+                if item.caminho.suffix.lower() in EXTENSOES_WORD:
+                    # Documentos Word na fila definem o tamanho dos lotes do LibreOffice
+                    agrupador_word.anunciar()
+                await fila.colocar(item, trabalho)
+
+            async def produzir():
+                #Varre a origem e alimenta a fila enquanto os consumidores já convertem
+                nonlocal arquivos_encontrados
+                try:
+                    #O destino pode estar dentro da origem: os PDFs gravados durante a varredura não voltam à fila
+                    async for caminho_arquivo in varrer_arquivos(origem, ignorar=[destino]):
+                        if cancelamento.cancelado:
+                            break
+                        ext = caminho_arquivo.suffix.lower()
+
+                        if ler_compactados and eh_compactado(caminho_arquivo):
+                            await enfileirar_compactado(caminho_arquivo)
+                        elif ext in EXTENSOES_SUPORTADAS:
+                            #A senha é descoberta no processo de conversão, ao abrir o arquivo
+                            arquivos_encontrados += 1
+                            progresso.encontrado(caminho_arquivo)
+                            await enfileirar(ItemConversao(caminho_arquivo, caminho_arquivo.relative_to(origem)))
+                        else:
+                            arquivos_invalidos.append(caminho_arquivo.name)
+                finally:
+                    await fila.encerrar(max_processos)
+
+            async def consumir():
+                while True:
+                    item = await fila.retirar()
+                    if item is None:
+                        break
+                    if item.caminho.suffix.lower() in EXTENSOES_WORD:
+                        agrupador_word.retirar_anuncio()
+                    await processar_arquivo(item)
+
+            #Varredura e conversão rodam juntas (produtor/consumidores)
+            try:
+                async with motor:
+                    consumidores = [asyncio.create_task(consumir()) for _ in range(max_processos)]
+                    try:
+                        await produzir()
+                    finally:
+                        await asyncio.gather(*consumidores)
+            finally:
+                if manifesto:
+                    manifesto.fechar()
+
+            if not arquivos_encontrados and not arquivos_com_senha and not cancelamento.cancelado:
+                erro = "Nenhum arquivo suportado encontrado para conversão"
+                progresso.finalizar(f"⚠️ {erro}")
+                return 0, [erro]
+
+            #Gera relatório de erros (e o resumo da deduplicação, quando houve repetições)
+            resumo_deduplicacao = deduplicacao.resumo() if deduplicacao else None
+            houve_duplicados = resumo_deduplicacao and (resumo_deduplicacao['fontes_duplicadas'] or resumo_deduplicacao['paginas_duplicadas'])
+            if erros_detalhados or arquivos_invalidos or arquivos_com_senha or houve_duplicados:
+                await ConversorModel.gerar_relatorio_erros(
+                    erros_detalhados, arquivos_invalidos, arquivos_com_senha, destino, resumo_deduplicacao
+                )
 
-        if atualizar_status:
-            if erros_detalhados:
-                atualizar_status(
+            #Grava as métricas ao lado do relatório
+            if coletor:
+                contar("arquivos_ignorados", arquivos_ignorados)
+                if deduplicacao:
+                    contar("bytes_deduplicados", deduplicacao.bytes_economizados)
+                contar("tarefas_aguardaram_memoria", orcamento.esperas)
+                definir("memoria_estimada_maxima", orcamento.maior_uso)
+                observar("conversao_total", time.time() - start_time)
+                caminho_metricas = coletor.gravar(destino, metricas)
+                print(f"[INFO] Métricas gravadas em: {caminho_metricas}")
+
+            #Limpa arquivos temporários
+            await ConversorModel.limpar_temp()
+
+            #Calcula tempo total e formata em HH:MM:SS
+            tempo_total = time.time() - start_time
+            horas = int(tempo_total // 3600)
+            minutos = int((tempo_total % 3600) // 60)
+            segundos = int(tempo_total % 60)
+            tempo_formatado = f"{horas:02d}:{minutos:02d}:{segundos:02d}"
+            linha_duplicados = f"\nArquivos repetidos (convertidos uma vez): {deduplicacao.fontes_duplicadas}" if houve_duplicados else ""
+
+            #Mensagem final: entregue na hora, sem esperar o próximo intervalo
+            if cancelamento.cancelado:
+                progresso.finalizar(
+                    f"⚠️ Conversão interrompida em {tempo_formatado}\n"
+                    f"Arquivos concluídos: {arquivos_concluidos} de {arquivos_encontrados}\n"
+                    f"Total de PDFs gerados: {arquivos_processados}"
+                )
+            elif arquivos_ignorados and not erros_detalhados:
+                progresso.finalizar(
+                    f"✅ Conversão concluída com sucesso em {tempo_formatado}\n"
+                    f"Total de PDFs gerados: {arquivos_processados}\n"
+                    f"Arquivos já convertidos (sem alteração): {arquivos_ignorados}"
+                    f"{linha_duplicados}"
+                )
+            elif erros_detalhados:
+                progresso.finalizar(
                     f"⚠️ Conversão concluída em {tempo_formatado}\n"
                     f"Total de PDFs gerados: {arquivos_processados}\n"
                     f"Total de erros: {len(erros_detalhados)}"
+                    f"{linha_duplicados}"
                 )
             else:
-                atualizar_status(
+                progresso.finalizar(
                     f"✅ Conversão concluída com sucesso em {tempo_formatado}\n"
                     f"Total de PDFs gerados: {arquivos_processados}"
+                    f"{linha_duplicados}"
                 )
 
-        return arquivos_processados, erros_detalhados
+            return arquivos_processados, erros_detalhados
+        finally:
+            progresso.encerrar()
+            if coletor:
+                encerrar_coleta()
 
     @staticmethod
-    async def converter_pdf_para_paginas_individuais(caminho_origem, caminho_destino, tamanho_maximo=None):
-        """Converte um PDF em múltiplos PDFs, um para cada página"""
+    async def converter_pdf_para_paginas_individuais(caminho_origem, caminho_destino, tamanho_maximo=None, inicio=0, fim=None,
+                                                     contagem=None):
+        """Converte um PDF em múltiplos PDFs, um para cada página (retorna a lista de PDFs gerados)"""
+        #inicio/fim limitam a conversão a um intervalo de páginas, para dividir um PDF grande entre processos
+        #contagem (dicionário) recebe em 'paginas' o total de páginas do documento aberto
         try:
-            # Abre o PDF original
-            pdf = pdfium.PdfDocument(caminho_origem)
-            total_paginas = len(pdf)
-            
-            if total_paginas <= 1:
-                # Se tem apenas uma página, converte normalmente
-                await ConversorModel.ajustar_pdf(caminho_origem, caminho_destino, tamanho_maximo)
-                return 1
-            
-            # Para múltiplas páginas, cria um PDF por página
-            arquivos_criados = 0
-            nome_base = caminho_destino.stem
-            extensao = caminho_destino.suffix
-            
-            for i in range(total_paginas):
-                # Cria nome do arquivo para esta página
-                caminho_pagina = caminho_destino.parent / f"{nome_base}_pagina{i+1}{extensao}"
-                
-                # Cria novo PDF com apenas esta página
-                novo_pdf = pdfium.PdfDocument.new()
-                novo_pdf.import_pages(pdf, [i])
+            # Abre o PDF original uma única vez para todas as páginas do intervalo
+            with DivisorPaginasPdf(caminho_origem) as divisor:
+                total_paginas = len(divisor)
+                if contagem is not None:
+                    contagem['paginas'] = total_paginas
                 
-                # Salva com compressão
-                novo_pdf.save(caminho_pagina)
+                if total_paginas <= 1 and inicio == 0:
+                    # Se tem apenas uma página, converte normalmente (com o documento já aberto)
+                    await ConversorModel.ajustar_pdf(caminho_origem, caminho_destino, tamanho_maximo, divisor.pdf)
+                    return [caminho_destino]
                 
-                # Verifica se o PDF gerado não excede o limite
-                if caminho_pagina.exists():
-                    tamanho_pdf = caminho_pagina.stat().st_size
-                    tamanho_maximo_verificar = tamanho_maximo or MAX_TAMANHO_ARQUIVO_PADRAO
-                    if tamanho_pdf > tamanho_maximo_verificar:
-                        print(f"[AVISO] PDF da página {i+1} excede o limite ({tamanho_pdf / (1024**3):.2f}GB)")
-                        # Tenta otimizar o PDF
-                        await ConversorModel.otimizar_pdf_existente(caminho_pagina, tamanho_maximo_verificar)
-                    
-                    arquivos_criados += 1
+                # Para múltiplas páginas, cria um PDF por página
+                arquivos_criados = divisor.dividir(caminho_destino, inicio, fim)
+            
+            # Verifica se algum PDF gerado excede o limite
+            tamanho_maximo_verificar = tamanho_maximo or MAX_TAMANHO_ARQUIVO_PADRAO
+            for i, caminho_pagina in enumerate(arquivos_criados, start=inicio):
+                tamanho_pdf = caminho_pagina.stat().st_size
+                if tamanho_pdf > tamanho_maximo_verificar:
+                    print(f"[AVISO] PDF da página {i+1} excede o limite ({tamanho_pdf / (1024**3):.2f}GB)")
+                    # Tenta otimizar o PDF
+                    await ConversorModel.otimizar_pdf_existente(caminho_pagina, tamanho_maximo_verificar)
             
             return arquivos_criados
             
+        except (ConversaoCancelada, ArquivoProtegido):
+            raise
         except Exception as e:
             raise Exception(f"Falha ao converter PDF para páginas individuais: {str(e)}")
 
     @staticmethod
-    async def converter_imagem_multipagina_para_paginas_individuais(caminho_origem, caminho_destino, tamanho_maximo=None):
-        """Converte uma imagem multipágina em múltiplos PDFs, um para cada página"""
+    async def converter_imagem_multipagina_para_paginas_individuais(caminho_origem, caminho_destino, tamanho_maximo=None, inicio=0, fim=None,
+                                                                    perfil_compressao=PERFIL_AUTOMATICO, contagem=None):
+        """Converte uma imagem multipágina em múltiplos PDFs, um para cada página (retorna a lista de PDFs gerados)"""
+        #Os quadros são decodificados e gravados um de cada vez: o pico de memória não depende do número de páginas
+        #inicio/fim limitam a conversão a um intervalo de quadros; contagem recebe o total de quadros em 'paginas'
         try:
             # Verifica se o arquivo existe e tem tamanho
             if not caminho_origem.exists():
@@ -469,88 +834,43 @@ class ConversorModel:
             if caminho_origem.stat().st_size == 0:
                 raise Exception("Arquivo está vazio")
 
-            # Verifica e otimiza o tamanho da imagem antes da conversão
-            otimizado = await ConversorModel.verificar_e_otimizar_tamanho(caminho_origem, QUALIDADE_JPEG, tamanho_maximo)
-            if not otimizado:
-                raise Exception("Imagem muito grande e não foi possível otimizar para o tamanho máximo configurado")
-
+            # O limite de tamanho da origem é tratado por converter_imagem_para_pdf (imagem única);
+            # em imagens multipágina cada PDF de página é verificado depois de gravado
             try:
                 with Image.open(caminho_origem) as img:
                     # Verifica se a imagem foi carregada corretamente
                     if img.size[0] == 0 or img.size[1] == 0:
                         raise Exception("Imagem inválida: dimensões zero")
 
-                    # Verifica se é uma imagem multipágina
-                    try:
-                        # Tenta acessar múltiplas páginas
-                        paginas = []
-                        i = 0
-                        while True:
-                            try:
-                                img.seek(i)
-                                paginas.append(img.copy())
-                                i += 1
-                            except EOFError:
-                                break
-                    except:
-                        # Se não conseguiu acessar múltiplas páginas, trata como imagem única
-                        paginas = [img]
-
-                    if len(paginas) <= 1:
+                    # Verifica se é uma imagem multipágina pelo número de quadros do cabeçalho (sem decodificar)
+                    total_quadros = getattr(img, "n_frames", 1)
+                    if contagem is not None:
+                        contagem['paginas'] = total_quadros
+
+                    if total_quadros <= 1 and inicio == 0:
                         # Se tem apenas uma página, converte normalmente
-                        await ConversorModel.converter_imagem_para_pdf(caminho_origem, caminho_destino, tamanho_maximo)
-                        return 1
+                        await ConversorModel.converter_imagem_para_pdf(caminho_origem, caminho_destino, tamanho_maximo, perfil_compressao)
+                        return [caminho_destino]
 
                     # Para múltiplas páginas, cria um PDF por página
-                    arquivos_criados = 0
+                    arquivos_criados = []
                     nome_base = caminho_destino.stem
                     extensao = caminho_destino.suffix
 
-                    for i, pagina_img in enumerate(paginas):
+                    fim_quadros = total_quadros if fim is None else min(fim, total_quadros)
+
+                    for i in range(inicio, fim_quadros):
+                        # Para entre páginas se o usuário interrompeu a conversão
+                        verificar_cancelamento(len(arquivos_criados))
+
+                        # Posiciona no quadro; só ele é decodificado nesta iteração
+                        img.seek(i)
+
                         # Cria nome do arquivo para esta página
                         caminho_pagina = caminho_destino.parent / f"{nome_base}_pagina{i+1}{extensao}"
 
-                        # Converte para RGB se necessário
-                        if pagina_img.mode in ['RGBA', 'LA']:
-                            background = Image.new('RGB', pagina_img.size, (255, 255, 255))
-                            background.paste(pagina_img, mask=pagina_img.split()[-1])
-                            pagina_img = background
-                        elif pagina_img.mode != 'RGB':
-                            pagina_img = pagina_img.convert('RGB')
-
-                        # Calcula dimensões para A4
-                        largura_a4, altura_a4 = A4
-                        largura_img, altura_img = pagina_img.size
-                        
-                        # Calcula escala para caber na página
-                        escala_largura = largura_a4 / largura_img
-                        escala_altura = altura_a4 / altura_img
-                        escala = min(escala_largura, escala_altura)
-                        
-                        # Calcula novas dimensões
-                        nova_largura = largura_img * escala
-                        nova_altura = altura_img * escala
-                        
-                        # Calcula posição central
-                        x = (largura_a4 - nova_largura) / 2
-                        y = (altura_a4 - nova_altura) / 2
-
-                        # Cria PDF
-                        buffer = io.BytesIO()
-                        c = canvas.Canvas(buffer, pagesize=A4)
-                        
-                        # Comprime a imagem antes de adicionar ao PDF
-                        img_buffer = io.BytesIO()
-                        pagina_img.save(img_buffer, format='JPEG', quality=QUALIDADE_JPEG, optimize=True)
-                        img_buffer.seek(0)
-                        
-                        c.drawImage(ImageReader(img_buffer), x, y, width=nova_largura, height=nova_altura)
-                        c.save()
-                        
-                        # Salva PDF
-                        buffer.seek(0)
-                        with open(caminho_pagina, 'wb') as f:
-                            f.write(buffer.getvalue())
+                        with medir("pagina_imagem"):
+                            await ConversorModel.gravar_pagina_imagem(img, caminho_origem, caminho_pagina, perfil_compressao)
 
                         # Verifica se o PDF gerado não excede o limite
                         if caminho_pagina.exists():
@@ -561,7 +881,7 @@ class ConversorModel:
                                 # Tenta otimizar o PDF
                                 await ConversorModel.otimizar_pdf_existente(caminho_pagina, tamanho_maximo_verificar)
                             
-                            arquivos_criados += 1
+                            arquivos_criados.append(caminho_pagina)
 
                     return arquivos_criados
 
@@ -575,32 +895,14 @@ class ConversorModel:
                 else:
                     raise Exception(f"Erro ao abrir imagem: {str(e)}")
 
+        except ConversaoCancelada:
+            raise
         except Exception as e:
             raise Exception(f"Falha ao converter imagem multipágina para páginas individuais: {str(e)}")
 
     @staticmethod
-    async def converter_word_para_paginas_individuais(caminho_origem, caminho_destino, tamanho_maximo=None):
-        """Converte um arquivo Word em múltiplos PDFs, um para cada página"""
-        try:
-            # Primeiro converte o DOCX para PDF
-            pdf_temp = caminho_destino.parent / f"temp_{caminho_destino.name}"
-            await ConversorModel.converter_word_para_pdf(caminho_origem, pdf_temp)
-            
-            # Depois divide o PDF resultante em páginas individuais
-            arquivos_criados = await ConversorModel.converter_pdf_para_paginas_individuais(pdf_temp, caminho_destino, tamanho_maximo)
-            
-            # Remove o arquivo temporário
-            if pdf_temp.exists():
-                pdf_temp.unlink()
-            
-            return arquivos_criados
-            
-        except Exception as e:
-            raise Exception(f"Falha ao converter Word para páginas individuais: {str(e)}")
-
-    @staticmethod
-    async def converter_imagem_para_pdf(caminho_origem, caminho_destino, tamanho_maximo=None):
-        #Converte uma imagem para PDF usando Pillow e ReportLab
+    async def converter_imagem_para_pdf(caminho_origem, caminho_destino, tamanho_maximo=None, perfil_compressao=PERFIL_AUTOMATICO):
+        #Converte uma imagem para PDF (embute JPEG/G4 direto, ou recodifica com Pillow e ReportLab)
         try:
             #Verifica se o arquivo existe e tem tamanho
             if not caminho_origem.exists():
@@ -609,59 +911,21 @@ class ConversorModel:
             if caminho_origem.stat().st_size == 0:
                 raise Exception("Arquivo está vazio")
 
-            # Verifica e otimiza o tamanho da imagem antes da conversão
-            otimizado = await ConversorModel.verificar_e_otimizar_tamanho(caminho_origem, QUALIDADE_JPEG, tamanho_maximo)
-            if not otimizado:
+            # Verifica e otimiza o tamanho da imagem antes da conversão (sem alterar a origem)
+            caminho_imagem = await ConversorModel.verificar_e_otimizar_tamanho(caminho_origem, QUALIDADE_JPEG, tamanho_maximo)
+            if caminho_imagem is None:
                 raise Exception("Imagem muito grande e não foi possível otimizar para o tamanho máximo configurado")
 
             #Tenta abrir a imagem com tratamento específico para TIFF
             try:
-                with Image.open(caminho_origem) as img:
+                with Image.open(caminho_imagem) as img:
                     #Verifica se a imagem foi carregada corretamente
                     if img.size[0] == 0 or img.size[1] == 0:
                         raise Exception("Imagem inválida: dimensões zero")
 
-                    #Converte para RGB se necessário
-                    if img.mode in ['RGBA', 'LA']:
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        background.paste(img, mask=img.split()[-1])
-                        img = background
-                    elif img.mode != 'RGB':
-                        img = img.convert('RGB')
-
-                    #Calcula dimensões para A4
-                    largura_a4, altura_a4 = A4
-                    largura_img, altura_img = img.size
-                    
-                    #Calcula escala para caber na página
-                    escala_largura = largura_a4 / largura_img
-                    escala_altura = altura_a4 / altura_img
-                    escala = min(escala_largura, escala_altura)
-                    
-                    #Calcula novas dimensões
-                    nova_largura = largura_img * escala
-                    nova_altura = altura_img * escala
-                    
-                    #Calcula posição central
-                    x = (largura_a4 - nova_largura) / 2
-                    y = (altura_a4 - nova_altura) / 2
-
-                    #Cria PDF
-                    buffer = io.BytesIO()
-                    c = canvas.Canvas(buffer, pagesize=A4)
-                    
-                    #Comprime a imagem antes de adicionar ao PDF
-                    img_buffer = io.BytesIO()
-                    img.save(img_buffer, format='JPEG', quality=QUALIDADE_JPEG, optimize=True)
-                    img_buffer.seek(0)
-                    
-                    c.drawImage(ImageReader(img_buffer), x, y, width=nova_largura, height=nova_altura)
-                    c.save()
-                    
-                    #Salva PDF
-                    buffer.seek(0)
-                    with open(caminho_destino, 'wb') as f:
-                        f.write(buffer.getvalue())
+                    #A versão otimizada (JPEG) segue direto para o PDF, sem recodificação
+                    with medir("pagina_imagem"):
+                        await ConversorModel.gravar_pagina_imagem(img, caminho_imagem, caminho_destino, perfil_compressao)
 
                     # Verifica se o PDF gerado não excede o limite
                     if caminho_destino.exists():
@@ -681,26 +945,91 @@ class ConversorModel:
                     raise Exception("Arquivo corrompido")
                 else:
                     raise Exception(f"Erro ao abrir imagem: {str(e)}")
+            finally:
+                if caminho_imagem != caminho_origem and caminho_imagem.exists():
+                    caminho_imagem.unlink()
 
         except Exception as e:
             raise Exception(f"Falha ao converter imagem: {str(e)}")
 
     @staticmethod
-    async def ajustar_pdf(caminho_origem, caminho_destino, tamanho_maximo=None):
+    async def gravar_pagina_imagem(img, caminho_origem, caminho_pdf, perfil_compressao=PERFIL_AUTOMATICO):
+        """Grava uma imagem (ou o quadro atual de uma imagem multipágina) em um PDF A4"""
+        #Pixels que a imagem realmente ocupa na página A4 a DPI_PDF: o excedente nem é decodificado
+        tamanho_alvo = pixels_na_pagina(*img.size, DPI_PDF)
+        reduzir = precisa_reduzir(img, tamanho_alvo)
+
+        #Caminho rápido: JPEG e TIFF G4 que já cabem na página são embutidos como estão no arquivo,
+        #sem decodificar, recodificar nem montar o PDF em memória
+        imagem_direta = None if reduzir else extrair_imagem_direta(img, caminho_origem)
+        if imagem_direta is not None and (perfil_compressao in [PERFIL_AUTOMATICO, PERFIL_COLORIDO] or imagem_direta.bits == 1):
+            contar("paginas_diretas")
+            with gravacao_atomica(caminho_pdf) as caminho_parcial:
+                gravar_pdf_imagem(caminho_parcial, imagem_direta)
+            return
+
+        #Decodifica aqui (o Pillow adiaria até o primeiro acesso aos pixels) para medir a etapa separadamente
+        with medir("decodificacao_imagem"):
+            if reduzir:
+                img = decodificar_reduzida(img, tamanho_alvo)
+                contar("imagens_reduzidas")
+            else:
+                img.load()
+
+        #Perfis por conteúdo: bitonal em G4/Flate, cinza em JPEG/Flate de 8 bits, o menor resultado vence
+        if perfil_compressao != PERFIL_COLORIDO:
+            imagem = codificar_pagina(img, perfil_compressao, QUALIDADE_JPEG)
+            with gravacao_atomica(caminho_pdf) as caminho_parcial:
+                gravar_pdf_imagem(caminho_parcial, imagem)
+            return
+
+        #Perfil colorido: converte para RGB, recodifica em JPEG e desenha com ReportLab
+        if img.mode in ['RGBA', 'LA']:
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        #Calcula a posição centralizada na página A4
+        x, y, nova_largura, nova_altura = posicao_na_pagina(*img.size)
+
+        #Comprime a imagem antes de adicionar ao PDF
+        img_buffer = io.BytesIO()
+        with medir("codificacao_colorido"):
+            img.save(img_buffer, format='JPEG', quality=QUALIDADE_JPEG, optimize=True)
+        img_buffer.seek(0)
+
+        #Desenha direto no arquivo de saída
+        with medir("gravacao_pdf"), gravacao_atomica(caminho_pdf) as caminho_parcial:
+            c = canvas.Canvas(str(caminho_parcial), pagesize=A4)
+            c.drawImage(ImageReader(img_buffer), x, y, width=nova_largura, height=nova_altura)
+            c.save()
+
+    @staticmethod
+    async def ajustar_pdf(caminho_origem, caminho_destino, tamanho_maximo=None, pdf=None):
         #Otimiza e ajusta PDFs existentes
+        #`pdf`: documento já aberto por quem chama (não é aberto de novo nem fechado aqui)
+        aberto_aqui = pdf is None
         try:
             #Abre o PDF
-            pdf = pdfium.PdfDocument(caminho_origem)
+            if aberto_aqui:
+                pdf = abrir_pdf(caminho_origem)
             
             #Cria novo PDF
             novo_pdf = pdfium.PdfDocument.new()
             
-            #Copia páginas
-            for i in range(len(pdf)):
-                novo_pdf.import_pages(pdf, [i])
-            
-            #Salva otimizado com compressão
-            novo_pdf.save(caminho_destino)
+            try:
+                #Copia todas as páginas em uma única importação
+                novo_pdf.import_pages(pdf)
+                
+                #Salva otimizado com compressão
+                with medir("pdfium_save"), gravacao_atomica(caminho_destino) as caminho_parcial:
+                    novo_pdf.save(caminho_parcial)
+            finally:
+                novo_pdf.close()
+                if aberto_aqui:
+                    pdf.close()
             
             # Verifica se o PDF otimizado não excede o limite
             if caminho_destino.exists():
@@ -711,28 +1040,20 @@ class ConversorModel:
                     # Tenta otimizar ainda mais
                     await ConversorModel.otimizar_pdf_existente(caminho_destino, tamanho_maximo_verificar)
             
+        except ArquivoProtegido:
+            raise
         except Exception as e:
             raise Exception(f"Falha ao ajustar PDF: {str(e)}")
 
-    @staticmethod
-    async def converter_word_para_pdf(caminho_origem, caminho_destino):
-        #Converte arquivos Word para PDF
-        try:
-            docx2pdf_convert(caminho_origem, caminho_destino)
-        except Exception as e:
-            raise Exception(f"Falha ao converter Word: {str(e)}")
-
     @staticmethod
     async def verificar_arquivo_protegido(caminho_arquivo):
         #Verifica se um arquivo está protegido por senha
+        #Lê só o começo e o fim do arquivo; o documento é carregado (e fechado) apenas se houver /Encrypt
         try:
-            if caminho_arquivo.suffix.lower() == '.pdf':
-                pdf = pdfium.PdfDocument(caminho_arquivo)
-                return False, None
+            if caminho_arquivo.suffix.lower() == '.pdf' and await asyncio.to_thread(pdf_protegido, caminho_arquivo):
+                return True, "PDF protegido por senha"
             return False, None
-        except Exception as e:
-            if "password" in str(e).lower():
-                return True, str(e)
+        except Exception:
             return False, None
 
     @staticmethod
@@ -757,35 +1078,54 @@ class ConversorModel:
                 if atualizar_status:
                     atualizar_status(f"⚠️ Arquivo com senha movido: {arquivo.name}")
 
-def extrair_todos_zips(caminho_origem, atualizar_status=None):
-    #Extrai todos os arquivos ZIP encontrados
-    caminho_origem = Path(caminho_origem)
-    arquivos_processados = 0
-    erros = []
-
-    for root, _, files in os.walk(caminho_origem):
-        for file in files:
-            if file.lower().endswith('.zip'):
-                try:
-                    caminho_arquivo = Path(root) / file
-                    pasta_destino = caminho_arquivo.parent / caminho_arquivo.stem
-                    
-                    #Cria pasta de destino
-                    pasta_destino.mkdir(parents=True, exist_ok=True)
-                    
-                    #Extrai arquivo
-                    with zipfile.ZipFile(caminho_arquivo, 'r') as zip_ref:
-                        zip_ref.extractall(pasta_destino)
-                    
-                    arquivos_processados += 1
-                    if atualizar_status:
-                        atualizar_status(f"✅ Extraído: {file}")
+def converter_arquivo(caminho_arquivo, destino_arquivo, tamanho_maximo=None, inicio=0, fim=None, perfil_compressao=PERFIL_AUTOMATICO):
+    #Converte um único arquivo PDF ou imagem; roda dentro de um processo do MotorConversao
+    #Precisa ser uma função de módulo para poder ser enviada (pickle) ao processo
+    #inicio/fim permitem que vários processos dividam as páginas de um mesmo PDF ou TIFF
+    #Documentos Word não passam por aqui: o AgrupadorWord os converte em PDF e esse PDF é que vem para cá
+    #Retorna (PDFs gerados, páginas do documento): quem divide o documento replaneja os intervalos
+    #pelo total real se a estimativa ficou abaixo
+    ext = caminho_arquivo.suffix.lower()
+    contagem = {}
+    if ext == '.pdf':
+        conversao = ConversorModel.converter_pdf_para_paginas_individuais(
+            caminho_arquivo, destino_arquivo, tamanho_maximo, inicio, fim, contagem
+        )
+    elif ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff']:
+        conversao = ConversorModel.converter_imagem_multipagina_para_paginas_individuais(
+            caminho_arquivo, destino_arquivo, tamanho_maximo, inicio, fim, perfil_compressao, contagem
+        )
+    else:
+        raise Exception(f"Formato não suportado: {ext}")
+    saidas = resolver_saidas(asyncio.run(conversao))
+    return saidas, contagem.get('paginas', 0)
+
+def converter_arquivo_com_metricas(*argumentos):
+    #Mesma conversão, devolvendo também as métricas coletadas neste processo do pool
+    coletor = iniciar_coleta()
+    try:
+        saidas, paginas = converter_arquivo(*argumentos)
+    finally:
+        encerrar_coleta()
+    return saidas, paginas, coletor.exportar()
+
+def resolver_saidas(saidas):
+    #PDFs que passaram do limite podem ter sido divididos em _parteN pelo dividir_pdf_grande
+    resolvidas = []
+    for saida in saidas:
+        if saida.exists():
+            resolvidas.append(saida)
+        else:
+            resolvidas.extend(sorted(
+                saida.parent.glob(f"{saida.stem}_parte*{saida.suffix}"),
+                key=lambda parte: int(parte.stem.rsplit("_parte", 1)[1])
+            ))
+    return resolvidas
 
-                except Exception as e:
-                    erro = f"{file}: {str(e)}"
-                    erros.append(erro)
-                    if atualizar_status:
-                        atualizar_status("", erro=erro)
+def extrair_todos_zips(caminho_origem, atualizar_status=None):
+    #Extrai todos os compactados encontrados (ZIP e TAR .gz/.bz2/.xz, inclusive aninhados)
+    #Vários compactados são extraídos ao mesmo tempo, com limites contra bombas de descompactação
+    extraidos, erros = extrair_todos_compactados(Path(caminho_origem), atualizar_status)
 
     if atualizar_status:
         if erros:
@@ -793,4 +1133,4 @@ def extrair_todos_zips(caminho_origem, atualizar_status=None):
         else:
             atualizar_status(f"✅ Extração concluída com sucesso")
 
-    return arquivos_processados, erros
\ No newline at end of file
+    return extraidos, erros
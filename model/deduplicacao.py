@@ -0,0 +1,169 @@
+import os
+import re
+import sys
+import shutil
+import asyncio
+import hashlib
+from pathlib import Path
+from model.gravacao import gravacao_atomica
+from model.manifesto import calcular_hash, TAMANHO_BLOCO_HASH
+
+try:
+    import fcntl  # Unix
+except ImportError:
+    fcntl = None
+
+#Como as saídas de uma fonte repetida são criadas a partir das da primeira
+POLITICA_AUTOMATICA = "automatico"  # reflink, senão hardlink, senão cópia
+POLITICA_REFLINK = "reflink"  # Cópia com blocos compartilhados (Btrfs, XFS); cai para cópia
+POLITICA_HARDLINK = "hardlink"  # Mesmo arquivo com dois nomes; cai para cópia entre discos diferentes
+POLITICA_COPIA = "copia"
+POLITICAS_DEDUPLICACAO = [POLITICA_AUTOMATICA, POLITICA_REFLINK, POLITICA_HARDLINK, POLITICA_COPIA]
+
+_ORDEM_METODOS = {
+    POLITICA_AUTOMATICA: [POLITICA_REFLINK, POLITICA_HARDLINK, POLITICA_COPIA],
+    POLITICA_REFLINK: [POLITICA_REFLINK, POLITICA_COPIA],
+    POLITICA_HARDLINK: [POLITICA_HARDLINK, POLITICA_COPIA],
+    POLITICA_COPIA: [POLITICA_COPIA],
+}
+
+FICLONE = 0x40049409  # ioctl do Linux que clona os blocos de um arquivo
+
+#Identificador do trailer: o pdfium sorteia um a cada gravação, o resto do arquivo não muda
+_ID_TRAILER = re.compile(rb"/ID\s*\[\s*<[0-9A-Fa-f]*>\s*<[0-9A-Fa-f]*>\s*\]")
+TAMANHO_TRAILER = 4096
+
+
+def _reflink(origem, destino):
+    if fcntl is None or not sys.platform.startswith('linux'):
+        raise OSError("reflink indisponível neste sistema")
+    with open(origem, 'rb') as fonte, open(destino, 'wb') as saida:
+        fcntl.ioctl(saida.fileno(), FICLONE, fonte.fileno())
+
+
+def _hardlink(origem, destino):
+    os.link(origem, destino)
+
+
+def _copia(origem, destino):
+    shutil.copyfile(origem, destino)
+
+
+_METODOS = {POLITICA_REFLINK: _reflink, POLITICA_HARDLINK: _hardlink, POLITICA_COPIA: _copia}
+
+
+def materializar(origem, destino, politica=POLITICA_AUTOMATICA):
+    """Cria `destino` com o conteúdo de `origem` e retorna o método usado (reflink, hardlink ou copia)"""
+    #Também vale para um destino já existente: a troca é atômica (rename), e um hardlink
+    #regravado depois ganha um arquivo novo em vez de alterar o conteúdo compartilhado
+    destino = Path(destino)
+    metodos = _ORDEM_METODOS[politica]
+    with gravacao_atomica(destino) as caminho_parcial:
+        for metodo in metodos:
+            if caminho_parcial.exists():
+                caminho_parcial.unlink()
+            try:
+                _METODOS[metodo](origem, caminho_parcial)
+                return metodo
+            except OSError:
+                if metodo == metodos[-1]:
+                    raise
+
+
+def hash_pdf(caminho_pdf):
+    #SHA-256 do PDF sem o /ID do trailer: duas gravações da mesma página dão o mesmo hash
+    sha = hashlib.sha256()
+    tamanho = Path(caminho_pdf).stat().st_size
+    with open(caminho_pdf, 'rb') as f:
+        restante = max(tamanho - TAMANHO_TRAILER, 0)
+        while restante:
+            bloco = f.read(min(TAMANHO_BLOCO_HASH, restante))
+            if not bloco:
+                break
+            sha.update(bloco)
+            restante -= len(bloco)
+        sha.update(_ID_TRAILER.sub(b"", f.read()))
+    return sha.hexdigest()
+
+
+class RegistroDeduplicacao:
+    """Fontes (e, opcionalmente, páginas) já convertidas nesta execução, pelo hash do conteúdo"""
+
+    def __init__(self, politica=POLITICA_AUTOMATICA, paginas=False):
+        if politica not in _ORDEM_METODOS:
+            raise Exception(f"Política de deduplicação inválida: {politica}")
+        self.politica = politica
+        # Páginas iguais só economizam espaço se compartilharem os blocos no disco
+        self.paginas = paginas and politica != POLITICA_COPIA
+        self._fontes = {}  # hash -> Future com (destino, saidas) da primeira fonte com este conteúdo
+        self._paginas = {}  # hash -> PDF de página canônico
+        self.fontes_duplicadas = 0
+        self.paginas_duplicadas = 0
+        self.bytes_economizados = 0
+        self.metodos = {}  # método -> quantidade de arquivos materializados
+
+    async def reservar(self, caminho_fonte):
+        """Retorna (chave, None) para a primeira fonte com este conteúdo e (chave, futuro) para as repetidas"""
+        #Quem recebe None converte e chama concluir/falhar; as repetidas aguardam o futuro
+        chave = await asyncio.to_thread(calcular_hash, caminho_fonte)
+        futuro = self._fontes.get(chave)
+        if futuro is not None:
+            return chave, futuro
+        self._fontes[chave] = asyncio.get_running_loop().create_future()
+        return chave, None
+
+    def concluir(self, chave, destino_arquivo, saidas):
+        futuro = self._fontes[chave]
+        if not futuro.done():
+            futuro.set_result((destino_arquivo, list(saidas)))
+
+    def falhar(self, chave):
+        #A próxima fonte com este conteúdo volta a ser convertida; as que aguardavam convertem sozinhas
+        futuro = self._fontes.pop(chave, None)
+        if futuro is not None and not futuro.done():
+            futuro.set_result(None)
+
+    def _contar_metodo(self, metodo, tamanho):
+        self.metodos[metodo] = self.metodos.get(metodo, 0) + 1
+        if metodo != POLITICA_COPIA:
+            self.bytes_economizados += tamanho
+
+    async def materializar_fonte(self, original, destino_arquivo):
+        """Cria as saídas de uma fonte repetida a partir das saídas da primeira e retorna a lista"""
+        #<nome>.pdf, <nome>_paginaN.pdf e <nome>_parteN.pdf viram <outro nome>... na pasta do destino
+        destino_original, saidas_originais = original
+        prefixo = len(destino_original.stem)
+        saidas = []
+        for saida in saidas_originais:
+            nova_saida = destino_arquivo.parent / f"{destino_arquivo.stem}{saida.name[prefixo:]}"
+            if nova_saida != saida:
+                metodo = await asyncio.to_thread(materializar, saida, nova_saida, self.politica)
+                self._contar_metodo(metodo, saida.stat().st_size)
+            saidas.append(nova_saida)
+        self.fontes_duplicadas += 1
+        return saidas
+
+    async def deduplicar_paginas(self, saidas):
+        """Troca PDFs de página idênticos a um já gravado nesta execução por links para ele"""
+        if not self.paginas:
+            return 0
+        substituidas = 0
+        for saida in saidas:
+            chave = await asyncio.to_thread(hash_pdf, saida)
+            canonico = self._paginas.setdefault(chave, saida)
+            if canonico == saida or not canonico.exists():
+                continue
+            metodo = await asyncio.to_thread(materializar, canonico, saida, self.politica)
+            self._contar_metodo(metodo, canonico.stat().st_size)
+            substituidas += 1
+        self.paginas_duplicadas += substituidas
+        return substituidas
+
+    def resumo(self):
+        return {
+            'politica': self.politica,
+            'fontes_duplicadas': self.fontes_duplicadas,
+            'paginas_duplicadas': self.paginas_duplicadas,
+            'bytes_economizados': self.bytes_economizados,
+            'metodos': dict(self.metodos),
+        }
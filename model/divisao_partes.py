@@ -0,0 +1,145 @@
+import os
+import tempfile
+from pathlib import Path
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from model.cancelamento import verificar_cancelamento
+
+MARGEM_PLANEJAMENTO = 0.95  # Planeja as partes um pouco abaixo do limite, já que o custo é estimado
+
+
+def estimar_custos_paginas(pdf, tamanho_arquivo):
+    """Estima quantos bytes cada página ocupa no arquivo"""
+    #Imagens: tamanho do stream comprimido de cada objeto de imagem (sem decodificar).
+    #O restante do arquivo (texto, vetores, fontes, estrutura) é dividido igualmente entre as páginas.
+    custos_imagens = []
+    for indice in range(len(pdf)):
+        pagina = pdf[indice]
+        try:
+            custo = 0
+            for objeto in pagina.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]):
+                custo += pdfium_c.FPDFImageObj_GetImageDataRaw(objeto.raw, None, 0)
+            custos_imagens.append(custo)
+        finally:
+            pagina.close()
+
+    total_imagens = sum(custos_imagens)
+    if total_imagens > tamanho_arquivo:
+        # Imagens reaproveitadas em várias páginas são contadas mais de uma vez: normaliza
+        fator = tamanho_arquivo / total_imagens
+        return [custo * fator for custo in custos_imagens]
+    restante = (tamanho_arquivo - total_imagens) / max(1, len(pdf))
+    return [custo + restante for custo in custos_imagens]
+
+
+def planejar_partes(custos, tamanho_maximo):
+    """Agrupa páginas consecutivas em intervalos (inicio, fim) cujo custo estimado cabe no limite"""
+    limite = tamanho_maximo * MARGEM_PLANEJAMENTO
+    partes = []
+    inicio = 0
+    acumulado = 0
+    for indice, custo in enumerate(custos):
+        if indice > inicio and acumulado + custo > limite:
+            partes.append((inicio, indice))
+            inicio = indice
+            acumulado = 0
+        acumulado += custo
+    if inicio < len(custos):
+        partes.append((inicio, len(custos)))
+    return partes
+
+
+def _ponto_de_corte(custos, inicio, fim):
+    #Índice que divide [inicio, fim) em duas metades de custo parecido (cada uma com ao menos uma página)
+    metade = sum(custos[inicio:fim]) / 2
+    acumulado = 0
+    for indice in range(inicio, fim - 1):
+        acumulado += custos[indice]
+        if acumulado >= metade:
+            return indice + 1
+    return fim - 1
+
+
+class DivisorPartesPdf:
+    """Divide um PDF em partes <nome>_parteN.pdf abaixo de um tamanho máximo, sem perder páginas"""
+
+    def __init__(self, caminho_origem):
+        self.caminho_origem = Path(caminho_origem)
+        self.pdf = pdfium.PdfDocument(self.caminho_origem)
+
+    def __len__(self):
+        return len(self.pdf)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.fechar()
+
+    def fechar(self):
+        if self.pdf is not None:
+            self.pdf.close()
+            self.pdf = None
+
+    def _gravar_intervalo(self, inicio, fim, pasta):
+        #Grava as páginas [inicio, fim) em um arquivo temporário na pasta de destino
+        descritor, caminho = tempfile.mkstemp(prefix=f"{self.caminho_origem.stem}_", suffix=".parcial", dir=pasta)
+        os.close(descritor)
+        novo_pdf = pdfium.PdfDocument.new()
+        try:
+            novo_pdf.import_pages(self.pdf, list(range(inicio, fim)))
+            novo_pdf.save(caminho)
+        finally:
+            novo_pdf.close()
+        return Path(caminho)
+
+    def _gravar_parte(self, custos, inicio, fim, tamanho_maximo, pasta, gravadas):
+        #Grava o intervalo e, se a estimativa errou e ele passou do limite, divide de novo
+        verificar_cancelamento()
+        caminho = self._gravar_intervalo(inicio, fim, pasta)
+        gravadas.append(caminho)
+        tamanho = caminho.stat().st_size
+        if tamanho <= tamanho_maximo:
+            return [(inicio, fim, caminho)]
+
+        if fim - inicio == 1:
+            # Uma página sozinha não pode ser dividida: mantém a página em vez de perdê-la
+            print(f"[AVISO] Página {inicio + 1} sozinha excede o limite: {tamanho / (1024**3):.2f}GB")
+            return [(inicio, fim, caminho)]
+
+        caminho.unlink()
+        gravadas.remove(caminho)
+        corte = _ponto_de_corte(custos, inicio, fim)
+        print(f"[INFO] Páginas {inicio + 1}-{fim} excederam o limite ({tamanho / (1024**3):.2f}GB), dividindo novamente")
+        return (
+            self._gravar_parte(custos, inicio, corte, tamanho_maximo, pasta, gravadas)
+            + self._gravar_parte(custos, corte, fim, tamanho_maximo, pasta, gravadas)
+        )
+
+    def dividir(self, caminho_destino, tamanho_maximo):
+        """Grava as partes planejadas e retorna os caminhos, na ordem das páginas"""
+        caminho_destino = Path(caminho_destino)
+        custos = estimar_custos_paginas(self.pdf, self.caminho_origem.stat().st_size)
+        plano = planejar_partes(custos, tamanho_maximo)
+        print(f"[INFO] {self.caminho_origem.name}: {len(self.pdf)} páginas planejadas em {len(plano)} partes")
+
+        gravadas = []
+        try:
+            partes = []
+            for inicio, fim in plano:
+                partes.extend(self._gravar_parte(custos, inicio, fim, tamanho_maximo, caminho_destino.parent, gravadas))
+
+            # Todas as páginas foram gravadas: só agora as partes recebem o nome final
+            caminhos = []
+            for numero, (inicio, fim, caminho) in enumerate(partes, start=1):
+                caminho_parte = caminho_destino.parent / f"{caminho_destino.stem}_parte{numero}{caminho_destino.suffix}"
+                caminho.replace(caminho_parte)
+                gravadas.remove(caminho)
+                caminhos.append(caminho_parte)
+                print(f"[INFO] Parte {numero} criada (páginas {inicio + 1}-{fim}): {caminho_parte.stat().st_size / (1024**3):.2f}GB")
+            return caminhos
+        finally:
+            # Em caso de erro ou cancelamento não sobram arquivos temporários
+            for caminho in gravadas:
+                if caminho.exists():
+                    caminho.unlink()
@@ -0,0 +1,72 @@
+import time
+from pathlib import Path
+import pypdfium2 as pdfium
+from model.gravacao import gravacao_atomica
+from model.cancelamento import verificar_cancelamento
+from model.metricas import medir
+from model.protecao import abrir_pdf
+
+
+def caminho_da_pagina(caminho_destino, indice):
+    #Nome do PDF de uma página: <nome>_pagina<N>.pdf (N começa em 1)
+    return caminho_destino.parent / f"{caminho_destino.stem}_pagina{indice + 1}{caminho_destino.suffix}"
+
+
+def intervalos_paginas(total_paginas, paginas_por_intervalo, primeira=0):
+    #Divide [primeira, total) em intervalos (inicio, fim) para processos diferentes
+    return [
+        (inicio, min(inicio + paginas_por_intervalo, total_paginas))
+        for inicio in range(primeira, total_paginas, paginas_por_intervalo)
+    ]
+
+
+class DivisorPaginasPdf:
+    """Grava um PDF por página abrindo o documento de origem uma única vez"""
+
+    def __init__(self, caminho_origem):
+        self.caminho_origem = Path(caminho_origem)
+        self.pdf = abrir_pdf(self.caminho_origem)  # Senha: ArquivoProtegido, sem abrir o arquivo de novo
+
+    def __len__(self):
+        return len(self.pdf)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.fechar()
+
+    def fechar(self):
+        if self.pdf is not None:
+            self.pdf.close()
+            self.pdf = None
+
+    def dividir(self, caminho_destino, inicio=0, fim=None):
+        """Grava as páginas [inicio, fim) em <destino>_paginaN.pdf e retorna os caminhos gravados"""
+        fim = len(self.pdf) if fim is None else min(fim, len(self.pdf))
+        gravados = []
+        inicio_tempo = time.perf_counter()
+
+        for i in range(inicio, fim):
+            # Para entre páginas se o usuário interrompeu a conversão
+            verificar_cancelamento(len(gravados))
+
+            caminho_pagina = caminho_da_pagina(caminho_destino, i)
+            with medir("pagina_pdf"):
+                novo_pdf = pdfium.PdfDocument.new()
+                try:
+                    novo_pdf.import_pages(self.pdf, [i])
+                    with medir("pdfium_save"), gravacao_atomica(caminho_pagina) as caminho_parcial:
+                        novo_pdf.save(caminho_parcial)
+                finally:
+                    # Libera o documento da página na hora, sem esperar o coletor de lixo
+                    novo_pdf.close()
+            gravados.append(caminho_pagina)
+
+        duracao = time.perf_counter() - inicio_tempo
+        if gravados and duracao > 0:
+            print(
+                f"[INFO] {self.caminho_origem.name}: páginas {inicio + 1}-{fim} em {duracao:.2f}s "
+                f"({len(gravados) / duracao:.1f} páginas/s)"
+            )
+        return gravados
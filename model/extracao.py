@@ -0,0 +1,284 @@
+import os
+import asyncio
+import shutil
+import tarfile
+import zipfile
+import tempfile
+from pathlib import Path, PurePosixPath
+from concurrent.futures import ThreadPoolExecutor
+from model.gravacao import gravacao_atomica
+
+#Formatos aceitos (sufixos compostos primeiro)
+EXTENSOES_COMPACTADAS = ['.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tbz2', '.txz', '.tar', '.zip']
+TAMANHO_BLOCO = 1024 * 1024
+#Abaixo disso a taxa de compressão não é conferida (páginas digitalizadas em branco comprimem muito)
+TAMANHO_MINIMO_RAZAO = 256 * 1024**2
+
+
+class LimitesExtracao:
+    """Limites contra arquivos enormes e bombas de descompactação"""
+
+    def __init__(self, tamanho_membro=4 * 1024**3, tamanho_total=32 * 1024**3, razao_maxima=1000,
+                 profundidade_maxima=4, max_membros=100000):
+        self.tamanho_membro = tamanho_membro  # Maior membro descompactado aceito
+        self.tamanho_total = tamanho_total  # Soma descompactada de um arquivo (incluindo aninhados)
+        self.razao_maxima = razao_maxima  # Descompactado / compactado acima disso é tratado como bomba
+        self.profundidade_maxima = profundidade_maxima  # Níveis de compactados dentro de compactados
+        self.max_membros = max_membros
+
+
+class MembroCompactado:
+    """Arquivo dentro de um compactado, lido sem passar pelo disco"""
+
+    def __init__(self, nome, tamanho, abrir):
+        self.nome = nome  # Caminho relativo (PurePosixPath) dentro do compactado, já com as pastas dos aninhados
+        self.tamanho = tamanho
+        self._abrir = abrir
+
+    def abrir(self):
+        #O fluxo só é válido enquanto o iterador não avança para o próximo membro
+        return self._abrir()
+
+
+def eh_compactado(caminho):
+    nome = Path(caminho).name.lower()
+    return any(nome.endswith(extensao) for extensao in EXTENSOES_COMPACTADAS)
+
+
+def nome_sem_extensao(caminho):
+    #"lote.tar.gz" -> "lote"
+    nome = Path(caminho).name
+    for extensao in EXTENSOES_COMPACTADAS:
+        if nome.lower().endswith(extensao):
+            return nome[:-len(extensao)]
+    return Path(caminho).stem
+
+
+def _nome_seguro(nome):
+    #Recusa caminhos absolutos, com unidade (C:) ou que saem da pasta de destino (..)
+    nome = nome.replace('\\', '/')
+    caminho = PurePosixPath(nome)
+    if not nome or '\x00' in nome or caminho.is_absolute() or (caminho.parts and ':' in caminho.parts[0]) or '..' in caminho.parts:
+        return None
+    partes = [parte for parte in caminho.parts if parte not in ('', '.')]
+    return PurePosixPath(*partes) if partes else None
+
+
+class _Contagem:
+    #Bytes descompactados de um compactado (e de seus aninhados), conferidos durante a leitura
+    def __init__(self, caminho, limites, tamanho_compactado):
+        self.caminho = caminho
+        self.limites = limites
+        self.tamanho_compactado = max(tamanho_compactado, 1)
+        self.total = 0
+        self.membros = 0
+
+    def novo_membro(self, nome):
+        self.membros += 1
+        if self.membros > self.limites.max_membros:
+            raise Exception(f"{self.caminho.name}: mais de {self.limites.max_membros} arquivos")
+
+    def somar(self, quantidade):
+        self.total += quantidade
+        if self.total > self.limites.tamanho_total:
+            raise Exception(f"{self.caminho.name}: conteúdo descompactado excede {self.limites.tamanho_total / (1024**3):.1f}GB")
+        if self.total > TAMANHO_MINIMO_RAZAO and self.total / self.tamanho_compactado > self.limites.razao_maxima:
+            raise Exception(f"{self.caminho.name}: taxa de compressão suspeita (possível bomba de descompactação)")
+
+
+class _LeitorLimitado:
+    """Envolve o fluxo de um membro conferindo os bytes realmente descompactados (o cabeçalho pode mentir)"""
+
+    def __init__(self, fluxo, nome, limite, contagem):
+        self.fluxo = fluxo
+        self.nome = nome
+        self.limite = limite
+        self.contagem = contagem
+        self.lidos = 0
+
+    def read(self, quantidade=-1):
+        dados = self.fluxo.read(quantidade)
+        self.lidos += len(dados)
+        if self.lidos > self.limite:
+            raise Exception(f"{self.nome}: membro excede o tamanho máximo permitido")
+        self.contagem.somar(len(dados))
+        return dados
+
+    def close(self):
+        self.fluxo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.close()
+
+
+def _membros_zip(arquivo_zip, limites, contagem):
+    for info in arquivo_zip.infolist():
+        if info.is_dir():
+            continue
+        contagem.novo_membro(info.filename)
+        nome = _nome_seguro(info.filename)
+        if nome is None:
+            print(f"[AVISO] Membro ignorado (caminho inseguro): {info.filename}")
+            continue
+        if info.file_size > limites.tamanho_membro:
+            raise Exception(f"{info.filename}: membro excede o tamanho máximo permitido")
+        if info.file_size > TAMANHO_MINIMO_RAZAO and info.file_size / max(info.compress_size, 1) > limites.razao_maxima:
+            raise Exception(f"{info.filename}: taxa de compressão suspeita (possível bomba de descompactação)")
+        yield nome, info.file_size, lambda info=info: arquivo_zip.open(info)
+
+
+def _membros_tar(arquivo_tar, limites, contagem):
+    for info in arquivo_tar:
+        # Só arquivos comuns: links, dispositivos e FIFOs nunca são seguidos
+        if not info.isfile():
+            continue
+        contagem.novo_membro(info.name)
+        nome = _nome_seguro(info.name)
+        if nome is None:
+            print(f"[AVISO] Membro ignorado (caminho inseguro): {info.name}")
+            continue
+        if info.size > limites.tamanho_membro:
+            raise Exception(f"{info.name}: membro excede o tamanho máximo permitido")
+        yield nome, info.size, lambda info=info: arquivo_tar.extractfile(info)
+
+
+def _abrir_compactado(nome, fluxo):
+    #Abre um compactado a partir de um arquivo já aberto (precisa de seek)
+    if nome.lower().endswith('.zip'):
+        return zipfile.ZipFile(fluxo), _membros_zip
+    return tarfile.open(fileobj=fluxo, mode='r:*'), _membros_tar
+
+
+def _iterar(fluxo, nome_compactado, prefixo, limites, contagem, profundidade):
+    compactado, membros = _abrir_compactado(nome_compactado, fluxo)
+    with compactado:
+        for nome, tamanho, abrir in membros(compactado, limites, contagem):
+            caminho_relativo = prefixo / nome
+
+            if eh_compactado(nome.name) and profundidade < limites.profundidade_maxima:
+                # Aninhado: copia para um temporário com seek e percorre recursivamente
+                with tempfile.TemporaryFile() as temporario:
+                    with _LeitorLimitado(abrir(), str(nome), limites.tamanho_membro, contagem) as origem:
+                        shutil.copyfileobj(origem, temporario, TAMANHO_BLOCO)
+                    temporario.seek(0)
+                    pasta_aninhado = caminho_relativo.parent / nome_sem_extensao(nome.name)
+                    yield from _iterar(temporario, nome.name, pasta_aninhado, limites, contagem, profundidade + 1)
+                continue
+
+            def abrir_limitado(abrir=abrir, nome=nome):
+                return _LeitorLimitado(abrir(), str(nome), limites.tamanho_membro, contagem)
+
+            yield MembroCompactado(caminho_relativo, tamanho, abrir_limitado)
+
+
+def iterar_membros(caminho, limites=None):
+    """Percorre os arquivos de um compactado (e dos compactados dentro dele) sem gravá-los no disco"""
+    #Cada membro deve ser lido antes de avançar para o próximo (o fluxo é do próprio compactado)
+    caminho = Path(caminho)
+    limites = limites or LimitesExtracao()
+    contagem = _Contagem(caminho, limites, caminho.stat().st_size)
+    with open(caminho, 'rb') as fluxo:
+        yield from _iterar(fluxo, caminho.name, PurePosixPath(), limites, contagem, 0)
+
+
+def extrair_compactado(caminho, pasta_destino, limites=None):
+    """Extrai um compactado (com os aninhados em subpastas) e retorna a quantidade de arquivos gravados"""
+    pasta_destino = Path(pasta_destino).resolve()
+    gravados = 0
+    for membro in iterar_membros(caminho, limites):
+        caminho_saida = pasta_destino.joinpath(*membro.nome.parts)
+        # Segunda barreira contra path traversal (ex.: links na pasta de destino)
+        try:
+            caminho_saida.resolve().relative_to(pasta_destino)
+        except ValueError:
+            print(f"[AVISO] Membro ignorado (fora da pasta de destino): {membro.nome}")
+            continue
+        caminho_saida.parent.mkdir(parents=True, exist_ok=True)
+        with membro.abrir() as origem, gravacao_atomica(caminho_saida) as caminho_parcial:
+            with open(caminho_parcial, 'wb') as destino:
+                shutil.copyfileobj(origem, destino, TAMANHO_BLOCO)
+        gravados += 1
+    return gravados
+
+
+def localizar_compactados(caminho_origem):
+    compactados = []
+    for raiz, _, arquivos in os.walk(caminho_origem):
+        for arquivo in arquivos:
+            if eh_compactado(arquivo):
+                compactados.append(Path(raiz) / arquivo)
+    return compactados
+
+
+def extrair_todos_compactados(caminho_origem, atualizar_status=None, max_threads=None, limites=None):
+    """Extrai todos os compactados da pasta, vários ao mesmo tempo, cada um em <pasta>/<nome sem extensão>"""
+    #Threads bastam: zlib, bz2 e lzma liberam o GIL durante a descompactação
+    compactados = localizar_compactados(caminho_origem)
+    extraidos = 0
+    erros = []
+
+    def extrair(caminho):
+        return caminho, extrair_compactado(caminho, caminho.parent / nome_sem_extensao(caminho), limites)
+
+    with ThreadPoolExecutor(max_workers=max_threads or min(8, os.cpu_count() or 4)) as executor:
+        futuros = [executor.submit(extrair, caminho) for caminho in compactados]
+        for caminho, futuro in zip(compactados, futuros):
+            try:
+                _, quantidade = futuro.result()
+                extraidos += 1
+                if atualizar_status:
+                    atualizar_status(f"✅ Extraído: {caminho.name} ({quantidade} arquivos)")
+            except Exception as e:
+                erro = f"{caminho.name}: {str(e)}"
+                erros.append(erro)
+                if atualizar_status:
+                    atualizar_status("", erro=erro)
+
+    return extraidos, erros
+
+
+async def membros_em_disco(caminho, pasta_temporaria, aceitar=None, limites=None, vagas=None):
+    """Entrega (membro, caminho) um de cada vez, copiando para o disco só os membros que cabem em `vagas`"""
+    #Os processos de conversão precisam de um arquivo com seek: cada membro aceito é copiado para
+    #<pasta_temporaria>/membro_XXXX/<nome original>. Membros recusados por `aceitar` vêm com caminho None.
+    #vagas (asyncio.Semaphore): cada membro copiado ocupa uma vaga, e o próximo só é copiado quando
+    #houver vaga livre. Quem recebe o caminho apaga a pasta temporária dele e então libera a vaga.
+    iterador = iterar_membros(caminho, limites)
+
+    def proximo():
+        membro = next(iterador, None)
+        if membro is None:
+            return None
+        if aceitar is not None and not aceitar(membro.nome):
+            return membro, None
+        pasta = Path(tempfile.mkdtemp(prefix="membro_", dir=pasta_temporaria))
+        caminho_membro = pasta / membro.nome.name
+        try:
+            with membro.abrir() as origem, open(caminho_membro, 'wb') as destino:
+                shutil.copyfileobj(origem, destino, TAMANHO_BLOCO)
+        except BaseException:
+            shutil.rmtree(pasta, ignore_errors=True)
+            raise
+        return membro, caminho_membro
+
+    try:
+        while True:
+            if vagas is not None:
+                await vagas.acquire()
+            # Leitura e descompactação em uma thread, sem travar o event loop
+            try:
+                item = await asyncio.to_thread(proximo)
+            except BaseException:
+                if vagas is not None:
+                    vagas.release()
+                raise
+            if vagas is not None and (item is None or item[1] is None):
+                vagas.release()  # Nada foi copiado para o disco
+            if item is None:
+                break
+            yield item
+    finally:
+        iterador.close()
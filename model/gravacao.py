@@ -0,0 +1,25 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+#O mkstemp cria o arquivo só para o dono (0600); o PDF final fica com as permissões de um arquivo comum
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def gravacao_atomica(caminho_final):
+    #Grava em um arquivo .parcial e só renomeia para o nome final ao terminar,
+    #assim uma interrupção nunca deixa um PDF pela metade no destino.
+    #O .parcial tem nome único na mesma pasta: duas tarefas gravando o mesmo destino
+    #não apagam nem renomeiam o arquivo parcial uma da outra
+    descritor, caminho = tempfile.mkstemp(prefix=f"{caminho_final.name}.", suffix=".parcial", dir=caminho_final.parent)
+    os.close(descritor)
+    os.chmod(caminho, 0o666 & ~_UMASK)
+    caminho_parcial = caminho_final.with_name(os.path.basename(caminho))
+    try:
+        yield caminho_parcial
+        caminho_parcial.replace(caminho_final)
+    finally:
+        if caminho_parcial.exists():
+            caminho_parcial.unlink()
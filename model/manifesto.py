@@ -0,0 +1,102 @@
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+NOME_MANIFESTO = ".documenta_manifesto.sqlite3"
+TAMANHO_BLOCO_HASH = 1024 * 1024  # Lê 1MB por vez ao calcular o hash
+
+
+def calcular_hash(caminho_arquivo):
+    #SHA-256 do conteúdo, lido em blocos para não carregar o arquivo inteiro
+    sha = hashlib.sha256()
+    with open(caminho_arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+class ManifestoConversao:
+    """Registro persistente (SQLite, na pasta de destino) das fontes já convertidas"""
+
+    def __init__(self, pasta_destino, usar_hash=False):
+        self.caminho = Path(pasta_destino) / NOME_MANIFESTO
+        self.usar_hash = usar_hash
+        self._trava = threading.Lock()
+        #A consulta roda em threads auxiliares (asyncio.to_thread), o acesso é serializado pela trava
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS fontes (
+                caminho TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT,
+                convertido_em REAL NOT NULL
+            )
+        """)
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS saidas (
+                caminho_fonte TEXT NOT NULL,
+                pagina INTEGER NOT NULL,
+                caminho_saida TEXT NOT NULL,
+                PRIMARY KEY (caminho_fonte, pagina)
+            )
+        """)
+        self._conexao.commit()
+
+    @staticmethod
+    def _chave(caminho_fonte):
+        return str(Path(caminho_fonte).resolve())
+
+    def ja_convertido(self, caminho_fonte):
+        """Indica se a fonte não mudou desde a última conversão e as saídas ainda existem"""
+        chave = self._chave(caminho_fonte)
+        info = Path(caminho_fonte).stat()
+        with self._trava:
+            registro = self._conexao.execute(
+                "SELECT tamanho, mtime_ns, hash FROM fontes WHERE caminho = ?", (chave,)
+            ).fetchone()
+            if registro is None:
+                return False
+            saidas = [linha[0] for linha in self._conexao.execute(
+                "SELECT caminho_saida FROM saidas WHERE caminho_fonte = ?", (chave,)
+            )]
+
+        tamanho, mtime_ns, hash_registrado = registro
+        if tamanho != info.st_size:
+            return False
+        if mtime_ns != info.st_mtime_ns:
+            #Data mudou (ex.: cópia do arquivo): com hash ligado, o conteúdo decide
+            if not (self.usar_hash and hash_registrado and calcular_hash(caminho_fonte) == hash_registrado):
+                return False
+            with self._trava:
+                self._conexao.execute(
+                    "UPDATE fontes SET mtime_ns = ? WHERE caminho = ?", (info.st_mtime_ns, chave)
+                )
+                self._conexao.commit()
+
+        return bool(saidas) and all(Path(saida).exists() for saida in saidas)
+
+    def registrar(self, caminho_fonte, saidas):
+        """Registra a conversão concluída de uma fonte e os PDFs gerados por página"""
+        chave = self._chave(caminho_fonte)
+        info = Path(caminho_fonte).stat()
+        hash_conteudo = calcular_hash(caminho_fonte) if self.usar_hash else None
+        with self._trava:
+            #Commit por fonte: se o processo cair, tudo o que terminou fica registrado
+            with self._conexao:
+                self._conexao.execute("DELETE FROM saidas WHERE caminho_fonte = ?", (chave,))
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO fontes (caminho, tamanho, mtime_ns, hash, convertido_em) VALUES (?, ?, ?, ?, ?)",
+                    (chave, info.st_size, info.st_mtime_ns, hash_conteudo, time.time())
+                )
+                self._conexao.executemany(
+                    "INSERT INTO saidas (caminho_fonte, pagina, caminho_saida) VALUES (?, ?, ?)",
+                    [(chave, i + 1, str(saida)) for i, saida in enumerate(saidas)]
+                )
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
@@ -0,0 +1,180 @@
+import os
+import sys
+import asyncio
+import threading
+from collections import deque
+from PIL import Image
+from model.protecao import abrir_pdf
+
+#Estimativa do pico de memória de uma tarefa, só pelos cabeçalhos (nada é decodificado)
+MEMORIA_MINIMA_TAREFA = 16 * 1024**2  # Interpretador, bibliotecas e buffers de gravação de uma tarefa
+FATOR_PICO_IMAGEM = 3  # Quadro decodificado + cópia convertida/redimensionada + buffer da codificação
+MEMORIA_BASE_PDF = 64 * 1024**2  # Documento aberto no pdfium + página em montagem
+MEMORIA_POR_PAGINA_PDF = 128 * 1024  # Tabela de objetos e páginas importadas, por página
+BYTES_POR_PAGINA_PDF = 200 * 1024  # Página digitalizada típica: páginas de um PDF que o pdfium não abre
+FRACAO_MEMORIA_PADRAO = 0.5  # Orçamento padrão: metade da memória física
+MEMORIA_FISICA_PADRAO = 8 * 1024**3  # Quando não é possível consultar o sistema
+
+EXTENSOES_IMAGEM = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff']
+
+#Bytes por banda nos modos de 16 e 32 bits (os demais usam 1 byte por banda)
+_BYTES_POR_BANDA = {'I;16': 2, 'I;16B': 2, 'I;16L': 2, 'I': 4, 'F': 4}
+
+#O pdfium não pode ser usado por várias threads ao mesmo tempo
+_trava_pdfium = threading.Lock()
+
+
+class EstimativaArquivo:
+    """Custo de converter um arquivo, calculado pelos cabeçalhos"""
+
+    __slots__ = ('memoria', 'paginas', 'pixels')
+
+    def __init__(self, memoria, paginas=1, pixels=0):
+        self.memoria = memoria  # Pico de memória estimado, em bytes
+        self.paginas = paginas  # Páginas (PDF) ou quadros (imagem)
+        self.pixels = pixels  # Pixels de um quadro (0 para PDF e Word)
+
+
+def _estimar_imagem(caminho):
+    with Image.open(caminho) as img:
+        largura, altura = img.size
+        bandas = len(img.getbands())
+        quadros = getattr(img, "n_frames", 1)
+        bytes_por_banda = _BYTES_POR_BANDA.get(img.mode, 1)
+    #Os quadros são decodificados um de cada vez: o pico é o de um quadro, não o do arquivo inteiro
+    memoria = largura * altura * bandas * bytes_por_banda * FATOR_PICO_IMAGEM
+    return EstimativaArquivo(MEMORIA_MINIMA_TAREFA + memoria, quadros, largura * altura)
+
+
+def contar_paginas_pdf(caminho):
+    """Páginas do PDF pelo pdfium, que lê só a tabela xref, o trailer e a árvore de páginas"""
+    #Nenhuma página é carregada: vale também para árvores no meio do arquivo ou em fluxos de objetos
+    with _trava_pdfium:
+        pdf = abrir_pdf(caminho)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def _estimar_pdf(caminho):
+    #PDF que o pdfium não abre (corrompido, com senha): páginas estimadas pelo tamanho do arquivo;
+    #o processo de conversão é quem relata o problema
+    try:
+        paginas = contar_paginas_pdf(caminho)
+    except Exception:
+        paginas = max(1, caminho.stat().st_size // BYTES_POR_PAGINA_PDF)
+    return EstimativaArquivo(MEMORIA_BASE_PDF + paginas * MEMORIA_POR_PAGINA_PDF, paginas)
+
+
+def estimar_arquivo(caminho):
+    """Estima memória e páginas de um arquivo sem decodificá-lo (roda fora do event loop)"""
+    #Arquivo ilegível, corrompido ou com senha fica com a estimativa mínima: o processo de conversão
+    #é quem descobre e relata o problema
+    ext = caminho.suffix.lower()
+    try:
+        if ext == '.pdf':
+            return _estimar_pdf(caminho)
+        if ext in EXTENSOES_IMAGEM:
+            return _estimar_imagem(caminho)
+    except Exception:
+        pass
+    return EstimativaArquivo(MEMORIA_MINIMA_TAREFA)
+
+
+def estimativa_com_paginas(estimativa, paginas):
+    """Mesma estimativa corrigida para o número real de páginas (relatado por quem abriu o documento)"""
+    if estimativa.pixels:
+        return EstimativaArquivo(estimativa.memoria, paginas, estimativa.pixels)
+    return EstimativaArquivo(max(estimativa.memoria, MEMORIA_BASE_PDF + paginas * MEMORIA_POR_PAGINA_PDF), paginas)
+
+
+def memoria_intervalo(estimativa, inicio, fim):
+    """Memória estimada para converter só as páginas [inicio, fim) (fim None = até o final)"""
+    #Imagem: o pico é o de um quadro em qualquer intervalo; PDF: cresce com as páginas do intervalo
+    if fim is None or estimativa.pixels:
+        return estimativa.memoria
+    return min(estimativa.memoria, MEMORIA_BASE_PDF + (fim - inicio) * MEMORIA_POR_PAGINA_PDF)
+
+
+def memoria_fisica():
+    """Memória física da máquina em bytes"""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+
+            class _EstadoMemoria(ctypes.Structure):
+                _fields_ = [
+                    ('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                    ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                    ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                    ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                    ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+                ]
+
+            estado = _EstadoMemoria()
+            estado.dwLength = ctypes.sizeof(estado)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(estado)):
+                return estado.ullTotalPhys
+        else:
+            return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, OSError, ValueError):
+        pass
+    return MEMORIA_FISICA_PADRAO
+
+
+def orcamento_memoria_padrao():
+    return int(memoria_fisica() * FRACAO_MEMORIA_PADRAO)
+
+
+class OrcamentoMemoria:
+    """Admite tarefas enquanto a soma da memória estimada das que estão rodando couber no limite"""
+
+    def __init__(self, limite=None):
+        self.limite = limite or orcamento_memoria_padrao()
+        self.em_uso = 0
+        self.maior_uso = 0
+        self.esperas = 0  # Tarefas que aguardaram memória livre
+        self._aguardando = deque()  # (custo, futuro) na ordem de chegada
+
+    async def reservar(self, custo):
+        """Aguarda memória livre para `custo` bytes e retorna a reserva, a ser devolvida com liberar()"""
+        #Uma tarefa maior que o orçamento inteiro roda sozinha, em vez de nunca ser admitida.
+        #A ordem de chegada é respeitada: um arquivo grande não fica para trás enquanto os
+        #pequenos que chegaram depois ocupam a memória que ele espera
+        custo = min(custo, self.limite)
+        if self._aguardando or self.em_uso + custo > self.limite:
+            futuro = asyncio.get_running_loop().create_future()
+            self._aguardando.append((custo, futuro))
+            self.esperas += 1
+            try:
+                await futuro
+            except asyncio.CancelledError:
+                if futuro.done() and not futuro.cancelled():
+                    self.liberar(custo)  # Já admitida quando a espera foi cancelada
+                else:
+                    self._admitir()
+                raise
+        else:
+            self._ocupar(custo)
+        return custo
+
+    def _ocupar(self, custo):
+        self.em_uso += custo
+        self.maior_uso = max(self.maior_uso, self.em_uso)
+
+    def liberar(self, custo):
+        self.em_uso -= custo
+        self._admitir()
+
+    def _admitir(self):
+        while self._aguardando:
+            custo, futuro = self._aguardando[0]
+            if futuro.done():
+                self._aguardando.popleft()  # Espera cancelada
+                continue
+            if self.em_uso + custo > self.limite:
+                break
+            self._aguardando.popleft()
+            self._ocupar(custo)
+            futuro.set_result(None)
@@ -0,0 +1,186 @@
+import json
+import time
+import threading
+from pathlib import Path
+
+#Limites (em segundos) dos histogramas de duração, no formato do Prometheus
+LIMITES_HISTOGRAMA = [0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+
+FORMATO_JSON = "json"
+FORMATO_PROMETHEUS = "prometheus"
+FORMATOS_METRICAS = [FORMATO_JSON, FORMATO_PROMETHEUS]
+
+
+class _Cronometro:
+    """Mede a duração de um bloco `with` e registra no coletor"""
+
+    __slots__ = ('coletor', 'nome', 'inicio')
+
+    def __init__(self, coletor, nome):
+        self.coletor = coletor
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.coletor.observar(self.nome, time.perf_counter() - self.inicio)
+
+
+class _CronometroNulo:
+    """Usado quando a coleta está desligada: não mede nada"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        return None
+
+
+_NULO = _CronometroNulo()
+
+
+class ColetorMetricas:
+    """Tempos por etapa (com histograma), contadores e medidores de uma conversão"""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.etapas = {}  # nome -> {'quantidade', 'total', 'maximo', 'baldes'}
+        self.contadores = {}
+        self.medidores = {}  # Valores que não se somam (ex.: pico de memória)
+
+    def medir(self, nome):
+        return _Cronometro(self, nome)
+
+    def observar(self, nome, segundos):
+        with self._trava:
+            etapa = self.etapas.get(nome)
+            if etapa is None:
+                etapa = self.etapas[nome] = {
+                    'quantidade': 0, 'total': 0.0, 'maximo': 0.0, 'baldes': [0] * (len(LIMITES_HISTOGRAMA) + 1)
+                }
+            etapa['quantidade'] += 1
+            etapa['total'] += segundos
+            etapa['maximo'] = max(etapa['maximo'], segundos)
+            for indice, limite in enumerate(LIMITES_HISTOGRAMA):
+                if segundos <= limite:
+                    break
+            else:
+                indice = len(LIMITES_HISTOGRAMA)
+            etapa['baldes'][indice] += 1
+
+    def contar(self, nome, valor=1):
+        with self._trava:
+            self.contadores[nome] = self.contadores.get(nome, 0) + valor
+
+    def definir(self, nome, valor):
+        with self._trava:
+            self.medidores[nome] = valor
+
+    def exportar(self):
+        """Retorna um dicionário simples (pode ser enviado entre processos e mesclado)"""
+        with self._trava:
+            return {
+                'etapas': {nome: dict(etapa, baldes=list(etapa['baldes'])) for nome, etapa in self.etapas.items()},
+                'contadores': dict(self.contadores),
+                'medidores': dict(self.medidores),
+            }
+
+    def mesclar(self, dados):
+        #Soma as métricas coletadas em um processo do pool (medidores: fica o maior valor)
+        with self._trava:
+            for nome, outra in dados.get('etapas', {}).items():
+                etapa = self.etapas.get(nome)
+                if etapa is None:
+                    self.etapas[nome] = dict(outra, baldes=list(outra['baldes']))
+                    continue
+                etapa['quantidade'] += outra['quantidade']
+                etapa['total'] += outra['total']
+                etapa['maximo'] = max(etapa['maximo'], outra['maximo'])
+                etapa['baldes'] = [a + b for a, b in zip(etapa['baldes'], outra['baldes'])]
+            for nome, valor in dados.get('contadores', {}).items():
+                self.contadores[nome] = self.contadores.get(nome, 0) + valor
+            for nome, valor in dados.get('medidores', {}).items():
+                self.medidores[nome] = max(self.medidores.get(nome, valor), valor)
+
+    def para_prometheus(self):
+        #Formato texto do Prometheus (node_exporter textfile collector)
+        dados = self.exportar()
+        linhas = []
+        for nome, valor in sorted(dados['contadores'].items()):
+            linhas.append(f"# TYPE documenta_{nome}_total counter")
+            linhas.append(f"documenta_{nome}_total {valor}")
+        for nome, valor in sorted(dados['medidores'].items()):
+            linhas.append(f"# TYPE documenta_{nome} gauge")
+            linhas.append(f"documenta_{nome} {valor}")
+        if dados['etapas']:
+            linhas.append("# TYPE documenta_etapa_segundos histogram")
+        for nome, etapa in sorted(dados['etapas'].items()):
+            acumulado = 0
+            for limite, quantidade in zip(LIMITES_HISTOGRAMA + ['+Inf'], etapa['baldes']):
+                acumulado += quantidade
+                linhas.append(f'documenta_etapa_segundos_bucket{{etapa="{nome}",le="{limite}"}} {acumulado}')
+            linhas.append(f'documenta_etapa_segundos_sum{{etapa="{nome}"}} {etapa["total"]:.6f}')
+            linhas.append(f'documenta_etapa_segundos_count{{etapa="{nome}"}} {etapa["quantidade"]}')
+        return "\n".join(linhas) + "\n"
+
+    def gravar(self, pasta_destino, formato=FORMATO_JSON, timestamp=None):
+        """Grava as métricas ao lado do relatório de erros e retorna o caminho do arquivo"""
+        timestamp = timestamp or time.strftime("%Y%m%d_%H%M%S")
+        if formato == FORMATO_PROMETHEUS:
+            caminho = Path(pasta_destino) / f"metricas_{timestamp}.prom"
+            caminho.write_text(self.para_prometheus(), encoding='utf-8')
+        else:
+            dados = self.exportar()
+            for etapa in dados['etapas'].values():
+                etapa['media'] = etapa['total'] / etapa['quantidade'] if etapa['quantidade'] else 0.0
+            dados['limites_histograma'] = LIMITES_HISTOGRAMA
+            caminho = Path(pasta_destino) / f"metricas_{timestamp}.json"
+            caminho.write_text(json.dumps(dados, indent=2, ensure_ascii=False), encoding='utf-8')
+        return caminho
+
+
+#Coletor do processo atual (None = coleta desligada, custo de uma comparação por chamada)
+_coletor = None
+
+
+def iniciar_coleta():
+    global _coletor
+    _coletor = ColetorMetricas()
+    return _coletor
+
+
+def encerrar_coleta():
+    global _coletor
+    coletor = _coletor
+    _coletor = None
+    return coletor
+
+
+def coleta_ativa():
+    return _coletor is not None
+
+
+def medir(nome):
+    """Cronômetro de uma etapa: `with medir("decodificacao"): ...`"""
+    if _coletor is None:
+        return _NULO
+    return _coletor.medir(nome)
+
+
+def contar(nome, valor=1):
+    if _coletor is not None:
+        _coletor.contar(nome, valor)
+
+
+def definir(nome, valor):
+    if _coletor is not None:
+        _coletor.definir(nome, valor)
+
+
+def observar(nome, segundos):
+    if _coletor is not None:
+        _coletor.observar(nome, segundos)
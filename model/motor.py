@@ -0,0 +1,56 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class MotorConversao:
+    """Executa tarefas de conversão em um pool de processos"""
+
+    def __init__(self, max_processos=None, inicializador=None, args_inicializador=()):
+        self.max_processos = max_processos or os.cpu_count() or 1
+        self.inicializador = inicializador
+        self.args_inicializador = args_inicializador
+        self._executor = None
+
+    def _criar_executor(self):
+        #Usa "spawn" para não herdar as threads da interface (fork + threads pode travar)
+        return ProcessPoolExecutor(
+            max_workers=self.max_processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self.inicializador,
+            initargs=self.args_inicializador,
+        )
+
+    def iniciar(self):
+        if self._executor is None:
+            self._executor = self._criar_executor()
+        return self
+
+    async def executar(self, funcao, *args):
+        """Executa uma função (picklável) em um processo do pool e devolve o resultado"""
+        self.iniciar()
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, funcao, *args)
+        except BrokenProcessPool:
+            #Um processo morreu (ex.: falta de memória): recria o pool para as próximas tarefas
+            if self._executor is executor:
+                print("[AVISO] Pool de processos interrompido, recriando...")
+                self._executor = self._criar_executor()
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise Exception("Processo de conversão encerrado inesperadamente")
+
+    def encerrar(self, cancelar_pendentes=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancelar_pendentes)
+            self._executor = None
+
+    async def __aenter__(self):
+        return self.iniciar()
+
+    async def __aexit__(self, tipo_excecao, excecao, rastreamento):
+        #O shutdown espera os processos terminarem, então roda fora do event loop
+        await asyncio.to_thread(self.encerrar, tipo_excecao is not None)
@@ -0,0 +1,57 @@
+import asyncio
+import itertools
+from model.word import EXTENSOES_WORD
+
+#Ordem em que os arquivos encontrados na varredura são entregues aos processos de conversão
+ORDEM_MAIORES_PRIMEIRO = "maiores_primeiro"  # Maior trabalho estimado primeiro (LPT), dentro da janela
+ORDEM_VARREDURA = "varredura"  # Ordem em que a varredura encontra os arquivos
+ORDENS_CONVERSAO = [ORDEM_MAIORES_PRIMEIRO, ORDEM_VARREDURA]
+
+JANELA_ORDENACAO = 256  # Arquivos aguardando na fila: a varredura só avança até aqui à frente da conversão
+
+#Unidades de trabalho equivalentes a uma página de PDF
+PIXELS_POR_PAGINA = 2480 * 3508  # A4 digitalizado a 300 DPI
+BYTES_POR_PAGINA_WORD = 50 * 1024
+TRABALHO_DOCUMENTO_WORD = 10  # Abertura do documento no backend Word
+
+
+def estimar_trabalho(caminho, estimativa):
+    """Trabalho estimado (em páginas equivalentes) de um arquivo, pela EstimativaArquivo dos cabeçalhos"""
+    if caminho.suffix.lower() in EXTENSOES_WORD:
+        try:
+            tamanho = caminho.stat().st_size
+        except OSError:
+            tamanho = 0
+        return TRABALHO_DOCUMENTO_WORD + tamanho / BYTES_POR_PAGINA_WORD
+    if estimativa.pixels:
+        # Decodificar e codificar cada quadro custa proporcionalmente aos pixels
+        return estimativa.paginas * max(1.0, estimativa.pixels / PIXELS_POR_PAGINA)
+    return estimativa.paginas
+
+
+class FilaConversao:
+    """Fila limitada entre a varredura e os consumidores, que entrega o maior trabalho primeiro"""
+    #Com tudo igual, vale a ordem de chegada; com ORDEM_VARREDURA o trabalho é ignorado.
+    #Um PDF enorme encontrado no fim da varredura passa à frente dos pequenos que ainda aguardam,
+    #em vez de rodar sozinho em um núcleo enquanto os outros ficam parados
+
+    def __init__(self, ordem=ORDEM_MAIORES_PRIMEIRO, tamanho=JANELA_ORDENACAO):
+        if ordem not in ORDENS_CONVERSAO:
+            raise Exception(f"Ordem de conversão inválida: {ordem}")
+        self.ordem = ordem
+        self._fila = asyncio.PriorityQueue(maxsize=tamanho)
+        self._sequencia = itertools.count()
+
+    async def colocar(self, item, trabalho=0):
+        prioridade = -trabalho if self.ordem == ORDEM_MAIORES_PRIMEIRO else 0
+        await self._fila.put((prioridade, next(self._sequencia), item))
+
+    async def encerrar(self, consumidores):
+        #Um marcador de fim por consumidor, atrás de todos os arquivos
+        for _ in range(consumidores):
+            await self._fila.put((float('inf'), next(self._sequencia), None))
+
+    async def retirar(self):
+        """Próximo item (None quando a varredura terminou)"""
+        _, _, item = await self._fila.get()
+        return item
@@ -0,0 +1,147 @@
+import io
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from PIL import Image
+
+#Cache dos parâmetros escolhidos por fonte (fica fora do TEMP_DIR, que é limpo a cada conversão)
+CACHE_DIR = Path(tempfile.gettempdir()) / "flet_converter_cache"
+QUALIDADE_MINIMA = 20
+ESCALA_MINIMA = 0.1
+PASSOS_ESCALA = 7  # Iterações da busca binária de escala (precisão ~1%)
+LADO_MAXIMO = 4000  # Lado máximo da imagem otimizada, em pixels
+TOLERANCIA_REDUCAO = 1.25  # Imagens até 25% maiores que o necessário para a página não são reduzidas
+
+
+def codificar_jpeg(img, qualidade, escala=1.0):
+    #Codifica em memória e devolve os bytes do JPEG
+    if escala < 1.0:
+        img = img.resize((max(1, int(img.width * escala)), max(1, int(img.height * escala))), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=qualidade, optimize=True)
+    return buffer.getvalue()
+
+
+def buscar_parametros(img, tamanho_maximo, qualidade_maxima, qualidade_minima=QUALIDADE_MINIMA):
+    """Busca binária da maior qualidade (e, se preciso, da maior escala) que cabe em tamanho_maximo"""
+    #Retorna (qualidade, escala, dados) ou None se nem a menor escala couber
+    melhor = None
+    baixo, alto = qualidade_minima, qualidade_maxima
+    while baixo <= alto:
+        qualidade = (baixo + alto) // 2
+        dados = codificar_jpeg(img, qualidade)
+        if len(dados) <= tamanho_maximo:
+            melhor = (qualidade, 1.0, dados)
+            baixo = qualidade + 1
+        else:
+            alto = qualidade - 1
+    if melhor:
+        return melhor
+
+    #Nem a qualidade mínima coube: reduz a resolução mantendo a qualidade mínima
+    baixo, alto = ESCALA_MINIMA, 1.0
+    for _ in range(PASSOS_ESCALA):
+        escala = (baixo + alto) / 2
+        dados = codificar_jpeg(img, qualidade_minima, escala)
+        if len(dados) <= tamanho_maximo:
+            melhor = (qualidade_minima, escala, dados)
+            baixo = escala
+        else:
+            alto = escala
+    if melhor is None:
+        dados = codificar_jpeg(img, qualidade_minima, ESCALA_MINIMA)
+        if len(dados) <= tamanho_maximo:
+            melhor = (qualidade_minima, ESCALA_MINIMA, dados)
+    return melhor
+
+
+def precisa_reduzir(img, tamanho_alvo):
+    #Bitonais ficam na resolução original: já são compactas (G4) e perderiam a legibilidade
+    largura_alvo, altura_alvo = tamanho_alvo
+    return img.mode != '1' and (img.width > largura_alvo * TOLERANCIA_REDUCAO or img.height > altura_alvo * TOLERANCIA_REDUCAO)
+
+
+def decodificar_reduzida(img, tamanho_alvo):
+    """Decodifica a imagem já reduzida para tamanho_alvo, em vez de decodificar em resolução cheia"""
+    #JPEG: draft() faz o próprio decodificador entregar 1/2, 1/4 ou 1/8 da resolução (nunca menor que o alvo).
+    #Depois reduce() junta blocos inteiros de pixels (barato) e um único resize chega ao tamanho exato.
+    if img.format == 'JPEG':
+        img.draft(img.mode, tamanho_alvo)
+    img.load()
+    if img.mode == 'P':
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    fator = int(min(img.width / tamanho_alvo[0], img.height / tamanho_alvo[1]))
+    if fator >= 2:
+        try:
+            img = img.reduce(fator)
+        except ValueError:
+            pass  # Modo sem suporte a reduce (ex.: I;16): o resize abaixo resolve
+    if img.size != tuple(tamanho_alvo):
+        img = img.resize(tamanho_alvo, Image.Resampling.LANCZOS)
+    return img
+
+
+def preparar_imagem(img):
+    #Decodifica uma única vez: RGB e lado máximo de LADO_MAXIMO pixels
+    #Sempre devolve uma nova imagem, que continua válida depois que o arquivo é fechado
+    img = img.convert('RGB') if img.mode != 'RGB' else img.copy()
+    largura, altura = img.size
+    if largura > LADO_MAXIMO or altura > LADO_MAXIMO:
+        escala = min(LADO_MAXIMO / largura, LADO_MAXIMO / altura)
+        img = img.resize((int(largura * escala), int(altura * escala)), Image.Resampling.LANCZOS)
+    return img
+
+
+class CacheOtimizacao:
+    """Parâmetros (qualidade, escala) já escolhidos por fonte, para reaproveitar em novas execuções"""
+
+    def __init__(self, caminho=None):
+        CACHE_DIR.mkdir(exist_ok=True)
+        self.caminho = caminho or CACHE_DIR / "otimizacao.sqlite3"
+        self._trava = threading.Lock()
+        #timeout: vários processos do pool podem gravar ao mesmo tempo
+        self._conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS parametros (
+                caminho TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                tamanho_maximo INTEGER NOT NULL,
+                qualidade INTEGER NOT NULL,
+                escala REAL NOT NULL,
+                PRIMARY KEY (caminho, tamanho, mtime_ns, tamanho_maximo)
+            )
+        """)
+        self._conexao.commit()
+
+    @staticmethod
+    def _chave(caminho_fonte, tamanho_maximo):
+        info = Path(caminho_fonte).stat()
+        return (str(Path(caminho_fonte).resolve()), info.st_size, info.st_mtime_ns, tamanho_maximo)
+
+    def obter(self, caminho_fonte, tamanho_maximo):
+        with self._trava:
+            return self._conexao.execute(
+                "SELECT qualidade, escala FROM parametros WHERE caminho = ? AND tamanho = ? AND mtime_ns = ? AND tamanho_maximo = ?",
+                self._chave(caminho_fonte, tamanho_maximo)
+            ).fetchone()
+
+    def salvar(self, caminho_fonte, tamanho_maximo, qualidade, escala):
+        with self._trava:
+            with self._conexao:
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO parametros VALUES (?, ?, ?, ?, ?, ?)",
+                    self._chave(caminho_fonte, tamanho_maximo) + (qualidade, escala)
+                )
+
+
+_cache = None
+
+
+def obter_cache():
+    #Um cache por processo (cada processo do pool abre sua própria conexão)
+    global _cache
+    if _cache is None:
+        _cache = CacheOtimizacao()
+    return _cache
@@ -0,0 +1,157 @@
+from reportlab.lib.pagesizes import A4
+from model.metricas import medir
+
+#Copia os dados da imagem em blocos, sem carregar o arquivo de origem inteiro
+TAMANHO_BLOCO_COPIA = 1024 * 1024
+
+
+class ImagemCodificada:
+    """Imagem já comprimida, pronta para ser embutida em um PDF sem recodificação"""
+
+    def __init__(self, largura, altura, espaco_cor, bits, filtro, dados=None, arquivo=None,
+                 deslocamento=0, comprimento=None, parametros=None, decode=None):
+        self.largura = largura
+        self.altura = altura
+        self.espaco_cor = espaco_cor  # DeviceGray, DeviceRGB ou DeviceCMYK
+        self.bits = bits  # BitsPerComponent
+        self.filtro = filtro  # DCTDecode, CCITTFaxDecode ou FlateDecode
+        self.dados = dados  # bytes já comprimidos, ou...
+        self.arquivo = arquivo  # ...trecho [deslocamento, deslocamento + comprimento) de um arquivo
+        self.deslocamento = deslocamento
+        self.comprimento = comprimento
+        self.parametros = parametros  # DecodeParms
+        self.decode = decode  # Array Decode (ex.: inverter cores)
+
+    def tamanho(self):
+        return len(self.dados) if self.dados is not None else self.comprimento
+
+
+def extrair_imagem_direta(img, caminho_origem):
+    #Retorna a imagem comprimida como está no arquivo quando o PDF aceita o mesmo formato:
+    #JPEG (DCT) ou TIFF CCITT G4 em uma única faixa. Caso contrário retorna None.
+    largura, altura = img.size
+
+    if img.format == 'JPEG' and img.mode in ['L', 'RGB', 'CMYK']:
+        espacos = {'L': 'DeviceGray', 'RGB': 'DeviceRGB', 'CMYK': 'DeviceCMYK'}
+        decode = None
+        if img.mode == 'CMYK' and 'adobe' in img.info:
+            # JPEGs CMYK do Photoshop (marcador Adobe) guardam os valores invertidos
+            decode = [1, 0] * 4
+        return ImagemCodificada(
+            largura, altura, espacos[img.mode], 8, 'DCTDecode',
+            arquivo=caminho_origem, comprimento=caminho_origem.stat().st_size, decode=decode
+        )
+
+    if img.format == 'TIFF' and img.info.get('compression') == 'group4':
+        tags = img.tag_v2
+        offsets = tags.get(273)
+        contagens = tags.get(279)
+        # Faixas múltiplas não podem ser concatenadas e FillOrder 2 exigiria inverter os bits
+        if not offsets or len(offsets) != 1 or tags.get(266, 1) != 1:
+            return None
+        parametros = {'K': -1, 'Columns': largura, 'Rows': altura, 'BlackIs1': False}
+        # Photometric 1 (BlackIsZero): os bits decodificados vêm invertidos
+        decode = [1, 0] if tags.get(262, 0) == 1 else None
+        return ImagemCodificada(
+            largura, altura, 'DeviceGray', 1, 'CCITTFaxDecode',
+            arquivo=caminho_origem, deslocamento=offsets[0], comprimento=contagens[0],
+            parametros=parametros, decode=decode
+        )
+
+    return None
+
+
+def _numero(valor):
+    if isinstance(valor, float):
+        return f"{valor:.4f}".rstrip('0').rstrip('.')
+    return str(valor)
+
+
+def _valor_pdf(valor):
+    if isinstance(valor, bool):
+        return 'true' if valor else 'false'
+    if isinstance(valor, (int, float)):
+        return _numero(valor)
+    if isinstance(valor, (list, tuple)):
+        return '[' + ' '.join(_valor_pdf(v) for v in valor) + ']'
+    if isinstance(valor, dict):
+        return '<< ' + ' '.join(f"/{chave} {_valor_pdf(v)}" for chave, v in valor.items()) + ' >>'
+    return f"/{valor}"
+
+
+def posicao_na_pagina(largura_img, altura_img, tamanho_pagina=A4):
+    #Escala a imagem para caber na página mantendo a proporção, centralizada
+    largura_pagina, altura_pagina = tamanho_pagina
+    escala = min(largura_pagina / largura_img, altura_pagina / altura_img)
+    nova_largura = largura_img * escala
+    nova_altura = altura_img * escala
+    x = (largura_pagina - nova_largura) / 2
+    y = (altura_pagina - nova_altura) / 2
+    return x, y, nova_largura, nova_altura
+
+
+def pixels_na_pagina(largura_img, altura_img, dpi, tamanho_pagina=A4):
+    #Pixels que a imagem ocupa na página quando impressa a `dpi` (72 pontos por polegada)
+    _, _, largura, altura = posicao_na_pagina(largura_img, altura_img, tamanho_pagina)
+    return max(1, round(largura / 72 * dpi)), max(1, round(altura / 72 * dpi))
+
+
+def gravar_pdf_imagem(caminho_pdf, imagem, tamanho_pagina=A4):
+    """Grava um PDF de uma página A4 com a imagem centralizada, escrevendo direto no arquivo"""
+    largura_pagina, altura_pagina = tamanho_pagina
+    x, y, largura, altura = posicao_na_pagina(imagem.largura, imagem.altura, tamanho_pagina)
+    conteudo = f"q {_numero(largura)} 0 0 {_numero(altura)} {_numero(x)} {_numero(y)} cm /Im0 Do Q".encode('ascii')
+
+    dicionario_imagem = {
+        'Type': 'XObject',
+        'Subtype': 'Image',
+        'Width': imagem.largura,
+        'Height': imagem.altura,
+        'ColorSpace': imagem.espaco_cor,
+        'BitsPerComponent': imagem.bits,
+        'Filter': imagem.filtro,
+    }
+    if imagem.parametros:
+        dicionario_imagem['DecodeParms'] = imagem.parametros
+    if imagem.decode:
+        dicionario_imagem['Decode'] = imagem.decode
+    dicionario_imagem['Length'] = imagem.tamanho()
+
+    posicoes = []
+    with medir("gravacao_pdf"), open(caminho_pdf, 'wb') as f:
+        def objeto(cabecalho):
+            posicoes.append(f.tell())
+            f.write(f"{len(posicoes)} 0 obj\n{cabecalho}\n".encode('ascii'))
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        objeto("<< /Type /Catalog /Pages 2 0 R >>\nendobj")
+        objeto("<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj")
+        objeto(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_numero(largura_pagina)} {_numero(altura_pagina)}] "
+            f"/Resources << /XObject << /Im0 4 0 R >> >> /Contents 5 0 R >>\nendobj"
+        )
+
+        objeto(f"{_valor_pdf(dicionario_imagem)}\nstream")
+        if imagem.dados is not None:
+            f.write(imagem.dados)
+        else:
+            with open(imagem.arquivo, 'rb') as origem:
+                origem.seek(imagem.deslocamento)
+                restante = imagem.comprimento
+                while restante > 0:
+                    bloco = origem.read(min(TAMANHO_BLOCO_COPIA, restante))
+                    if not bloco:
+                        raise Exception("Arquivo de imagem terminou antes do esperado")
+                    f.write(bloco)
+                    restante -= len(bloco)
+        f.write(b"\nendstream\nendobj\n")
+
+        objeto(f"<< /Length {len(conteudo)} >>\nstream")
+        f.write(conteudo)
+        f.write(b"\nendstream\nendobj\n")
+
+        inicio_xref = f.tell()
+        f.write(f"xref\n0 {len(posicoes) + 1}\n0000000000 65535 f \n".encode('ascii'))
+        for posicao in posicoes:
+            f.write(f"{posicao:010d} 00000 n \n".encode('ascii'))
+        f.write(f"trailer\n<< /Size {len(posicoes) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode('ascii'))
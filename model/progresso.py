@@ -0,0 +1,160 @@
+import time
+import threading
+
+#Tipos de evento publicados pela conversão
+EVENTO_ENCONTRADO = "encontrado"  # Arquivo entrou na fila de conversão
+EVENTO_INICIADO = "iniciado"  # Arquivo começou a ser convertido
+EVENTO_CONCLUIDO = "concluido"  # Arquivo convertido (pdfs, bytes da fonte)
+EVENTO_IGNORADO = "ignorado"  # Arquivo já convertido em execução anterior
+EVENTO_ERRO = "erro"
+EVENTO_AVISO = "aviso"
+
+INTERVALO_PADRAO = 0.1  # Entregas à interface por segundo: 10
+
+
+class EventoProgresso:
+    """Um acontecimento da conversão (o que aconteceu, com qual arquivo e quanto foi gerado)"""
+
+    def __init__(self, tipo, arquivo=None, pdfs=0, bytes_fonte=0, mensagem=None):
+        self.tipo = tipo
+        self.arquivo = arquivo
+        self.pdfs = pdfs
+        self.bytes_fonte = bytes_fonte
+        self.mensagem = mensagem
+
+
+class ProgressoConversao:
+    """Agrega eventos de progresso e entrega um resumo à interface em intervalo fixo"""
+    #Publicar um evento só atualiza contadores: a conversão nunca espera a interface desenhar.
+    #Uma thread própria chama atualizar_status no máximo a cada `intervalo` segundos, e só se algo mudou.
+
+    def __init__(self, atualizar_status=None, intervalo=INTERVALO_PADRAO):
+        self.atualizar_status = atualizar_status
+        self.intervalo = intervalo
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self._alterado = False
+        self._erro_pendente = None
+        self._aviso_entregue = False
+        self.inicio = time.perf_counter()
+        self.encontrados = 0
+        self.concluidos = 0
+        self.ignorados = 0
+        self.pdfs = 0
+        self.bytes_fonte = 0
+        self.erros = 0
+        self.atual = None
+        self.aviso = None
+
+    def publicar(self, evento):
+        with self._trava:
+            if evento.tipo == EVENTO_ENCONTRADO:
+                self.encontrados += 1
+            elif evento.tipo == EVENTO_INICIADO:
+                self.atual = evento.arquivo
+                if self._aviso_entregue:
+                    # O aviso já entregue fica visível até o próximo arquivo começar
+                    self.aviso = None
+            elif evento.tipo == EVENTO_CONCLUIDO:
+                self.concluidos += 1
+                self.pdfs += evento.pdfs
+                self.bytes_fonte += evento.bytes_fonte
+            elif evento.tipo == EVENTO_IGNORADO:
+                self.concluidos += 1
+                self.ignorados += 1
+            elif evento.tipo == EVENTO_ERRO:
+                self.erros += 1
+                self._erro_pendente = evento.mensagem
+            elif evento.tipo == EVENTO_AVISO:
+                self.aviso = evento.mensagem
+                self._aviso_entregue = False
+            self._alterado = True
+
+    #Atalhos para os eventos mais comuns
+    def encontrado(self, arquivo):
+        self.publicar(EventoProgresso(EVENTO_ENCONTRADO, arquivo))
+
+    def iniciado(self, arquivo):
+        self.publicar(EventoProgresso(EVENTO_INICIADO, arquivo))
+
+    def concluido(self, arquivo, pdfs, bytes_fonte=0):
+        self.publicar(EventoProgresso(EVENTO_CONCLUIDO, arquivo, pdfs, bytes_fonte))
+
+    def ignorado(self, arquivo):
+        self.publicar(EventoProgresso(EVENTO_IGNORADO, arquivo))
+
+    def erro(self, mensagem):
+        self.publicar(EventoProgresso(EVENTO_ERRO, mensagem=mensagem))
+
+    def avisar(self, mensagem):
+        self.publicar(EventoProgresso(EVENTO_AVISO, mensagem=mensagem))
+
+    def resumo(self):
+        """Retorna um retrato dos contadores atuais"""
+        with self._trava:
+            return {
+                'encontrados': self.encontrados,
+                'concluidos': self.concluidos,
+                'ignorados': self.ignorados,
+                'pdfs': self.pdfs,
+                'bytes_fonte': self.bytes_fonte,
+                'erros': self.erros,
+                'atual': self.atual,
+                'duracao': time.perf_counter() - self.inicio,
+            }
+
+    def _mensagem(self):
+        #Monta o texto do status a partir dos contadores (chamado com a trava)
+        linhas = []
+        if self.atual is not None:
+            linhas.append(f"⏳ Convertendo: {self.atual.name}")
+        if self.aviso:
+            linhas.append(self.aviso)
+        linhas.append(f"Arquivos: {self.concluidos} de {self.encontrados} ({self.bytes_fonte / (1024**2):.1f} MB)")
+        linhas.append(f"Progresso: {self.pdfs} PDFs criados")
+        linhas.append(f"Erros: {self.erros}")
+        return "\n".join(linhas)
+
+    def _entregar(self):
+        with self._trava:
+            if not self._alterado:
+                return
+            self._alterado = False
+            mensagem = self._mensagem()
+            erro = self._erro_pendente
+            self._erro_pendente = None
+            self._aviso_entregue = self.aviso is not None and not erro
+        #Chamada fora da trava: a interface pode demorar sem atrasar quem publica
+        if self.atualizar_status:
+            if erro:
+                self.atualizar_status("", erro=erro)
+            else:
+                self.atualizar_status(mensagem)
+
+    def _laco(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self._entregar()
+            except Exception as e:
+                print(f"[AVISO] Falha ao atualizar o status: {e}")
+
+    def iniciar(self):
+        if self._thread is None and self.atualizar_status:
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._laco, name="progresso", daemon=True)
+            self._thread.start()
+        return self
+
+    def encerrar(self):
+        """Para as entregas periódicas (eventos pendentes são descartados; use finalizar para a mensagem final)"""
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join()
+            self._thread = None
+
+    def finalizar(self, mensagem):
+        """Encerra as entregas periódicas e envia a mensagem final imediatamente"""
+        self.encerrar()
+        if self.atualizar_status:
+            self.atualizar_status(mensagem)
@@ -0,0 +1,60 @@
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+
+#Trecho lido do começo (trailer de PDF linearizado) e do fim (trailer comum ou de atualização incremental)
+TAMANHO_SONDAGEM = 64 * 1024
+MARCADOR_CRIPTOGRAFIA = b"/Encrypt"
+
+
+class ArquivoProtegido(Exception):
+    """O documento só abre com senha"""
+
+
+def sondar_pdf(caminho_pdf):
+    """Lê só o começo e o fim do PDF (trailer e dicionários próximos); retorna (inicio, fim)"""
+    with open(caminho_pdf, 'rb') as f:
+        inicio = f.read(TAMANHO_SONDAGEM)
+        f.seek(0, 2)
+        tamanho = f.tell()
+        if tamanho <= TAMANHO_SONDAGEM:
+            return inicio, b""
+        f.seek(max(TAMANHO_SONDAGEM, tamanho - TAMANHO_SONDAGEM))
+        return inicio, f.read()
+
+
+def pdf_criptografado(caminho_pdf):
+    #Sondagem barata: procura /Encrypt no dicionário do trailer sem carregar o documento
+    #(o dicionário fica fora dos fluxos comprimidos, inclusive em PDFs com xref em fluxo)
+    inicio, fim = sondar_pdf(caminho_pdf)
+    return MARCADOR_CRIPTOGRAFIA in inicio or MARCADOR_CRIPTOGRAFIA in fim
+
+
+def erro_de_senha(excecao):
+    if getattr(excecao, 'err_code', None) == pdfium_c.FPDF_ERR_PASSWORD:
+        return True
+    return "password" in str(excecao).lower()
+
+
+def abrir_pdf(caminho_pdf):
+    """Abre um PDF com o pdfium; se ele exigir senha, levanta ArquivoProtegido"""
+    #Quem converte já descobre a proteção ao abrir: nenhuma leitura extra na varredura
+    try:
+        return pdfium.PdfDocument(caminho_pdf)
+    except pdfium.PdfiumError as e:
+        if erro_de_senha(e):
+            raise ArquivoProtegido(str(e))
+        raise
+
+
+def pdf_protegido(caminho_pdf):
+    """Indica se o PDF exige senha para abrir (só carrega o documento quando o trailer tem /Encrypt)"""
+    #Só a senha de dono (restrição de impressão/cópia) também cria /Encrypt, mas abre normalmente
+    if not pdf_criptografado(caminho_pdf):
+        return False
+    try:
+        abrir_pdf(caminho_pdf).close()
+    except ArquivoProtegido:
+        return True
+    except pdfium.PdfiumError:
+        return False
+    return False
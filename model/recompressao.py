@@ -0,0 +1,173 @@
+import io
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from model.gravacao import gravacao_atomica
+from model.cancelamento import verificar_cancelamento
+from model.codificacao import normalizar_modo, classificar_imagem, codificar_pagina, PERFIL_COLORIDO, PERFIL_CINZA
+from model.metricas import medir, contar
+from model.protecao import abrir_pdf
+
+MAX_THREADS_RECOMPRESSAO = min(4, os.cpu_count() or 1)
+TOLERANCIA_DPI = 1.25  # Imagens até 25% acima da resolução alvo ficam como estão
+GANHO_MINIMO = 0.9  # A nova codificação precisa ser pelo menos 10% menor que a original
+
+#Filtros que já comprimem os dados da imagem (sem eles a imagem está crua no PDF)
+FILTROS_COMPRESSAO = {'DCTDecode', 'FlateDecode', 'CCITTFaxDecode', 'JBIG2Decode', 'JPXDecode', 'LZWDecode', 'RunLengthDecode'}
+
+
+class _ImagemPagina:
+    #Imagem de uma página aguardando a recodificação (feita em outra thread)
+    def __init__(self, objeto, tamanho_original, largura, altura):
+        self.objeto = objeto
+        self.tamanho_original = tamanho_original
+        self.largura = largura
+        self.altura = altura
+        self.futuro = None
+
+
+def _tamanho_alvo(objeto, dpi_alvo):
+    #Pixels que a imagem precisa ter para ser exibida a dpi_alvo, ou None se já estiver perto disso
+    largura, altura = objeto.get_px_size()
+    metadados = objeto.get_metadata()
+    dpi_horizontal, dpi_vertical = metadados.horizontal_dpi, metadados.vertical_dpi
+    comprimida = FILTROS_COMPRESSAO.intersection(objeto.get_filters())
+    if metadados.bits_per_pixel == 1:
+        # Digitalização bitonal (G4/JBIG2): já é compacta e perderia a legibilidade ao reduzir
+        return None
+    if dpi_horizontal <= 0 or dpi_vertical <= 0 or min(dpi_horizontal, dpi_vertical) <= dpi_alvo * TOLERANCIA_DPI:
+        # Resolução já adequada: só recodifica se a imagem estiver sem compressão
+        return None if comprimida else (largura, altura)
+    return (
+        max(1, round(largura * dpi_alvo / dpi_horizontal)),
+        max(1, round(altura * dpi_alvo / dpi_vertical)),
+    )
+
+
+def recodificar_imagem(img, largura, altura, qualidade):
+    """Reduz a imagem para (largura, altura) e codifica; retorna (ImagemCodificada, imagem reduzida)"""
+    #Roda nas threads auxiliares: redimensionar e codificar no Pillow liberam o GIL
+    img = normalizar_modo(img)
+    if img.size != (largura, altura):
+        img = img.resize((largura, altura), Image.Resampling.LANCZOS)
+    perfil = PERFIL_COLORIDO if classificar_imagem(img) == PERFIL_COLORIDO else PERFIL_CINZA
+    if perfil == PERFIL_CINZA:
+        img = img.convert('L')
+    return codificar_pagina(img, perfil, qualidade), img
+
+
+def _aplicar(pagina, imagens):
+    #Troca as imagens da página pelas versões recodificadas (no pdfium, só nesta thread)
+    trocadas = 0
+    for imagem in imagens:
+        codificada, img = imagem.futuro.result()
+        if codificada.tamanho() >= imagem.tamanho_original * GANHO_MINIMO:
+            continue
+        if codificada.filtro == 'DCTDecode':
+            imagem.objeto.load_jpeg(io.BytesIO(codificada.dados), pages=[pagina])
+        else:
+            # O pdfium comprime o bitmap com Flate ao gravar
+            imagem.objeto.set_bitmap(pdfium.PdfBitmap.from_pil(img), pages=[pagina])
+        trocadas += 1
+    if trocadas:
+        pagina.gen_content()
+    return trocadas
+
+
+def _tem_imagem_para_reduzir(pagina, dpi_alvo):
+    #Consulta só os metadados (sem decodificar) no documento de origem
+    return any(
+        _tamanho_alvo(objeto, dpi_alvo) is not None
+        for objeto in pagina.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE], max_depth=1)
+    )
+
+
+def recomprimir_pdf(caminho_origem, caminho_destino, dpi_alvo, qualidade, max_threads=MAX_THREADS_RECOMPRESSAO):
+    """Grava em caminho_destino uma cópia do PDF com as imagens reduzidas a dpi_alvo e recodificadas"""
+    #Páginas só com texto e vetores (ou com imagens já na resolução alvo) não são alteradas.
+    #Cada página alterada é refeita em um documento próprio e volta para a mesma posição: uma imagem
+    #compartilhada por várias páginas não pode ser trocada no lugar sem afetar as outras.
+    #O pdfium não pode ser usado por várias threads: leitura e troca das imagens ficam nesta thread,
+    #a redução e a codificação de várias páginas rodam ao mesmo tempo nas threads auxiliares,
+    #com uma janela limitada de páginas em memória. Retorna a quantidade de imagens trocadas.
+    pdf = abrir_pdf(caminho_origem)
+    trocadas = 0
+    pendentes = []  # (indice, documento com a página, página, [_ImagemPagina]) na ordem das páginas
+    recodificadas = {}  # (hash dos dados, tamanho alvo) -> futuro: imagem repetida é codificada uma vez
+    janela = max_threads * 2
+    limite_recodificadas = janela * 4  # Só as mais recentes (cada resultado guarda a imagem reduzida)
+
+    def concluir_mais_antiga():
+        nonlocal trocadas
+        indice, documento, pagina, imagens = pendentes.pop(0)
+        try:
+            try:
+                trocadas_pagina = _aplicar(pagina, imagens)
+            finally:
+                # Os objetos de imagem pertencem à página: ela só é fechada depois da troca
+                pagina.close()
+            if trocadas_pagina:
+                pdf.del_page(indice)
+                pdf.import_pages(documento, [0], index=indice)
+                trocadas += trocadas_pagina
+        finally:
+            documento.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_threads) as executor:
+            for indice in range(len(pdf)):
+                verificar_cancelamento()
+                pagina = pdf[indice]
+                try:
+                    alterar = _tem_imagem_para_reduzir(pagina, dpi_alvo)
+                finally:
+                    pagina.close()
+                if not alterar:
+                    continue
+
+                documento = pdfium.PdfDocument.new()
+                documento.import_pages(pdf, [indice])
+                pagina = documento[0]
+                imagens = []
+                pendentes.append((indice, documento, pagina, imagens))
+                for objeto in pagina.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE], max_depth=1):
+                    tamanho = _tamanho_alvo(objeto, dpi_alvo)
+                    if tamanho is None:
+                        continue
+                    dados = objeto.get_data(decode_simple=False)
+                    imagem = _ImagemPagina(objeto, len(dados), *tamanho)
+                    chave = (hashlib.sha256(dados).digest(), tamanho)
+                    imagem.futuro = recodificadas.get(chave)
+                    if imagem.futuro is None:
+                        # Bitmap já com máscara e espaço de cor aplicados, na resolução original
+                        # (cópia própria: o bitmap do pdfium é liberado assim que sai de escopo)
+                        img = objeto.get_bitmap(render=True).to_pil().copy()
+                        if img.mode in ['RGBA', 'LA'] and img.getchannel('A').getextrema()[0] < 255:
+                            # Transparência (SMask) se perderia na troca: mantém a imagem original
+                            continue
+                        imagem.futuro = recodificadas[chave] = executor.submit(
+                            recodificar_imagem, img, imagem.largura, imagem.altura, qualidade
+                        )
+                        if len(recodificadas) > limite_recodificadas:
+                            recodificadas.pop(next(iter(recodificadas)))
+                    imagens.append(imagem)
+
+                if len(pendentes) >= janela:
+                    concluir_mais_antiga()
+
+            while pendentes:
+                concluir_mais_antiga()
+
+        with medir("pdfium_save"), gravacao_atomica(caminho_destino) as caminho_parcial:
+            pdf.save(caminho_parcial)
+    finally:
+        for _, documento, pagina, _ in pendentes:
+            pagina.close()
+            documento.close()
+        pdf.close()
+
+    contar("imagens_recomprimidas", trocadas)
+    return trocadas
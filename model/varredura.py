@@ -0,0 +1,53 @@
+import os
+import asyncio
+from pathlib import Path
+from model.metricas import medir
+
+
+def _listar_pasta(pasta):
+    #Lê uma única pasta com os.scandir (sem stat extra para saber se é pasta ou arquivo)
+    arquivos = []
+    subpastas = []
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    subpastas.append(entrada.path)
+                elif entrada.is_file():
+                    arquivos.append(entrada.path)
+            except OSError as e:
+                print(f"[AVISO] Falha ao ler {entrada.path}: {e}")
+    return arquivos, subpastas
+
+
+def _chave_pasta(pasta):
+    return os.path.normcase(os.path.abspath(pasta))
+
+
+async def varrer_arquivos(origem, ignorar=()):
+    """Percorre a árvore de origem entregando os arquivos à medida que são encontrados"""
+    #Só a pilha de pastas pendentes fica em memória, nunca a lista completa de arquivos.
+    #Cada pasta é lida em uma thread para não travar o event loop em compartilhamentos de rede.
+    #As pastas em `ignorar` (ex.: o destino dentro da origem, que recebe PDFs durante a
+    #varredura) não são percorridas, pelo caminho informado nem pelo caminho real
+    pastas_ignoradas = set()
+    for pasta in ignorar:
+        pastas_ignoradas.add(_chave_pasta(pasta))
+        pastas_ignoradas.add(_chave_pasta(os.path.realpath(pasta)))
+    pendentes = [Path(origem)]
+    while pendentes:
+        pasta = pendentes.pop()
+        try:
+            with medir("varredura"):
+                arquivos, subpastas = await asyncio.to_thread(_listar_pasta, pasta)
+        except OSError as e:
+            print(f"[AVISO] Falha ao listar a pasta {pasta}: {e}")
+            continue
+
+        for arquivo in arquivos:
+            yield Path(arquivo)
+
+        if pastas_ignoradas:
+            subpastas = [subpasta for subpasta in subpastas if _chave_pasta(subpasta) not in pastas_ignoradas]
+        #Inverte para visitar as subpastas na ordem em que foram listadas (como o os.walk)
+        pendentes.extend(Path(subpasta) for subpasta in reversed(subpastas))
@@ -0,0 +1,333 @@
+import os
+import sys
+import math
+import shutil
+import asyncio
+import tempfile
+import subprocess
+from pathlib import Path
+from multiprocessing import util
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from model.gravacao import gravacao_atomica
+
+try:
+    from docx2pdf import convert as docx2pdf_convert
+except ImportError:
+    docx2pdf_convert = None
+
+EXTENSOES_WORD = ['.doc', '.docx']
+
+#Backends de conversão Word -> PDF
+BACKEND_AUTOMATICO = "automatico"  # Word (Windows), docx2pdf (macOS) ou LibreOffice (Linux)
+BACKEND_MS_WORD = "word"  # Word via COM, uma instância aberta por processo do pool
+BACKEND_DOCX2PDF = "docx2pdf"
+BACKEND_LIBREOFFICE = "libreoffice"  # soffice --headless, um lote de documentos por execução
+BACKEND_FALSO = "falso"  # Não converte: grava um PDF de uma página por documento (testes e benchmarks)
+BACKENDS_WORD = [BACKEND_AUTOMATICO, BACKEND_MS_WORD, BACKEND_DOCX2PDF, BACKEND_LIBREOFFICE, BACKEND_FALSO]
+BACKEND_WORD_PADRAO = os.environ.get("DOCUMENTA_BACKEND_WORD", BACKEND_AUTOMATICO)
+
+TAMANHO_LOTE_WORD = 8  # Máximo de documentos por execução do LibreOffice
+TEMPO_LIMITE_DOCUMENTO = 300  # Segundos por documento no LibreOffice
+
+FORMATO_PDF_WORD = 17  # wdFormatPDF
+
+
+class BackendWord:
+    """Converte documentos Word em PDF; uma instância vive enquanto o processo do pool viver"""
+
+    nome = None
+
+    def converter(self, caminho_origem, caminho_destino):
+        raise NotImplementedError
+
+    def converter_lote(self, pares):
+        """Converte vários (origem, destino) e retorna, na mesma ordem, None ou a mensagem de erro"""
+        resultados = []
+        for caminho_origem, caminho_destino in pares:
+            try:
+                self.converter(Path(caminho_origem), Path(caminho_destino))
+                resultados.append(None)
+            except Exception as e:
+                resultados.append(str(e))
+        return resultados
+
+    def fechar(self):
+        pass
+
+
+class BackendMsWord(BackendWord):
+    """Word via COM, aberto uma vez e reaproveitado em todos os documentos do processo"""
+
+    nome = BACKEND_MS_WORD
+
+    def __init__(self):
+        import pythoncom
+        import win32com.client
+        pythoncom.CoInitialize()
+        # DispatchEx: instância própria, sem disputar o Word que o usuário tenha aberto
+        self.word = win32com.client.DispatchEx("Word.Application")
+        self.word.Visible = False
+        self.word.DisplayAlerts = 0
+
+    def converter(self, caminho_origem, caminho_destino):
+        documento = self.word.Documents.Open(
+            str(caminho_origem.resolve()), ConfirmConversions=False, ReadOnly=True, AddToRecentFiles=False
+        )
+        # O Word escolhe a extensão pelo nome: o temporário também termina em .pdf
+        caminho_parcial = caminho_destino.with_name(f"{caminho_destino.stem}.parcial.pdf")
+        try:
+            documento.SaveAs2(str(caminho_parcial.resolve()), FileFormat=FORMATO_PDF_WORD)
+            caminho_parcial.replace(caminho_destino)
+        finally:
+            documento.Close(0)
+            if caminho_parcial.exists():
+                caminho_parcial.unlink()
+
+    def fechar(self):
+        if self.word is not None:
+            self.word.Quit()
+            self.word = None
+
+
+class BackendDocx2Pdf(BackendWord):
+    """docx2pdf (Word no Windows e no macOS), abrindo o Word a cada documento"""
+
+    nome = BACKEND_DOCX2PDF
+
+    def __init__(self):
+        if docx2pdf_convert is None:
+            raise Exception("docx2pdf não está instalado")
+
+    def converter(self, caminho_origem, caminho_destino):
+        docx2pdf_convert(caminho_origem, caminho_destino)
+
+
+class BackendLibreOffice(BackendWord):
+    """LibreOffice sem interface: converte um lote inteiro em uma única execução do soffice"""
+
+    nome = BACKEND_LIBREOFFICE
+
+    def __init__(self, executavel=None):
+        self.executavel = executavel or localizar_soffice()
+        if not self.executavel:
+            raise Exception("LibreOffice (soffice) não encontrado")
+        # Perfil próprio por processo: execuções paralelas não disputam o perfil do usuário,
+        # e a partir do segundo lote o soffice já encontra o perfil criado (inicia mais rápido)
+        self.perfil = Path(tempfile.mkdtemp(prefix="documenta_soffice_"))
+
+    def converter(self, caminho_origem, caminho_destino):
+        erro = self.converter_lote([(caminho_origem, caminho_destino)])[0]
+        if erro:
+            raise Exception(erro)
+
+    def converter_lote(self, pares):
+        resultados = [None] * len(pares)
+        pendentes = list(enumerate(pares))
+        while pendentes:
+            # O soffice grava <nome>.pdf na pasta de saída: nomes repetidos vão para o lote seguinte
+            lote, nomes, pendentes_seguintes = [], set(), []
+            for indice, (caminho_origem, caminho_destino) in pendentes:
+                nome = Path(caminho_origem).stem
+                if nome in nomes:
+                    pendentes_seguintes.append((indice, (caminho_origem, caminho_destino)))
+                else:
+                    nomes.add(nome)
+                    lote.append((indice, Path(caminho_origem), Path(caminho_destino)))
+            self._executar_lote(lote, resultados)
+            pendentes = pendentes_seguintes
+        return resultados
+
+    def _executar_lote(self, lote, resultados):
+        pasta_saida = Path(tempfile.mkdtemp(prefix="saida_", dir=self.perfil))
+        try:
+            comando = [
+                self.executavel, f"-env:UserInstallation={self.perfil.as_uri()}", "--headless", "--norestore",
+                "--nolockcheck", "--convert-to", "pdf", "--outdir", str(pasta_saida),
+            ] + [str(caminho_origem) for _, caminho_origem, _ in lote]
+            try:
+                execucao = subprocess.run(comando, capture_output=True, text=True,
+                                          timeout=TEMPO_LIMITE_DOCUMENTO * len(lote))
+                detalhe = (execucao.stderr or execucao.stdout).strip().splitlines()
+                detalhe = detalhe[-1] if detalhe else f"código de saída {execucao.returncode}"
+            except subprocess.TimeoutExpired:
+                detalhe = "tempo limite excedido"
+
+            for indice, caminho_origem, caminho_destino in lote:
+                gerado = pasta_saida / f"{caminho_origem.stem}.pdf"
+                if not gerado.exists():
+                    resultados[indice] = f"LibreOffice não gerou o PDF ({detalhe})"
+                    continue
+                with gravacao_atomica(caminho_destino) as caminho_parcial:
+                    shutil.copyfile(gerado, caminho_parcial)
+        finally:
+            shutil.rmtree(pasta_saida, ignore_errors=True)
+
+    def fechar(self):
+        shutil.rmtree(self.perfil, ignore_errors=True)
+
+
+class BackendFalso(BackendWord):
+    """Grava um PDF de uma página com o nome do documento, sem depender do Word"""
+
+    nome = BACKEND_FALSO
+
+    def __init__(self):
+        self.convertidos = []
+        self.lotes = 0
+
+    def converter_lote(self, pares):
+        self.lotes += 1
+        return super().converter_lote(pares)
+
+    def converter(self, caminho_origem, caminho_destino):
+        if caminho_origem.stat().st_size == 0:
+            raise Exception("Arquivo está vazio")
+        with gravacao_atomica(caminho_destino) as caminho_parcial:
+            c = canvas.Canvas(str(caminho_parcial), pagesize=A4)
+            c.drawString(72, A4[1] - 72, caminho_origem.name)
+            c.save()
+        self.convertidos.append(caminho_origem)
+
+
+def localizar_soffice():
+    for nome in ['soffice', 'libreoffice']:
+        caminho = shutil.which(nome)
+        if caminho:
+            return caminho
+    if sys.platform == 'win32':
+        padrao = Path(os.environ.get('PROGRAMFILES', 'C:/Program Files')) / 'LibreOffice' / 'program' / 'soffice.exe'
+        if padrao.exists():
+            return str(padrao)
+    elif sys.platform == 'darwin':
+        padrao = Path('/Applications/LibreOffice.app/Contents/MacOS/soffice')
+        if padrao.exists():
+            return str(padrao)
+    return None
+
+
+def resolver_backend(nome=None):
+    #"automatico" vira o backend disponível nesta máquina
+    nome = nome or BACKEND_WORD_PADRAO
+    if nome not in BACKENDS_WORD:
+        raise Exception(f"Backend Word inválido: {nome}")
+    if nome != BACKEND_AUTOMATICO:
+        return nome
+    if sys.platform == 'win32':
+        try:
+            import win32com.client  # noqa: F401
+            return BACKEND_MS_WORD
+        except ImportError:
+            return BACKEND_DOCX2PDF
+    if sys.platform == 'darwin' and docx2pdf_convert is not None:
+        return BACKEND_DOCX2PDF
+    if localizar_soffice():
+        return BACKEND_LIBREOFFICE
+    return BACKEND_DOCX2PDF
+
+
+_CLASSES_BACKEND = {
+    BACKEND_MS_WORD: BackendMsWord,
+    BACKEND_DOCX2PDF: BackendDocx2Pdf,
+    BACKEND_LIBREOFFICE: BackendLibreOffice,
+    BACKEND_FALSO: BackendFalso,
+}
+
+#Backends já abertos neste processo (cada processo do pool mantém os seus até encerrar)
+_backends = {}
+
+
+def _fechar_backends():
+    for backend in _backends.values():
+        try:
+            backend.fechar()
+        except Exception as e:
+            print(f"[AVISO] Falha ao fechar backend Word {backend.nome}: {e}")
+    _backends.clear()
+
+
+def obter_backend(nome=None):
+    """Backend Word deste processo, criado no primeiro uso e reaproveitado nos seguintes"""
+    nome = resolver_backend(nome)
+    backend = _backends.get(nome)
+    if backend is None:
+        if not _backends:
+            # Processos do pool saem sem rodar o atexit; o Finalize do multiprocessing roda
+            util.Finalize(None, _fechar_backends, exitpriority=10)
+        backend = _backends[nome] = _CLASSES_BACKEND[nome]()
+    return backend
+
+
+def converter_lote_word(nome_backend, pares):
+    #Roda em um processo do MotorConversao (função de módulo para poder ser enviada ao processo)
+    return obter_backend(nome_backend).converter_lote(pares)
+
+
+class AgrupadorWord:
+    """Envia os documentos Word a processos do pool, juntando em lotes só quando isso não deixa processo parado"""
+    #Word (COM) e docx2pdf já ficam abertos em cada processo: cada documento vai sozinho, todos os
+    #processos trabalham. No LibreOffice cada execução do soffice tem custo fixo de inicialização, então
+    #os documentos que chegam enquanto todos os processos estão ocupados com Word esperam e seguem juntos,
+    #em lotes de até ceil(pendentes / processos) (no máximo tamanho_lote), quando um processo libera.
+
+    def __init__(self, motor, backend=None, tamanho_lote=TAMANHO_LOTE_WORD):
+        self.motor = motor
+        self.backend = resolver_backend(backend)
+        self.tamanho_lote = tamanho_lote if self.backend == BACKEND_LIBREOFFICE else 1
+        self.anunciados = 0  # Documentos Word ainda na fila de conversão (entram na conta do tamanho do lote)
+        self._pendentes = []  # (origem, destino, futuro)
+        self._execucoes = set()
+
+    def anunciar(self):
+        """Um documento Word entrou na fila de conversão"""
+        self.anunciados += 1
+
+    def retirar_anuncio(self):
+        """O documento anunciado saiu da fila (para ser convertido ou ignorado)"""
+        self.anunciados = max(0, self.anunciados - 1)
+
+    def _limite_lote(self):
+        pendentes = len(self._pendentes) + self.anunciados
+        return max(1, min(self.tamanho_lote, math.ceil(pendentes / self.motor.max_processos)))
+
+    async def converter(self, caminho_origem, caminho_destino):
+        """Converte um documento em PDF; termina quando o lote em que ele entrou terminar"""
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes.append((caminho_origem, caminho_destino, futuro))
+        if len(self._pendentes) >= self._limite_lote():
+            self._despachar()
+        else:
+            self._ocupar_livres()
+        erro = await futuro
+        if erro:
+            raise Exception(erro)
+
+    def _ocupar_livres(self):
+        #Processo livre não espera lote cheio
+        while self._pendentes and len(self._execucoes) < self.motor.max_processos:
+            self._despachar()
+
+    def _despachar(self):
+        limite = self._limite_lote()
+        lote, self._pendentes = self._pendentes[:limite], self._pendentes[limite:]
+        execucao = asyncio.ensure_future(self._executar(lote))
+        self._execucoes.add(execucao)
+        execucao.add_done_callback(self._concluido)
+
+    def _concluido(self, execucao):
+        #Um processo ficou livre: o que estiver aguardando segue agora
+        self._execucoes.discard(execucao)
+        self._ocupar_livres()
+
+    async def _executar(self, lote):
+        pares = [(caminho_origem, caminho_destino) for caminho_origem, caminho_destino, _ in lote]
+        erros = ["Conversão Word interrompida"] * len(lote)
+        try:
+            erros = await self.motor.executar(converter_lote_word, self.backend, pares)
+        except Exception as e:
+            erros = [str(e)] * len(lote)
+        finally:
+            # Quem aguarda o lote é sempre liberado, mesmo se esta tarefa for cancelada
+            for (_, _, futuro), erro in zip(lote, erros):
+                if not futuro.done():
+                    futuro.set_result(erro)
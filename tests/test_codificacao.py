@@ -0,0 +1,56 @@
+import pytest
+from PIL import Image, ImageDraw
+from model.codificacao import (
+    PERFIL_BITONAL, PERFIL_CINZA, PERFIL_COLORIDO, classificar_imagem, codificar_pagina,
+)
+
+
+def pagina(modo, fundo, tinta):
+    img = Image.new(modo, (600, 800), fundo)
+    desenho = ImageDraw.Draw(img)
+    for linha in range(40, 760, 30):
+        desenho.rectangle([40, linha, 560, linha + 10], fill=tinta)
+    return img
+
+
+@pytest.mark.parametrize("img, esperado", [
+    (pagina("1", 1, 0), PERFIL_BITONAL),
+    (pagina("L", 255, 0), PERFIL_BITONAL),
+    (pagina("L", 250, 10), PERFIL_BITONAL),
+    (pagina("RGB", (255, 255, 255), (0, 0, 0)), PERFIL_BITONAL),
+    #Dois tons de cinza ou uma página uniforme cinza não são preto e branco
+    (pagina("L", 150, 100), PERFIL_CINZA),
+    (pagina("L", 128, 128), PERFIL_CINZA),
+    (pagina("RGB", (200, 200, 200), (30, 30, 30)).rotate(7, fillcolor=(200, 200, 200)), PERFIL_CINZA),
+    (pagina("RGB", (255, 255, 255), (200, 30, 30)), PERFIL_COLORIDO),
+])
+def test_classificacao(img, esperado):
+    assert classificar_imagem(img) == esperado
+
+
+def test_pagina_bitonal_vira_g4_ou_flate_de_1_bit():
+    imagem = codificar_pagina(pagina("L", 255, 0))
+    assert imagem.bits == 1
+    assert imagem.filtro in ("CCITTFaxDecode", "FlateDecode")
+
+
+def test_pagina_cinza_fica_em_um_canal():
+    imagem = codificar_pagina(pagina("RGB", (220, 220, 220), (40, 40, 40)).rotate(7, fillcolor=(220, 220, 220)))
+    assert (imagem.espaco_cor, imagem.bits) == ("DeviceGray", 8)
+
+
+def test_pagina_colorida_em_jpeg_rgb():
+    imagem = codificar_pagina(pagina("RGB", (255, 255, 255), (200, 30, 30)).rotate(7, fillcolor=(255, 255, 255)))
+    assert (imagem.espaco_cor, imagem.filtro) == ("DeviceRGB", "DCTDecode")
+
+
+def test_perfil_forcado_ignora_a_classificacao():
+    colorida = pagina("RGB", (255, 255, 255), (200, 30, 30))
+    assert codificar_pagina(colorida, PERFIL_BITONAL).bits == 1
+    assert codificar_pagina(colorida, PERFIL_CINZA).espaco_cor == "DeviceGray"
+    assert codificar_pagina(pagina("L", 255, 0), PERFIL_COLORIDO).espaco_cor == "DeviceRGB"
+
+
+def test_bitonal_menor_que_jpeg_colorido():
+    img = pagina("RGB", (255, 255, 255), (0, 0, 0))
+    assert codificar_pagina(img).tamanho() < codificar_pagina(img, PERFIL_COLORIDO).tamanho()
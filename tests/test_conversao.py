@@ -0,0 +1,164 @@
+import asyncio
+import json
+import pypdfium2 as pdfium
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+import model.converter as converter
+import model.divisor_paginas as divisor_paginas
+from model.cancelamento import TokenCancelamento
+from model.converter import ConversorModel, PAGINAS_POR_LOTE
+from model.memoria import EstimativaArquivo
+
+
+def criar_pdf(caminho, paginas):
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(paginas):
+        pdf.new_page(595, 842)
+    pdf.save(caminho)
+    pdf.close()
+    return caminho
+
+
+def criar_pdf_reportlab(caminho, paginas):
+    c = canvas.Canvas(str(caminho), pagesize=A4)
+    for i in range(paginas):
+        c.drawString(72, 720, f"Página {i + 1}")
+        c.showPage()
+    c.save()
+    return caminho
+
+
+def converter_pasta(origem, destino, **opcoes):
+    """Conversão completa com métricas em JSON; retorna (PDFs gerados, erros, contadores)"""
+    opcoes.setdefault("max_processos", 2)
+    gerados, erros = asyncio.run(ConversorModel.converter_para_pdf(origem, destino, metricas="json", **opcoes))
+    contadores = {}
+    for caminho in destino.glob("metricas_*.json"):
+        contadores = json.loads(caminho.read_text(encoding="utf-8"))["contadores"]
+        caminho.unlink()
+    return gerados, erros, contadores
+
+
+def contar_paginas(caminho):
+    pdf = pdfium.PdfDocument(caminho)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def test_pdf_de_uma_pagina_abre_a_origem_uma_vez(tmp_path, monkeypatch):
+    origem = criar_pdf(tmp_path / "um.pdf", 1)
+    aberturas = []
+
+    def abrir_contando(caminho):
+        aberturas.append(caminho)
+        return pdfium.PdfDocument(caminho)
+
+    (tmp_path / "saida").mkdir()
+    monkeypatch.setattr(divisor_paginas, "abrir_pdf", abrir_contando)
+    monkeypatch.setattr(converter, "abrir_pdf", abrir_contando)
+    saidas = asyncio.run(ConversorModel.converter_pdf_para_paginas_individuais(origem, tmp_path / "saida" / "um.pdf"))
+
+    assert saidas == [tmp_path / "saida" / "um.pdf"]
+    assert contar_paginas(saidas[0]) == 1
+    assert len(aberturas) == 1
+
+
+def test_documento_grande_dividido_em_intervalos(tmp_path):
+    origem = tmp_path / "origem"
+    origem.mkdir()
+    criar_pdf_reportlab(origem / "grande.pdf", 2 * PAGINAS_POR_LOTE + 100)
+    gerados, erros, contadores = converter_pasta(origem, tmp_path / "destino")
+
+    assert erros == []
+    assert gerados == 2 * PAGINAS_POR_LOTE + 100
+    assert contadores["documentos_divididos"] == 1
+    assert contadores["intervalos_paginas"] == 3
+    nomes = {caminho.name for caminho in (tmp_path / "destino").glob("grande_pagina*.pdf")}
+    assert nomes == {f"grande_pagina{i}.pdf" for i in range(1, 2 * PAGINAS_POR_LOTE + 101)}
+
+
+def test_estimativa_baixa_replanejada_pelo_total_real(tmp_path, monkeypatch):
+    #O processo que abre o documento relata 400 páginas: as que faltam também são divididas
+    origem = tmp_path / "origem"
+    origem.mkdir()
+    criar_pdf_reportlab(origem / "grande.pdf", 400)
+    monkeypatch.setattr(converter, "estimar_arquivo", lambda caminho: EstimativaArquivo(16 * 1024**2))
+    gerados, erros, contadores = converter_pasta(origem, tmp_path / "destino")
+
+    assert erros == []
+    assert gerados == 400
+    # (0, 1) e depois (1, 151), (151, 301), (301, 400)
+    assert contadores["intervalos_paginas"] == 4
+    assert len(list((tmp_path / "destino").glob("grande_pagina*.pdf"))) == 400
+
+
+def test_segunda_execucao_pula_fontes_ja_convertidas(tmp_path):
+    origem = tmp_path / "origem"
+    destino = tmp_path / "destino"
+    origem.mkdir()
+    criar_pdf(origem / "a.pdf", 3)
+    criar_pdf(origem / "b.pdf", 2)
+    gerados, erros, _ = converter_pasta(origem, destino)
+    assert (gerados, erros) == (5, [])
+    datas = {caminho.name: caminho.stat().st_mtime_ns for caminho in destino.glob("*.pdf")}
+
+    gerados, erros, contadores = converter_pasta(origem, destino)
+    assert (gerados, erros) == (0, [])
+    assert contadores["arquivos_ignorados"] == 2
+    assert {caminho.name: caminho.stat().st_mtime_ns for caminho in destino.glob("*.pdf")} == datas
+
+    #Só a fonte alterada é convertida de novo; incremental=False converte tudo
+    criar_pdf(origem / "b.pdf", 4)
+    gerados, _, contadores = converter_pasta(origem, destino)
+    assert gerados == 4
+    assert contadores["arquivos_ignorados"] == 1
+    gerados, _, _ = converter_pasta(origem, destino, incremental=False)
+    assert gerados == 7
+
+
+def test_fontes_repetidas_convertidas_uma_vez(tmp_path):
+    origem = tmp_path / "origem"
+    destino = tmp_path / "destino"
+    (origem / "copia").mkdir(parents=True)
+    criar_pdf(origem / "a.pdf", 3)
+    (origem / "copia" / "b.pdf").write_bytes((origem / "a.pdf").read_bytes())
+    gerados, erros, contadores = converter_pasta(origem, destino, deduplicar="hardlink")
+
+    assert (gerados, erros) == (6, [])
+    assert contadores["fontes_duplicadas"] == 1
+    for pagina in range(1, 4):
+        original = destino / f"a_pagina{pagina}.pdf"
+        repetida = destino / "copia" / f"b_pagina{pagina}.pdf"
+        assert repetida.stat().st_ino == original.stat().st_ino
+
+
+def test_interrupcao_nao_deixa_arquivos_parciais(tmp_path):
+    origem = tmp_path / "origem"
+    destino = tmp_path / "destino"
+    origem.mkdir()
+    for nome in ("a", "b", "c"):
+        criar_pdf_reportlab(origem / f"{nome}.pdf", 3 * PAGINAS_POR_LOTE)
+    parar = TokenCancelamento()
+
+    async def cancelar_quando_comecar():
+        while not any(destino.glob("*_pagina*.pdf")):
+            await asyncio.sleep(0.005)
+        parar.cancelar()
+
+    async def executar():
+        cancelador = asyncio.ensure_future(cancelar_quando_comecar())
+        try:
+            return await ConversorModel.converter_para_pdf(origem, destino, parar=parar, max_processos=2)
+        finally:
+            cancelador.cancel()
+
+    gerados, _ = asyncio.run(executar())
+    paginas = list(destino.rglob("*_pagina*.pdf"))
+
+    assert parar.cancelado
+    assert not list(destino.rglob("*.parcial"))
+    assert gerados == len(paginas) < 9 * PAGINAS_POR_LOTE
+    #Toda página gravada antes da parada é um PDF completo
+    assert all(contar_paginas(pagina) == 1 for pagina in paginas)
@@ -0,0 +1,49 @@
+import pytest
+from model.deduplicacao import (
+    POLITICA_COPIA, POLITICA_HARDLINK, RegistroDeduplicacao, hash_pdf, materializar,
+)
+
+
+def test_hardlink_e_copia(tmp_path):
+    origem = tmp_path / "a.pdf"
+    origem.write_bytes(b"%PDF conteudo")
+
+    assert materializar(origem, tmp_path / "link.pdf", POLITICA_HARDLINK) == POLITICA_HARDLINK
+    assert (tmp_path / "link.pdf").stat().st_ino == origem.stat().st_ino
+
+    assert materializar(origem, tmp_path / "copia.pdf", POLITICA_COPIA) == POLITICA_COPIA
+    assert (tmp_path / "copia.pdf").stat().st_ino != origem.stat().st_ino
+    assert (tmp_path / "copia.pdf").read_bytes() == origem.read_bytes()
+    assert not list(tmp_path.glob("*.parcial"))
+
+
+def test_destino_existente_substituido_sem_alterar_o_compartilhado(tmp_path):
+    origem = tmp_path / "a.pdf"
+    origem.write_bytes(b"original")
+    destino = tmp_path / "b.pdf"
+    destino.write_bytes(b"antigo")
+    materializar(origem, destino, POLITICA_HARDLINK)
+
+    assert destino.read_bytes() == b"original"
+    #Regravar o link troca o arquivo inteiro (rename): o conteúdo compartilhado não muda
+    (tmp_path / "outro.pdf").write_bytes(b"novo")
+    materializar(tmp_path / "outro.pdf", destino, POLITICA_COPIA)
+    assert destino.read_bytes() == b"novo"
+    assert origem.read_bytes() == b"original"
+
+
+def test_hash_ignora_o_id_do_trailer(tmp_path):
+    corpo = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog >>\nendobj\ntrailer\n<< /Root 1 0 R "
+    (tmp_path / "a.pdf").write_bytes(corpo + b"/ID [<0A0B><0C0D>] >>\n%%EOF\n")
+    (tmp_path / "b.pdf").write_bytes(corpo + b"/ID [<FFFF><EEEE>] >>\n%%EOF\n")
+    (tmp_path / "c.pdf").write_bytes(corpo.replace(b"Catalog", b"Catalogo") + b"/ID [<0A0B><0C0D>] >>\n%%EOF\n")
+
+    assert hash_pdf(tmp_path / "a.pdf") == hash_pdf(tmp_path / "b.pdf")
+    assert hash_pdf(tmp_path / "a.pdf") != hash_pdf(tmp_path / "c.pdf")
+
+
+def test_politica_invalida():
+    with pytest.raises(Exception, match="inválida"):
+        RegistroDeduplicacao("qualquer")
+    #Com cópia, deduplicar páginas não economiza espaço: fica desligado
+    assert not RegistroDeduplicacao(POLITICA_COPIA, paginas=True).paginas
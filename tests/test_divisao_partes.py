@@ -0,0 +1,123 @@
+import asyncio
+import os
+import pytest
+import pypdfium2 as pdfium
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+import model.cancelamento as cancelamento
+from model.cancelamento import ConversaoCancelada
+from model.converter import ConversorModel
+from model.divisao_partes import DivisorPartesPdf, planejar_partes, MARGEM_PLANEJAMENTO
+
+#Bytes aproximados de cada página (imagem de ruído, praticamente incompressível)
+TAMANHOS_PAGINAS = [20, 60, 15, 90, 30, 30, 70, 10]
+
+
+def criar_pdf_com_imagens(caminho, tamanhos_kb=TAMANHOS_PAGINAS):
+    c = canvas.Canvas(str(caminho), pagesize=A4)
+    for indice, tamanho in enumerate(tamanhos_kb):
+        lado = int((tamanho * 1024 / 3) ** 0.5)
+        ruido = Image.frombytes("RGB", (lado, lado), os.urandom(lado * lado * 3))
+        c.drawImage(ImageReader(ruido), 72, 300, lado / 2, lado / 2)
+        c.drawString(72, 800, f"Página {indice + 1}")
+        c.showPage()
+    c.save()
+    return caminho
+
+
+def textos_das_paginas(caminhos):
+    textos = []
+    for caminho in caminhos:
+        pdf = pdfium.PdfDocument(caminho)
+        try:
+            for indice in range(len(pdf)):
+                pagina = pdf[indice]
+                texto = pagina.get_textpage()
+                textos.append(texto.get_text_range().strip())
+                texto.close()
+                pagina.close()
+        finally:
+            pdf.close()
+    return textos
+
+
+class TokenQueCancela:
+    """Cancela depois de `verificacoes` chamadas a verificar_cancelamento"""
+
+    def __init__(self, verificacoes):
+        self.restantes = verificacoes
+
+    def verificar(self, concluidos=0):
+        self.restantes -= 1
+        if self.restantes < 0:
+            raise ConversaoCancelada(concluidos=concluidos)
+
+
+def test_planejamento_cobre_todas_as_paginas_em_ordem():
+    custos = [30, 30, 30, 200, 10, 10, 90]
+    partes = planejar_partes(custos, 100 / MARGEM_PLANEJAMENTO)
+    assert partes == [(0, 3), (3, 4), (4, 6), (6, 7)]
+    assert planejar_partes([], 100) == []
+
+
+def test_partes_sem_perder_paginas(tmp_path):
+    origem = criar_pdf_com_imagens(tmp_path / "grande.pdf")
+    limite = 150 * 1024
+    with DivisorPartesPdf(origem) as divisor:
+        partes = divisor.dividir(tmp_path / "grande.pdf", limite)
+
+    assert len(partes) > 1
+    assert [parte.name for parte in partes] == [f"grande_parte{i}.pdf" for i in range(1, len(partes) + 1)]
+    assert textos_das_paginas(partes) == [f"Página {i}" for i in range(1, len(TAMANHOS_PAGINAS) + 1)]
+    for parte in partes:
+        assert parte.stat().st_size <= limite or len(textos_das_paginas([parte])) == 1
+    assert not list(tmp_path.glob("*.parcial"))
+
+
+def test_pagina_maior_que_o_limite_e_mantida(tmp_path):
+    origem = criar_pdf_com_imagens(tmp_path / "grande.pdf", [10, 90, 10])
+    with DivisorPartesPdf(origem) as divisor:
+        partes = divisor.dividir(tmp_path / "grande.pdf", 40 * 1024)
+
+    assert textos_das_paginas(partes) == ["Página 1", "Página 2", "Página 3"]
+
+
+def test_cancelamento_nao_deixa_partes_nem_apaga_a_origem(tmp_path, monkeypatch):
+    origem = criar_pdf_com_imagens(tmp_path / "grande.pdf")
+    original = origem.read_bytes()
+    monkeypatch.setattr(cancelamento, "_token_processo", TokenQueCancela(2))
+
+    with pytest.raises(ConversaoCancelada):
+        asyncio.run(ConversorModel.dividir_pdf_grande(origem, tmp_path / "grande.pdf", 150 * 1024))
+
+    assert origem.read_bytes() == original
+    assert sorted(caminho.name for caminho in tmp_path.iterdir()) == ["grande.pdf"]
+
+
+def test_dividir_pdf_grande_troca_o_original_pelas_partes(tmp_path):
+    origem = criar_pdf_com_imagens(tmp_path / "grande.pdf")
+    assert asyncio.run(ConversorModel.dividir_pdf_grande(origem, tmp_path / "grande.pdf", 150 * 1024))
+
+    partes = sorted(tmp_path.glob("grande_parte*.pdf"), key=lambda parte: int(parte.stem.rsplit("parte", 1)[1]))
+    assert not origem.exists()
+    assert textos_das_paginas(partes) == [f"Página {i}" for i in range(1, len(TAMANHOS_PAGINAS) + 1)]
+
+
+def test_paginas_interrompidas_ficam_inteiras(tmp_path, monkeypatch):
+    from model.divisor_paginas import DivisorPaginasPdf
+
+    origem = criar_pdf_com_imagens(tmp_path / "grande.pdf")
+    destino = tmp_path / "saida"
+    destino.mkdir()
+    monkeypatch.setattr(cancelamento, "_token_processo", TokenQueCancela(3))
+
+    with DivisorPaginasPdf(origem) as divisor:
+        with pytest.raises(ConversaoCancelada) as erro:
+            divisor.dividir(destino / "grande.pdf")
+
+    assert erro.value.concluidos == 3
+    gravadas = sorted(destino.iterdir())
+    assert [caminho.name for caminho in gravadas] == [f"grande_pagina{i}.pdf" for i in range(1, 4)]
+    assert textos_das_paginas(gravadas) == ["Página 1", "Página 2", "Página 3"]
@@ -0,0 +1,80 @@
+import io
+import zipfile
+from pathlib import PurePosixPath
+import pytest
+import model.extracao as extracao
+from model.extracao import LimitesExtracao, _Contagem, _LeitorLimitado, _nome_seguro, iterar_membros
+
+
+def criar_zip(caminho, membros):
+    #membros: {nome: bytes}
+    with zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for nome, dados in membros.items():
+            arquivo_zip.writestr(nome, dados)
+    return caminho
+
+
+def ler_membros(caminho, limites=None):
+    return {str(membro.nome): membro.abrir().read() for membro in iterar_membros(caminho, limites)}
+
+
+@pytest.mark.parametrize("nome", [
+    "../fora.pdf", "pasta/../../fora.pdf", "/etc/passwd", "\\\\servidor\\x.pdf", "C:/Windows/x.pdf",
+    "C:x.pdf", "..\\fora.pdf", "", ".", "a\x00.pdf",
+])
+def test_nome_seguro_recusa_caminhos_inseguros(nome):
+    assert _nome_seguro(nome) is None
+
+
+@pytest.mark.parametrize("nome, esperado", [
+    ("a.pdf", "a.pdf"),
+    ("pasta/sub/a.pdf", "pasta/sub/a.pdf"),
+    ("./pasta//a.pdf", "pasta/a.pdf"),
+    ("pasta\\a.pdf", "pasta/a.pdf"),
+])
+def test_nome_seguro_normaliza(nome, esperado):
+    assert _nome_seguro(nome) == PurePosixPath(esperado)
+
+
+def test_membros_inseguros_sao_ignorados(tmp_path):
+    caminho = criar_zip(tmp_path / "lote.zip", {"../fora.pdf": b"x", "/abs.pdf": b"y", "ok.pdf": b"z"})
+    assert ler_membros(caminho) == {"ok.pdf": b"z"}
+
+
+def test_membro_maior_que_o_limite(tmp_path):
+    caminho = criar_zip(tmp_path / "lote.zip", {"grande.pdf": b"0" * 1000})
+    with pytest.raises(Exception, match="tamanho máximo"):
+        ler_membros(caminho, LimitesExtracao(tamanho_membro=100))
+
+
+def test_leitor_confere_bytes_reais():
+    #O cabeçalho pode declarar menos do que o membro realmente descompacta
+    limites = LimitesExtracao(tamanho_membro=10)
+    contagem = _Contagem(PurePosixPath("lote.zip"), limites, 1000)
+    with _LeitorLimitado(io.BytesIO(b"0" * 11), "a.pdf", limites.tamanho_membro, contagem) as leitor:
+        with pytest.raises(Exception, match="tamanho máximo"):
+            leitor.read()
+
+
+def test_tamanho_total(tmp_path):
+    caminho = criar_zip(tmp_path / "lote.zip", {f"{i}.pdf": b"0" * 100 for i in range(5)})
+    with pytest.raises(Exception, match="excede"):
+        ler_membros(caminho, LimitesExtracao(tamanho_total=250))
+
+
+def test_taxa_de_compressao(tmp_path, monkeypatch):
+    monkeypatch.setattr(extracao, "TAMANHO_MINIMO_RAZAO", 0)
+    caminho = criar_zip(tmp_path / "bomba.zip", {"zeros.pdf": b"\0" * 100000})
+    with pytest.raises(Exception, match="taxa de compressão"):
+        ler_membros(caminho, LimitesExtracao(razao_maxima=10))
+    assert ler_membros(caminho, LimitesExtracao(razao_maxima=10000)) == {"zeros.pdf": b"\0" * 100000}
+
+
+def test_aninhados_respeitam_a_profundidade(tmp_path):
+    interno = criar_zip(tmp_path / "interno.zip", {"a.pdf": b"a"})
+    meio = criar_zip(tmp_path / "meio.zip", {"interno.zip": interno.read_bytes()})
+    caminho = criar_zip(tmp_path / "lote.zip", {"meio.zip": meio.read_bytes(), "b.pdf": b"b"})
+
+    assert ler_membros(caminho) == {"meio/interno/a.pdf": b"a", "b.pdf": b"b"}
+    #Além da profundidade máxima o compactado aninhado é entregue como um arquivo comum
+    assert set(ler_membros(caminho, LimitesExtracao(profundidade_maxima=1))) == {"meio/interno.zip", "b.pdf"}
@@ -0,0 +1,40 @@
+import os
+import stat
+import pytest
+from model.gravacao import gravacao_atomica
+
+
+def test_arquivo_final_so_aparece_ao_terminar(tmp_path):
+    destino = tmp_path / "a.pdf"
+    with gravacao_atomica(destino) as parcial:
+        assert parcial.parent == tmp_path and parcial.name.endswith(".parcial")
+        parcial.write_bytes(b"%PDF")
+        assert not destino.exists()
+    assert destino.read_bytes() == b"%PDF"
+    assert list(tmp_path.iterdir()) == [destino]
+
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(destino.stat().st_mode) == 0o666 & ~umask
+
+
+def test_interrupcao_nao_deixa_arquivo(tmp_path):
+    destino = tmp_path / "a.pdf"
+    destino.write_bytes(b"anterior")
+    with pytest.raises(KeyboardInterrupt):
+        with gravacao_atomica(destino) as parcial:
+            parcial.write_bytes(b"pela metade")
+            raise KeyboardInterrupt
+    #O PDF anterior continua inteiro e o parcial foi removido
+    assert destino.read_bytes() == b"anterior"
+    assert list(tmp_path.iterdir()) == [destino]
+
+
+def test_gravacoes_simultaneas_do_mesmo_destino(tmp_path):
+    destino = tmp_path / "a.pdf"
+    with gravacao_atomica(destino) as primeiro, gravacao_atomica(destino) as segundo:
+        assert primeiro != segundo
+        primeiro.write_bytes(b"1")
+        segundo.write_bytes(b"2")
+    assert destino.read_bytes() == b"1"
+    assert list(tmp_path.iterdir()) == [destino]
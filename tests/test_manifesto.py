@@ -0,0 +1,57 @@
+import os
+from model.manifesto import ManifestoConversao
+
+
+def test_fonte_inalterada_com_saidas_existentes(tmp_path):
+    fonte = tmp_path / "a.pdf"
+    fonte.write_bytes(b"conteudo")
+    saida = tmp_path / "a_pagina1.pdf"
+    saida.write_bytes(b"%PDF")
+    manifesto = ManifestoConversao(tmp_path)
+    try:
+        assert not manifesto.ja_convertido(fonte)
+        manifesto.registrar(fonte, [saida])
+        assert manifesto.ja_convertido(fonte)
+
+        #Saída apagada no destino: converte de novo
+        saida.unlink()
+        assert not manifesto.ja_convertido(fonte)
+    finally:
+        manifesto.fechar()
+
+
+def test_fonte_alterada_volta_a_ser_convertida(tmp_path):
+    fonte = tmp_path / "a.pdf"
+    fonte.write_bytes(b"conteudo")
+    saida = tmp_path / "a.pdf.saida"
+    saida.write_bytes(b"%PDF")
+    manifesto = ManifestoConversao(tmp_path)
+    try:
+        manifesto.registrar(fonte, [saida])
+        fonte.write_bytes(b"outro conteudo")
+        assert not manifesto.ja_convertido(fonte)
+    finally:
+        manifesto.fechar()
+
+
+def test_so_a_data_mudou(tmp_path):
+    fonte = tmp_path / "a.pdf"
+    fonte.write_bytes(b"conteudo")
+    saida = tmp_path / "saida.pdf"
+    saida.write_bytes(b"%PDF")
+    info = fonte.stat()
+    (tmp_path / "sem_hash").mkdir()
+    (tmp_path / "com_hash").mkdir()
+
+    sem_hash = ManifestoConversao(tmp_path / "sem_hash")
+    com_hash = ManifestoConversao(tmp_path / "com_hash", usar_hash=True)
+    try:
+        sem_hash.registrar(fonte, [saida])
+        com_hash.registrar(fonte, [saida])
+        #Mesmo conteúdo com outra data (ex.: cópia): só o hash reconhece
+        os.utime(fonte, ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+        assert not sem_hash.ja_convertido(fonte)
+        assert com_hash.ja_convertido(fonte)
+    finally:
+        sem_hash.fechar()
+        com_hash.fechar()
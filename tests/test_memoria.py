@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from model.memoria import (
+    BYTES_POR_PAGINA_PDF, MEMORIA_BASE_PDF, MEMORIA_POR_PAGINA_PDF, OrcamentoMemoria, estimar_arquivo, memoria_intervalo,
+)
+
+
+def criar_pdf_reportlab(caminho, paginas):
+    #Árvore de páginas no meio do arquivo, longe do começo e do fim
+    c = canvas.Canvas(str(caminho), pagesize=A4)
+    for i in range(paginas):
+        c.drawString(72, 720, f"Página {i + 1} " + "texto " * 50)
+        c.showPage()
+    c.save()
+    return caminho
+
+
+def test_paginas_do_pdf_sem_depender_da_posicao_da_arvore(tmp_path):
+    estimativa = estimar_arquivo(criar_pdf_reportlab(tmp_path / "grande.pdf", 400))
+
+    assert estimativa.paginas == 400
+    assert estimativa.memoria == MEMORIA_BASE_PDF + 400 * MEMORIA_POR_PAGINA_PDF
+    assert memoria_intervalo(estimativa, 0, 150) == MEMORIA_BASE_PDF + 150 * MEMORIA_POR_PAGINA_PDF
+
+
+def test_pdf_ilegivel_estimado_pelo_tamanho(tmp_path):
+    caminho = tmp_path / "corrompido.pdf"
+    caminho.write_bytes(b"%PDF-1.4\n" + b"0" * (3 * BYTES_POR_PAGINA_PDF))
+    assert estimar_arquivo(caminho).paginas == 3
+
+
+def test_imagem_estimada_pelo_cabecalho(tmp_path):
+    caminho = tmp_path / "imagem.tif"
+    quadros = [Image.new("RGB", (100, 50)) for _ in range(3)]
+    quadros[0].save(caminho, save_all=True, append_images=quadros[1:])
+    estimativa = estimar_arquivo(caminho)
+
+    assert (estimativa.paginas, estimativa.pixels) == (3, 5000)
+    #Imagem: o pico é o de um quadro em qualquer intervalo
+    assert memoria_intervalo(estimativa, 0, 1) == estimativa.memoria
+
+
+def test_orcamento_admite_na_ordem_de_chegada():
+    async def executar():
+        orcamento = OrcamentoMemoria(100)
+        ordem = []
+        grande = await orcamento.reservar(80)
+
+        async def tarefa(nome, custo):
+            reserva = await orcamento.reservar(custo)
+            ordem.append(nome)
+            await asyncio.sleep(0)
+            orcamento.liberar(reserva)
+
+        #A de 50 espera; a de 10 caberia, mas chegou depois e não passa à frente
+        tarefas = [asyncio.ensure_future(tarefa("media", 50)), asyncio.ensure_future(tarefa("pequena", 10))]
+        await asyncio.sleep(0.01)
+        assert ordem == []
+        orcamento.liberar(grande)
+        await asyncio.gather(*tarefas)
+        return ordem, orcamento
+
+    ordem, orcamento = asyncio.run(executar())
+    assert ordem == ["media", "pequena"]
+    assert orcamento.em_uso == 0
+    assert orcamento.maior_uso <= 100
+    assert orcamento.esperas == 2
+
+
+def test_tarefa_maior_que_o_orcamento_roda_sozinha():
+    async def executar():
+        orcamento = OrcamentoMemoria(100)
+        reserva = await asyncio.wait_for(orcamento.reservar(500), 1)
+        assert orcamento.em_uso == 100
+        orcamento.liberar(reserva)
+        return orcamento.em_uso
+
+    assert asyncio.run(executar()) == 0
+
+
+def test_espera_cancelada_nao_prende_memoria():
+    async def executar():
+        orcamento = OrcamentoMemoria(100)
+        reserva = await orcamento.reservar(100)
+        espera = asyncio.ensure_future(orcamento.reservar(50))
+        await asyncio.sleep(0)
+        espera.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await espera
+        orcamento.liberar(reserva)
+        return orcamento.em_uso
+
+    assert asyncio.run(executar()) == 0
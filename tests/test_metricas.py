@@ -0,0 +1,26 @@
+from model.metricas import ColetorMetricas
+
+
+def test_medidor_exportado_como_gauge():
+    coletor = ColetorMetricas()
+    coletor.contar("paginas_geradas", 3)
+    coletor.definir("memoria_estimada_maxima", 1024)
+    texto = coletor.para_prometheus()
+
+    assert "# TYPE documenta_paginas_geradas_total counter" in texto
+    assert "# TYPE documenta_memoria_estimada_maxima gauge" in texto
+    assert "documenta_memoria_estimada_maxima 1024" in texto
+    assert "memoria_estimada_maxima_total" not in texto
+
+
+def test_mesclar_soma_contadores_e_mantem_o_maior_medidor():
+    coletor = ColetorMetricas()
+    coletor.contar("paginas_geradas", 2)
+    coletor.definir("memoria_estimada_maxima", 100)
+    outro = ColetorMetricas()
+    outro.contar("paginas_geradas", 5)
+    outro.definir("memoria_estimada_maxima", 50)
+    coletor.mesclar(outro.exportar())
+
+    assert coletor.contadores["paginas_geradas"] == 7
+    assert coletor.medidores["memoria_estimada_maxima"] == 100
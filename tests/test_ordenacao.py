@@ -0,0 +1,63 @@
+import asyncio
+from pathlib import Path
+import pytest
+from model.memoria import EstimativaArquivo
+from model.ordenacao import (
+    ORDEM_MAIORES_PRIMEIRO, ORDEM_VARREDURA, PIXELS_POR_PAGINA, TRABALHO_DOCUMENTO_WORD, FilaConversao, estimar_trabalho,
+)
+
+
+def entregar(ordem, trabalhos, consumidores=2, tamanho=16):
+    async def executar():
+        fila = FilaConversao(ordem, tamanho)
+        for nome, trabalho in trabalhos:
+            await fila.colocar(nome, trabalho)
+        await fila.encerrar(consumidores)
+        return [await fila.retirar() for _ in range(len(trabalhos) + consumidores)]
+    return asyncio.run(executar())
+
+
+TRABALHOS = [("pequeno", 1), ("medio", 10), ("enorme", 500), ("outro_medio", 10), ("pequeno2", 1)]
+
+
+def test_maiores_primeiro_com_empate_na_ordem_de_chegada():
+    entregues = entregar(ORDEM_MAIORES_PRIMEIRO, TRABALHOS)
+    assert entregues == ["enorme", "medio", "outro_medio", "pequeno", "pequeno2", None, None]
+
+
+def test_varredura_mantem_a_ordem():
+    entregues = entregar(ORDEM_VARREDURA, TRABALHOS)
+    assert entregues == ["pequeno", "medio", "enorme", "outro_medio", "pequeno2", None, None]
+
+
+def test_fila_limitada_segura_a_varredura():
+    async def executar():
+        fila = FilaConversao(ORDEM_MAIORES_PRIMEIRO, tamanho=2)
+        await fila.colocar("a", 1)
+        await fila.colocar("b", 2)
+        colocar = asyncio.ensure_future(fila.colocar("c", 3))
+        await asyncio.sleep(0.01)
+        assert not colocar.done()
+        primeiro = await fila.retirar()
+        await colocar
+        return primeiro
+
+    assert asyncio.run(executar()) == "b"
+
+
+def test_ordem_invalida():
+    with pytest.raises(Exception, match="inválida"):
+        FilaConversao("aleatoria")
+
+
+def test_estimativa_de_trabalho(tmp_path):
+    pdf = estimar_trabalho(Path("a.pdf"), EstimativaArquivo(0, paginas=300))
+    imagem_grande = estimar_trabalho(Path("a.tif"), EstimativaArquivo(0, paginas=2, pixels=4 * PIXELS_POR_PAGINA))
+    imagem_pequena = estimar_trabalho(Path("a.jpg"), EstimativaArquivo(0, paginas=1, pixels=100))
+    documento = tmp_path / "a.docx"
+    documento.write_bytes(b"0" * 1024)
+
+    assert pdf == 300
+    assert imagem_grande == 8
+    assert imagem_pequena == 1
+    assert TRABALHO_DOCUMENTO_WORD < estimar_trabalho(documento, EstimativaArquivo(0)) < TRABALHO_DOCUMENTO_WORD + 1
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from PIL import Image, ImageDraw, ImageChops, features
+from model.converter import ConversorModel
+from model.pdf_direto import extrair_imagem_direta, gravar_pdf_imagem
+
+
+def imagem_da_pagina(caminho_pdf):
+    """(bytes do fluxo comprimido, imagem decodificada) da única imagem do PDF"""
+    pdf = pdfium.PdfDocument(caminho_pdf)
+    try:
+        assert len(pdf) == 1
+        pagina = pdf[0]
+        objetos = list(pagina.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]))
+        assert len(objetos) == 1
+        tamanho = pdfium_c.FPDFImageObj_GetImageDataRaw(objetos[0].raw, None, 0)
+        buffer = (pdfium_c.c_ubyte * tamanho)()
+        pdfium_c.FPDFImageObj_GetImageDataRaw(objetos[0].raw, buffer, tamanho)
+        decodificada = objetos[0].get_bitmap(render=False).to_pil()
+        return bytes(buffer), decodificada
+    finally:
+        pdf.close()
+
+
+def desenhar(modo, tamanho=(400, 300)):
+    img = Image.new(modo, tamanho, "white" if modo != "1" else 1)
+    desenho = ImageDraw.Draw(img)
+    desenho.rectangle([40, 40, 200, 150], fill="black" if modo != "1" else 0)
+    desenho.text((220, 200), "Documenta", fill="black" if modo != "1" else 0)
+    return img
+
+
+def test_jpeg_embutido_sem_recodificar(tmp_path):
+    origem = tmp_path / "foto.jpg"
+    desenhar("RGB").save(origem, quality=90)
+    destino = tmp_path / "foto.pdf"
+    asyncio.run(ConversorModel.converter_imagem_para_pdf(origem, destino))
+
+    dados, _ = imagem_da_pagina(destino)
+    assert dados == origem.read_bytes()
+
+
+@pytest.mark.skipif(not features.check("libtiff"), reason="Pillow sem libtiff (G4)")
+@pytest.mark.parametrize("fotometrico", [0, 1])
+def test_tiff_g4_embutido_com_as_mesmas_cores(tmp_path, fotometrico):
+    #Photometric 0 (WhiteIsZero) ou 1 (BlackIsZero, bits invertidos em relação ao PDF)
+    origem = tmp_path / "scan.tif"
+    desenhar("1").save(origem, compression="group4", tiffinfo={262: fotometrico})
+    destino = tmp_path / "scan.pdf"
+
+    with Image.open(origem) as img:
+        assert img.tag_v2.get(262) == fotometrico
+        original = img.convert("L")
+        imagem = extrair_imagem_direta(img, origem)
+        assert imagem is not None and imagem.filtro == "CCITTFaxDecode"
+        deslocamento, comprimento = imagem.deslocamento, imagem.comprimento
+    gravar_pdf_imagem(destino, imagem)
+
+    dados, decodificada = imagem_da_pagina(destino)
+    with open(origem, "rb") as f:
+        f.seek(deslocamento)
+        assert dados == f.read(comprimento)
+    diferenca = ImageChops.difference(decodificada.convert("L"), original)
+    assert diferenca.getbbox() is None
+
+
+def test_formato_sem_equivalente_no_pdf_nao_e_embutido(tmp_path):
+    origem = tmp_path / "imagem.png"
+    desenhar("RGB").save(origem)
+    with Image.open(origem) as img:
+        assert extrair_imagem_direta(img, origem) is None
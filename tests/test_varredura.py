@@ -0,0 +1,22 @@
+import asyncio
+from model.varredura import varrer_arquivos
+
+
+def listar(origem, ignorar=()):
+    async def executar():
+        return sorted([caminho.relative_to(origem).as_posix() async for caminho in varrer_arquivos(origem, ignorar)])
+    return asyncio.run(executar())
+
+
+def test_varredura_ignora_o_destino_dentro_da_origem(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "saida" / "sub").mkdir(parents=True)
+    (tmp_path / "a.pdf").write_bytes(b"a")
+    (tmp_path / "sub" / "b.pdf").write_bytes(b"b")
+    (tmp_path / "saida" / "a.pdf").write_bytes(b"a")
+    (tmp_path / "saida" / "sub" / "b.pdf").write_bytes(b"b")
+
+    assert listar(tmp_path) == ["a.pdf", "saida/a.pdf", "saida/sub/b.pdf", "sub/b.pdf"]
+    assert listar(tmp_path, [tmp_path / "saida"]) == ["a.pdf", "sub/b.pdf"]
+    #O destino igual à origem não esconde a origem
+    assert listar(tmp_path, [tmp_path]) == ["a.pdf", "saida/a.pdf", "saida/sub/b.pdf", "sub/b.pdf"]
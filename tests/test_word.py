@@ -0,0 +1,79 @@
+import asyncio
+from model.word import AgrupadorWord, BACKEND_FALSO, BACKEND_LIBREOFFICE, converter_lote_word
+
+
+class MotorFalso:
+    """Roda as tarefas no próprio processo e anota o tamanho de cada lote"""
+
+    def __init__(self, max_processos=2, executar_lote=True):
+        self.max_processos = max_processos
+        self.executar_lote = executar_lote
+        self.lotes = []
+
+    async def executar(self, funcao, *args):
+        nome_backend, pares = args
+        self.lotes.append(len(pares))
+        await asyncio.sleep(0.01)
+        if self.executar_lote:
+            return funcao(nome_backend, pares)
+        return [None] * len(pares)
+
+
+def converter_todos(agrupador, pares):
+    async def executar():
+        return await asyncio.gather(
+            *(agrupador.converter(origem, destino) for origem, destino in pares), return_exceptions=True
+        )
+    return asyncio.run(executar())
+
+
+def criar_documentos(pasta, quantidade):
+    pares = []
+    for i in range(quantidade):
+        origem = pasta / f"doc{i}.docx"
+        origem.write_bytes(b"documento")
+        pares.append((origem, pasta / f"doc{i}.pdf"))
+    return pares
+
+
+def test_backend_falso_converte_cada_documento(tmp_path):
+    motor = MotorFalso()
+    pares = criar_documentos(tmp_path, 5)
+    resultados = converter_todos(AgrupadorWord(motor, BACKEND_FALSO), pares)
+
+    assert resultados == [None] * 5
+    assert all(destino.read_bytes().startswith(b"%PDF") for _, destino in pares)
+    #Só o LibreOffice junta documentos em lotes
+    assert motor.lotes == [1] * 5
+
+
+def test_erro_fica_com_o_documento(tmp_path):
+    pares = criar_documentos(tmp_path, 3)
+    pares[1][0].write_bytes(b"")
+    resultados = converter_todos(AgrupadorWord(MotorFalso(), BACKEND_FALSO), pares)
+
+    assert resultados[0] is None and resultados[2] is None
+    assert "vazio" in str(resultados[1])
+    assert not pares[1][1].exists()
+
+
+def test_lotes_libreoffice_nao_deixam_processo_parado(tmp_path):
+    motor = MotorFalso(max_processos=2, executar_lote=False)
+    agrupador = AgrupadorWord(motor, BACKEND_LIBREOFFICE, tamanho_lote=8)
+    pares = criar_documentos(tmp_path, 10)
+    resultados = converter_todos(agrupador, pares)
+
+    assert resultados == [None] * 10
+    assert sum(motor.lotes) == 10
+    #Os primeiros documentos vão sozinhos para os processos livres; os seguintes, em lotes de
+    #no máximo ceil(pendentes / processos)
+    assert motor.lotes[:2] == [1, 1]
+    assert max(motor.lotes) <= 4
+
+
+def test_converter_lote_word_relata_erro_por_documento(tmp_path):
+    pares = criar_documentos(tmp_path, 2)
+    pares[0][0].write_bytes(b"")
+    erros = converter_lote_word(BACKEND_FALSO, pares)
+
+    assert erros[0] and erros[1] is None
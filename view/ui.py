@@ -164,7 +164,7 @@ def criar_interface(page, vm):
             convertendo.visible = True
             progresso.visible = True
             page.update()
-            threading.Thread(target=iniciar_conversao, args=(origem.value, destino.value, atualizar_status)).start()
+            threading.Thread(target=iniciar_conversao, args=(origem.value, destino.value, atualizar_status, vm)).start()
     def parar_arquivos(e):
         parar_conversao(vm)
         status.content.value = "Conversão interrompida pelo usuário."
@@ -173,12 +173,13 @@ def criar_interface(page, vm):
         progresso.visible = False
         page.update()
     def atualizar_status(mensagem, erro=None):
+        finalizada = mensagem.startswith("✅") or mensagem.startswith("⚠️ Conversão concluída") or mensagem.startswith("⚠️ Conversão interrompida")
         if erro:
             status.content.value = f"⚠️ {erro}"
             status.bgcolor = COR_STATUS_ERRO
         else:
             status.content.value = mensagem
-            if mensagem.startswith("✅") or mensagem.startswith("⚠️ Conversão concluída"):
+            if finalizada:
                 status.bgcolor = COR_STATUS_SUCESSO if mensagem.startswith("✅") else COR_STATUS_AVISO
                 convertendo.content.controls[1].value = "Conversão finalizada"
                 convertendo.content.controls[1].color = COR_STATUS_SUCESSO if mensagem.startswith("✅") else COR_STATUS_AVISO
@@ -187,7 +188,7 @@ def criar_interface(page, vm):
                 progresso.visible = False
             else:
                 status.bgcolor = COR_STATUS
-        if mensagem.startswith("✅") or mensagem.startswith("⚠️ Conversão concluída"):
+        if finalizada:
             progresso.visible = False
         page.update()
     def fechar_janela(e):
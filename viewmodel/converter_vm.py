@@ -2,15 +2,32 @@ import os
 import time
 import asyncio
 from model.converter import ConversorModel, extrair_todos_zips
+from model.cancelamento import TokenCancelamento
+from model.codificacao import PERFIL_AUTOMATICO, PERFIS_COMPRESSAO
+from model.metricas import FORMATOS_METRICAS
+from model.deduplicacao import POLITICAS_DEDUPLICACAO
+from model.word import BACKENDS_WORD, BACKEND_WORD_PADRAO
+from model.ordenacao import ORDENS_CONVERSAO, ORDEM_MAIORES_PRIMEIRO
 from datetime import datetime
 from pathlib import Path
 
 class ConversorViewModel:
     def __init__(self):
         self.parar = False
+        self.cancelamento = TokenCancelamento()  # Compartilhado com os processos de conversão
         self.status_atual = ""
         self.erro_atual = None
         self.tamanho_maximo_gb = 1  # Tamanho máximo em GB (padrão: 1GB)
+        self.max_processos = None  # Processos de conversão (padrão: um por núcleo)
+        self.conversao_incremental = True  # Pula arquivos que não mudaram desde a última conversão
+        self.perfil_compressao = PERFIL_AUTOMATICO  # automatico, colorido, cinza ou bitonal
+        self.formato_metricas = None  # "json" ou "prometheus" grava métricas por etapa no destino
+        self.ler_compactados = True  # Converte ZIP/TAR direto do compactado, sem extrair na origem
+        self.politica_deduplicacao = None  # automatico, reflink, hardlink ou copia: converte conteúdos repetidos uma vez só
+        self.deduplicar_paginas = False  # Também liga PDFs de página idênticos entre si
+        self.backend_word = BACKEND_WORD_PADRAO  # automatico, word, docx2pdf, libreoffice ou falso
+        self.memoria_maxima_gb = None  # Memória para as conversões em andamento (padrão: metade da memória física)
+        self.ordem_conversao = ORDEM_MAIORES_PRIMEIRO  # maiores_primeiro ou varredura
 
     def atualizar_status(self, mensagem, erro=None):
         """Atualiza o status atual do processamento"""
@@ -20,7 +37,7 @@ class ConversorViewModel:
     async def extrair_arquivos(self, caminho_origem, callback_status=None):
         """Extrai arquivos compactados"""
         try:
-            erros = extrair_todos_zips(caminho_origem, callback_status)
+            _, erros = extrair_todos_zips(caminho_origem, callback_status)
             return len(erros) == 0, erros
         except Exception as e:
             return False, [str(e)]
@@ -29,9 +46,16 @@ class ConversorViewModel:
         """Inicia o processo de conversão"""
         try:
             self.parar = False
+            self.cancelamento.reiniciar()
             tamanho_maximo = self.tamanho_maximo_gb * 1024 * 1024 * 1024  # Converte GB para bytes
+            memoria_maxima = int(self.memoria_maxima_gb * 1024 * 1024 * 1024) if self.memoria_maxima_gb else None
             return await ConversorModel.converter_para_pdf(
-                origem, destino, callback_status, self.parar, tamanho_maximo
+                origem, destino, callback_status, self.cancelamento, tamanho_maximo, self.max_processos,
+                incremental=self.conversao_incremental, perfil_compressao=self.perfil_compressao,
+                metricas=self.formato_metricas, ler_compactados=self.ler_compactados,
+                deduplicar=self.politica_deduplicacao, deduplicar_paginas=self.deduplicar_paginas,
+                backend_word=self.backend_word, memoria_maxima=memoria_maxima,
+                ordem=self.ordem_conversao
             )
         except Exception as e:
             return (0, [str(e)])
@@ -39,6 +63,7 @@ class ConversorViewModel:
     def parar_conversao(self):
         """Para o processo de conversão"""
         self.parar = True
+        self.cancelamento.cancelar()
 
     def configurar_tamanho_maximo(self, tamanho_gb):
         """Configura o tamanho máximo dos arquivos em GB"""
@@ -51,9 +76,64 @@ class ConversorViewModel:
         """Retorna o tamanho máximo configurado em GB"""
         return self.tamanho_maximo_gb
 
-def iniciar_conversao(origem, destino, callback_status=None):
+    def configurar_perfil_compressao(self, perfil):
+        """Configura o perfil de compressão das páginas de imagem (automatico, colorido, cinza ou bitonal)"""
+        if perfil in PERFIS_COMPRESSAO:
+            self.perfil_compressao = perfil
+            return True
+        return False
+
+    def obter_perfil_compressao(self):
+        """Retorna o perfil de compressão configurado"""
+        return self.perfil_compressao
+
+    def configurar_metricas(self, formato):
+        """Liga as métricas por etapa ("json" ou "prometheus") ou desliga (None)"""
+        if formato is None or formato in FORMATOS_METRICAS:
+            self.formato_metricas = formato
+            return True
+        return False
+
+    def configurar_deduplicacao(self, politica, paginas=False):
+        """Liga a deduplicação por conteúdo (automatico, reflink, hardlink ou copia) ou desliga (None)"""
+        if politica is None or politica in POLITICAS_DEDUPLICACAO:
+            self.politica_deduplicacao = politica
+            self.deduplicar_paginas = bool(politica) and paginas
+            return True
+        return False
+
+    def configurar_backend_word(self, backend):
+        """Configura como DOC/DOCX viram PDF (automatico, word, docx2pdf, libreoffice ou falso)"""
+        if backend in BACKENDS_WORD:
+            self.backend_word = backend
+            return True
+        return False
+
+    def configurar_memoria_maxima(self, memoria_gb):
+        """Configura a memória (GB) que as conversões em andamento podem ocupar juntas (None = metade da memória física)"""
+        if memoria_gb is None or memoria_gb > 0:
+            self.memoria_maxima_gb = memoria_gb
+            return True
+        return False
+
+    def configurar_ordem(self, ordem):
+        """Configura a ordem de conversão (maiores_primeiro ou varredura)"""
+        if ordem in ORDENS_CONVERSAO:
+            self.ordem_conversao = ordem
+            return True
+        return False
+
+    def configurar_processos(self, max_processos):
+        """Configura quantos processos convertem arquivos em paralelo (None = um por núcleo)"""
+        if max_processos is None or max_processos > 0:
+            self.max_processos = max_processos
+            return True
+        return False
+
+def iniciar_conversao(origem, destino, callback_status=None, vm=None):
     """Função auxiliar para iniciar a conversão em uma thread separada"""
-    vm = ConversorViewModel()
+    # Usa o ViewModel da interface para que o botão Parar alcance esta conversão
+    vm = vm or ConversorViewModel()
     asyncio.run(vm.converter(origem, destino, callback_status))
 
 def iniciar_extracao(origem, callback_status=None):